@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Benchmark of tree-path feature contributions against plain predictions
+Times score_matrix and score_matrix_with_factors for both models at several
+batch sizes and checks that bias + contributions adds up to the prediction
+
+Usage: python3 bench_factors.py [--sizes 1 100 10000] [--repeats 20]
+"""
+
+import json
+import argparse
+import os
+
+import numpy as np
+
+from bench_uncertainty import MODELS, best_ms, sample_rows
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Measure the latency overhead of per-feature contributions')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 100, 10000])
+    parser.add_argument('--repeats', type=int, default=20)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    rng = np.random.default_rng(0)
+    model_dir = os.path.dirname(os.path.abspath(__file__))
+    report = {}
+
+    for name, (predictor_class, filename) in MODELS.items():
+        predictor = predictor_class('compiled').load_model(os.path.join(model_dir, filename))
+        report[name] = {}
+        for size in args.sizes:
+            rows = sample_rows(predictor, size, rng)
+            *scores, (bias, contributions) = predictor.score_matrix_with_factors(rows)
+            # Thunderstorm explains P(thunderstorm), windspeed the predicted value
+            explained = scores[1] if len(scores) > 1 else scores[0]
+            plain = best_ms(lambda: predictor.score_matrix(rows), args.repeats)
+            factors = best_ms(lambda: predictor.score_matrix_with_factors(rows), args.repeats)
+            report[name][size] = {
+                'score_ms': round(plain, 3),
+                'score_with_factors_ms': round(factors, 3),
+                'overhead_pct': round((factors / plain - 1) * 100, 1),
+                'max_additivity_error': float(np.abs(bias + contributions.sum(axis=1) - explained).max()),
+            }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark of per-tree uncertainty against plain predictions
+Times scoring (score_matrix vs score_matrix_with_spread) and full responses
+(predict_batch with and without uncertainty=True) for both models at several
+batch sizes, plus the scikit-learn estimator-by-estimator equivalent
+
+Usage: python3 bench_uncertainty.py [--sizes 1 100 10000] [--repeats 20]
+"""
+
+import json
+import argparse
+import os
+import time
+import warnings
+
+import numpy as np
+
+from thundercast import ThunderstormPredictor, WindspeedPredictor, predict_with_spread
+
+MODELS = {
+    'thunderstorm': (ThunderstormPredictor, 'thunderstorm_model.joblib'),
+    'windspeed': (WindspeedPredictor, 'windspeed_model.joblib'),
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Measure the latency overhead of per-tree uncertainty')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 100, 10000])
+    parser.add_argument('--repeats', type=int, default=20)
+    return parser.parse_args()
+
+
+def best_ms(fn, repeats):
+    fn()
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def sample_rows(predictor, n_rows, rng):
+    # Spread inputs over the forest's own split thresholds so rows reach varied leaves
+    forest = predictor.model
+    rows = np.empty((n_rows, len(predictor.feature_names)))
+    for j in range(rows.shape[1]):
+        thresholds = forest.threshold[forest.is_split & (forest.feature == j)]
+        low, high = (thresholds.min(), thresholds.max()) if len(thresholds) else (0.0, 1.0)
+        rows[:, j] = rng.uniform(low - 1, high + 1, n_rows)
+    return rows
+
+
+def main():
+    args = parse_args()
+    rng = np.random.default_rng(0)
+    model_dir = os.path.dirname(os.path.abspath(__file__))
+    report = {}
+
+    for name, (predictor_class, filename) in MODELS.items():
+        predictor = predictor_class('compiled').load_model(os.path.join(model_dir, filename))
+        sklearn_model = None
+        try:
+            sklearn_model = predictor_class('sklearn').load_model(os.path.join(model_dir, filename))
+        except ImportError:
+            pass
+
+        report[name] = {}
+        for size in args.sizes:
+            rows = sample_rows(predictor, size, rng)
+            # Scoring only (arrays), then the full per-row response dicts
+            score = best_ms(lambda: predictor.score_matrix(rows), args.repeats)
+            score_spread = best_ms(lambda: predictor.score_matrix_with_spread(rows), args.repeats)
+            plain = best_ms(lambda: predictor.predict_batch(rows), args.repeats)
+            spread = best_ms(lambda: predictor.predict_batch(rows, uncertainty=True), args.repeats)
+            entry = {
+                'score_ms': round(score, 3),
+                'score_with_spread_ms': round(score_spread, 3),
+                'score_overhead_pct': round((score_spread / score - 1) * 100, 1),
+                'response_ms': round(plain, 3),
+                'response_with_uncertainty_ms': round(spread, 3),
+                'response_overhead_pct': round((spread / plain - 1) * 100, 1),
+            }
+            if sklearn_model is not None:
+                prepared = sklearn_model._prepare(rows)
+                with warnings.catch_warnings():
+                    warnings.simplefilter('ignore')
+                    per_estimator = best_ms(lambda: predict_with_spread(sklearn_model.model, prepared),
+                                            max(1, args.repeats // 4))
+                entry['sklearn_per_estimator_spread_ms'] = round(per_estimator, 3)
+            report[name][size] = entry
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
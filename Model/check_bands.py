@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Check of the risk level / wind category bands at their thresholds
+Feeds model outputs that sit exactly on each threshold, and one ulp below
+it, through run_model.score_chunk (bulk scoring) and the predictors'
+build_results (API responses), and checks that both give the pinned label:
+a value equal to a threshold is in the band above it. Exits non-zero on
+any mismatch
+
+Usage: python3 check_bands.py
+"""
+
+import sys
+import json
+
+import numpy as np
+
+import run_model
+from thundercast import (
+    RISK_LEVELS, RISK_THRESHOLDS, WIND_CATEGORIES, WIND_THRESHOLDS, ThunderstormPredictor, WindspeedPredictor
+)
+
+
+class PinnedThunderstorm(ThunderstormPredictor):
+    """Outputs the first feature of each row as P(thunderstorm)"""
+
+    def score_matrix(self, input_array):
+        probability = np.asarray(input_array, dtype=np.float64)[:, 0]
+        return (probability >= 0.5).astype(np.int64), probability, np.maximum(probability, 1 - probability) * 100
+
+
+class PinnedWindspeed(WindspeedPredictor):
+    """Outputs the first feature of each row as the predicted windspeed"""
+
+    def score_matrix(self, input_array):
+        return np.asarray(input_array, dtype=np.float64)[:, 0]
+
+
+def pinned_values(thresholds, low, high):
+    """(value, expected band) at both ends, on every threshold and one ulp below it"""
+    cases = [(low, 0)]
+    for band, threshold in enumerate(thresholds, start=1):
+        cases.append((float(np.nextafter(threshold, -np.inf)), band - 1))
+        cases.append((float(threshold), band))
+    cases.append((high, len(thresholds)))
+    return cases
+
+
+def check(predictor, label_field, labels, cases):
+    values = np.array([value for value, _ in cases])
+    matrix = np.zeros((len(values), len(predictor.feature_names)))
+    matrix[:, 0] = values
+    run_model._scorer = predictor
+    bulk = run_model.score_chunk(matrix)[label_field].tolist()
+    scores = predictor.score_matrix(matrix)
+    api = [result[label_field] for result in predictor.build_results(*(scores if isinstance(scores, tuple)
+                                                                       else (scores,)))]
+    expected = [labels[band] for _, band in cases]
+    rows = [{'value': value, 'expected': want, 'score_chunk': got_bulk, 'build_results': got_api}
+            for (value, _), want, got_bulk, got_api in zip(cases, expected, bulk, api)]
+    failures = [row for row in rows if not row['expected'] == row['score_chunk'] == row['build_results']]
+    return rows, failures
+
+
+def main():
+    report = {}
+    failures = []
+    for name, predictor, field, labels, thresholds, high in (
+            ('thunderstorm', PinnedThunderstorm(), 'risk_level', RISK_LEVELS, RISK_THRESHOLDS, 1.0),
+            ('windspeed', PinnedWindspeed(), 'wind_category', WIND_CATEGORIES, WIND_THRESHOLDS, 30.0)):
+        rows, model_failures = check(predictor, field, labels, pinned_values(thresholds, 0.0, high))
+        report[name] = rows
+        failures += [f"{name} {row}" for row in model_failures]
+
+    print(json.dumps(report, indent=2))
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✅ Bulk scoring and API responses band threshold values alike")
+
+
+if __name__ == "__main__":
+    main()
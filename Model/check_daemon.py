@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Check that one stalled client cannot block the prediction daemon
+Starts `run_model.py serve` with a single worker, opens a client that
+pipelines --requests predictions and never reads its replies, and then
+times requests from a second, normal client on the same worker. Finally the
+stalled client reads everything back and checks that every reply arrived,
+in order. Exits non-zero if the normal client is held up or a reply is lost
+
+Usage: python3 check_daemon.py [--requests 20000] [--max-latency 1.0]
+"""
+
+import sys
+import json
+import argparse
+import os
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+
+from run_model import FRAME_HEADER, _recv_exact, encode_frame, request
+
+PARAMETERS = {
+    'wind_sfc_speed_ms': 10, 'wind_sfc_dir_deg': 180, 'wind_500_speed_ms': 15, 'wind_500_dir_deg': 180,
+    'temp_2m_C': 20, 'temp_500_C': -5, 'rh_2m_pct': 60, 'pressure_sfc_hPa': 1013,
+    'precipitable_water_mm': 25, 'cloud_cover_frac': 0.5, 'cloud_top_temp_C': -20, 'CAPE_Jkg': 1000,
+    'Lifted_Index_C': 0, 'K_index': 25, 'shear_850_500_ms': 10
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Check that a client that stops reading does not stall a worker')
+    parser.add_argument('--requests', type=int, default=20000, help='Requests pipelined by the stalled client')
+    parser.add_argument('--max-latency', type=float, default=1.0, help='Seconds allowed per normal request')
+    return parser.parse_args()
+
+
+def start_daemon(socket_path):
+    here = os.path.dirname(os.path.abspath(__file__))
+    daemon = subprocess.Popen([sys.executable, 'run_model.py', 'serve', '--socket', socket_path, '--workers', '1'],
+                              cwd=here, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            request({'op': 'health'}, socket_path, timeout=2)
+            return daemon
+        except OSError:
+            time.sleep(0.2)
+    daemon.kill()
+    raise RuntimeError('Daemon did not answer within 60 s')
+
+
+def main():
+    args = parse_args()
+    report = {'stalled_requests': args.requests}
+    failures = []
+
+    with tempfile.TemporaryDirectory() as scratch:
+        socket_path = os.path.join(scratch, 'daemon.sock')
+        daemon = start_daemon(socket_path)
+        try:
+            stalled = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            stalled.connect(socket_path)
+            frames = b''.join(encode_frame({'id': i, 'model': 'thunderstorm', 'parameters': PARAMETERS})
+                              for i in range(args.requests))
+            # The daemon stops reading this client once its replies back up, so send from a thread
+            sender = threading.Thread(target=stalled.sendall, args=(frames,), daemon=True)
+            sender.start()
+            time.sleep(1.0)
+
+            latencies = []
+            for i in range(20):
+                started = time.perf_counter()
+                try:
+                    reply = request({'id': i, 'model': 'thunderstorm', 'parameters': PARAMETERS}, socket_path,
+                                    timeout=args.max_latency)
+                    latencies.append(time.perf_counter() - started)
+                    if not reply.get('success'):
+                        failures.append(f"normal request {i}: {reply.get('error')}")
+                except OSError as e:
+                    failures.append(f"normal request {i} blocked behind the stalled client: {e!r}")
+                    break
+            report['normal_max_latency_ms'] = round(max(latencies) * 1000, 2) if latencies else None
+
+            # The stalled client catches up: every reply, in request order
+            stalled.settimeout(30)
+            ids = []
+            try:
+                for _ in range(args.requests):
+                    size = FRAME_HEADER.unpack(_recv_exact(stalled, FRAME_HEADER.size))[0]
+                    ids.append(json.loads(_recv_exact(stalled, size))['id'])
+            except OSError as e:
+                failures.append(f"stalled client lost replies after {len(ids)}: {e!r}")
+            stalled.close()
+            report['stalled_replies'] = len(ids)
+            if ids and ids != list(range(len(ids))):
+                failures.append("stalled client replies out of order")
+        finally:
+            daemon.terminate()
+            daemon.wait(timeout=30)
+
+    print(json.dumps(report, indent=2))
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✅ A stalled client does not hold up other connections")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Parity check: the same rows scored by every engine and load path
+Loads each model three ways (sklearn engine on the trained artifact,
+compiled engine on the exported serving artifact, compiled engine on the
+trained artifact alone, as when no serving artifact was exported) and
+compares their probabilities / predictions. Exits non-zero on any mismatch
+
+Usage: python3 check_engines.py [--rows 20000] [--tolerance 1e-9]
+"""
+
+import sys
+import json
+import argparse
+import os
+import shutil
+import tempfile
+import warnings
+
+import numpy as np
+
+from thundercast import ThunderstormPredictor, WindspeedPredictor, serving_artifact_path
+
+MODELS = {
+    'thunderstorm': (ThunderstormPredictor, 'thunderstorm_model.joblib'),
+    'windspeed': (WindspeedPredictor, 'windspeed_model.joblib'),
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Check that engines and load paths give the same predictions')
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--tolerance', type=float, default=1e-9, help='Max absolute output difference')
+    return parser.parse_args()
+
+
+def sample_rows(forest, n_rows, rng):
+    # Spread inputs over the raw-unit split thresholds so rows reach varied leaves
+    rows = np.empty((n_rows, forest.n_features_in_))
+    for j in range(rows.shape[1]):
+        thresholds = forest.threshold[forest.is_split & (forest.feature == j)]
+        thresholds = thresholds[np.isfinite(thresholds)]
+        low, high = (thresholds.min(), thresholds.max()) if len(thresholds) else (0.0, 1.0)
+        rows[:, j] = rng.uniform(low - 1, high + 1, n_rows)
+    return rows
+
+
+def outputs(predictor, rows):
+    with warnings.catch_warnings():
+        # sklearn warns that the arrays carry no feature names
+        warnings.simplefilter('ignore')
+        scores = predictor.score_matrix(rows)
+    # Thunderstorm: P(thunderstorm); windspeed: the predicted speed
+    return np.asarray(scores[1] if isinstance(scores, tuple) else scores, dtype=np.float64)
+
+
+def load_paths(predictor_class, model_path, scratch):
+    """{load path: predictor}"""
+    predictors = {'sklearn': predictor_class('sklearn').load_model(model_path)}
+    if os.path.exists(serving_artifact_path(model_path)):
+        predictors['compiled_serving'] = predictor_class('compiled').load_model(model_path)
+    # A copy of the trained artifact alone, without its exported serving artifact next to it
+    trained_only = os.path.join(scratch, os.path.basename(model_path))
+    shutil.copyfile(model_path, trained_only)
+    predictors['compiled_trained'] = predictor_class('compiled').load_model(trained_only)
+    return predictors
+
+
+def main():
+    args = parse_args()
+    here = os.path.dirname(os.path.abspath(__file__))
+    rng = np.random.default_rng(0)
+    report = {}
+    failed = False
+
+    with tempfile.TemporaryDirectory() as scratch:
+        for name, (predictor_class, filename) in MODELS.items():
+            model_path = os.path.join(here, filename)
+            if not os.path.exists(model_path):
+                print(f"⚠️ {name}: model file not found ({model_path})")
+                continue
+            predictors = load_paths(predictor_class, model_path, scratch)
+            reference = predictors['sklearn']
+            rows = sample_rows(predictors.get('compiled_serving', predictors['compiled_trained']).compiled,
+                               args.rows, rng)
+            expected = outputs(reference, rows)
+            entry = {'rows': args.rows, 'scaler_applied': {path: p.scaler is not None for path, p in predictors.items()}}
+            for path, predictor in predictors.items():
+                if path == 'sklearn':
+                    continue
+                difference = float(np.max(np.abs(outputs(predictor, rows) - expected)))
+                entry[f'{path}_max_abs_diff'] = difference
+                if difference > args.tolerance:
+                    failed = True
+                    print(f"❌ {name}: {path} differs from sklearn by up to {difference:.6g}")
+            report[name] = entry
+
+    print(json.dumps(report, indent=2))
+    if failed:
+        sys.exit(1)
+    print("✅ All engines and load paths agree")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Parity check: streaming windspeed features vs the pandas training pipeline
+Builds the training features of windspeed_prediction_model.py from
+wind_dataset.csv with pandas, replays the same daily rows through
+thundercast.features.StationFeatures, and compares the feature rows and the
+model predictions made from them. Exits non-zero on any mismatch
+
+Usage: python3 check_wind_features.py [--tolerance 1e-9]
+"""
+
+import sys
+import json
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from thundercast import WINDSPEED_FEATURES, WindspeedPredictor
+from thundercast.features import RAW_WIND_FIELDS, StationFeatures
+
+
+def pandas_features(df):
+    """The feature engineering of windspeed_prediction_model.py, without the target"""
+    df = df.copy()
+    df['wind_lag_1'] = df['WIND'].shift(1)
+    df['wind_lag_2'] = df['WIND'].shift(2)
+    df['wind_lag_3'] = df['WIND'].shift(3)
+
+    df['ma_3'] = df['WIND'].rolling(3).mean()
+    df['ma_5'] = df['WIND'].rolling(5).mean()
+    df['ma_7'] = df['WIND'].rolling(7).mean()
+
+    df['std_3'] = df['WIND'].rolling(3).std()
+    df['std_5'] = df['WIND'].rolling(5).std()
+    df['std_7'] = df['WIND'].rolling(7).std()
+    return df[WINDSPEED_FEATURES]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Compare streaming windspeed features with the pandas pipeline')
+    parser.add_argument('--csv', default=os.path.join(os.path.dirname(__file__), 'wind_dataset.csv'))
+    parser.add_argument('--tolerance', type=float, default=1e-9, help='Max absolute feature difference')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    df = pd.read_csv(args.csv, index_col='DATE', parse_dates=True)
+    expected = pandas_features(df)
+
+    station = StationFeatures()
+    started = time.perf_counter()
+    streamed = [station.update(observation) for observation in df[RAW_WIND_FIELDS].to_dict('records')]
+    elapsed = time.perf_counter() - started
+
+    expected_ready = expected.notna().all(axis=1).to_numpy()
+    streamed_ready = np.array([row is not None for row in streamed])
+    ready = expected_ready & streamed_ready
+    actual = np.array([[row[name] for name in WINDSPEED_FEATURES] for row, ok in zip(streamed, ready) if ok])
+    reference = expected.to_numpy()[ready]
+    difference = np.abs(actual - reference)
+
+    report = {
+        'rows': len(df),
+        'rows_with_features': int(expected_ready.sum()),
+        'readiness_mismatches': int((expected_ready != streamed_ready).sum()),
+        'max_abs_difference': float(difference.max()) if difference.size else 0.0,
+        'max_abs_difference_by_feature': {
+            name: float(value) for name, value in zip(WINDSPEED_FEATURES, difference.max(axis=0))
+        } if difference.size else {},
+        'stream_us_per_update': round(elapsed / len(df) * 1e6, 2),
+    }
+
+    model_path = os.path.join(os.path.dirname(__file__), 'windspeed_model.joblib')
+    if os.path.exists(model_path):
+        predictor = WindspeedPredictor().load_model(model_path)
+        predicted = predictor.score_matrix(actual)
+        reference_predicted = predictor.score_matrix(reference)
+        report['prediction_mismatches'] = int((predicted != reference_predicted).sum())
+        report['max_prediction_difference'] = float(np.abs(predicted - reference_predicted).max())
+
+    print(json.dumps(report, indent=2))
+
+    failures = []
+    if report['readiness_mismatches']:
+        failures.append(f"{report['readiness_mismatches']} rows differ in whether features are available")
+    if report['max_abs_difference'] > args.tolerance:
+        failures.append(f"feature difference {report['max_abs_difference']:.3g} exceeds {args.tolerance:.3g}")
+    if report.get('prediction_mismatches'):
+        failures.append(f"{report['prediction_mismatches']} predictions differ")
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ Streaming features match the pandas pipeline")
+
+
+if __name__ == "__main__":
+    main()
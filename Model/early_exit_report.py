@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Report on early-exit thunderstorm scoring over the sample dataset
+Scores thunderstorm_sample_dataset.csv with every tree and with
+predict_proba_anytime for each error bound and tree chunk size, and reports
+the trees evaluated per row (overall and per risk level), agreement of risk
+levels and predicted classes with full evaluation, and timings
+
+Usage: python3 early_exit_report.py [--error-bounds 0 0.001 0.01 0.05] [--chunk-trees 5 10 20]
+"""
+
+import json
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from thundercast import RISK_THRESHOLDS, ThunderstormPredictor, predict_proba_anytime
+
+RISK_LEVELS = ['Green', 'Yellow (low-moderate)', 'Yellow (moderate)', 'Red']
+
+
+def parse_args():
+    model_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description='Trees evaluated and agreement of early-exit scoring')
+    parser.add_argument('--csv', default=os.path.join(model_dir, 'thunderstorm_sample_dataset.csv'))
+    parser.add_argument('--model', default=os.path.join(model_dir, 'thunderstorm_model.joblib'))
+    parser.add_argument('--error-bounds', type=float, nargs='+', default=[0.0, 0.001, 0.01, 0.05])
+    parser.add_argument('--chunk-trees', type=int, nargs='+', default=[5, 10, 20])
+    parser.add_argument('--repeats', type=int, default=5)
+    return parser.parse_args()
+
+
+def best_ms(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def main():
+    args = parse_args()
+    predictor = ThunderstormPredictor('compiled').load_model(args.model)
+    rows = predictor._prepare(pd.read_csv(args.csv)[predictor.feature_names].to_numpy(dtype=np.float64))
+    forest = predictor.compiled
+
+    full = forest.predict_proba(rows)
+    full_band = np.searchsorted(RISK_THRESHOLDS, full[:, -1], side='right')
+    full_ms = best_ms(lambda: forest.predict_proba(rows), args.repeats)
+    report = {
+        'rows': len(rows),
+        'trees': forest.n_estimators,
+        'rows_per_risk_level': {level: int((full_band == band).sum()) for band, level in enumerate(RISK_LEVELS)},
+        'full_ms': round(full_ms, 2),
+        'runs': [],
+    }
+
+    for error_bound in args.error_bounds:
+        for chunk_trees in args.chunk_trees:
+            proba, trees = predict_proba_anytime(forest, rows, RISK_THRESHOLDS, chunk_trees, error_bound)
+            band = np.searchsorted(RISK_THRESHOLDS, proba[:, -1], side='right')
+            elapsed_ms = best_ms(lambda: predict_proba_anytime(forest, rows, RISK_THRESHOLDS, chunk_trees, error_bound),
+                                 args.repeats)
+            report['runs'].append({
+                'error_bound': error_bound,
+                'chunk_trees': chunk_trees,
+                'mean_trees_evaluated': round(float(trees.mean()), 2),
+                'mean_trees_by_risk_level': {
+                    level: round(float(trees[full_band == b].mean()), 2)
+                    for b, level in enumerate(RISK_LEVELS) if (full_band == b).any()
+                },
+                'early_exit_rows_pct': round(float((trees < forest.n_estimators).mean() * 100), 2),
+                'risk_level_agreement_pct': round(float((band == full_band).mean() * 100), 3),
+                'class_agreement_pct': round(float((np.argmax(proba, axis=1) == np.argmax(full, axis=1)).mean() * 100), 3),
+                'max_probability_difference': round(float(np.abs(proba[:, -1] - full[:, -1]).max()), 4),
+                'ms': round(elapsed_ms, 2),
+                'speedup': round(full_ms / elapsed_ms, 2),
+            })
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
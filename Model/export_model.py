@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Export trained models into scaler-free serving artifacts
+Writes <model>_serving.joblib next to each trained model
+
+Usage: python3 export_model.py [--model thunderstorm|windspeed|all] [--input-space auto|scaled|raw]
+"""
+
+import sys
+import json
+import argparse
+import os
+
+from thundercast.export import INPUT_SPACES, export_model_file
+
+MODEL_FILES = {
+    'thunderstorm': 'thunderstorm_model.joblib',
+    'windspeed': 'windspeed_model.joblib',
+}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Fold the StandardScaler into tree thresholds for serving')
+    parser.add_argument('--model', choices=[*MODEL_FILES, 'all'], default='all')
+    parser.add_argument('--input-space', choices=INPUT_SPACES, default='auto',
+                        help='Feature space the forest was fit in (default: detect)')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    names = list(MODEL_FILES) if args.model == 'all' else [args.model]
+    exit_code = 0
+
+    for name in names:
+        model_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), MODEL_FILES[name])
+        if not os.path.exists(model_path):
+            print(f"⚠️ {name}: model file not found ({model_path})")
+            exit_code = 1
+            continue
+
+        output_path, report = export_model_file(model_path, input_space=args.input_space)
+        print(f"✅ {name}: exported {os.path.basename(output_path)}")
+        print(json.dumps(report, indent=2))
+        if report.get('scaler_mismatch'):
+            print(f"⚠️ {name}: model was fit on unscaled features but a scaler is saved with it; "
+                  f"every engine ignores that scaler so serving matches training")
+
+    sys.exit(exit_code)
+
+if __name__ == "__main__":
+    main()
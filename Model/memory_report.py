@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Per-process memory report for loaded model artifacts
+Starts N independent processes per loading mode, each loading both models
+the way predict_api.py / the backend do, and reports how much of every
+process is unique (private) versus shared with the others (Linux only:
+reads /proc/<pid>/smaps_rollup and /proc/<pid>/smaps)
+
+Modes:
+    sklearn   trained pickles, unpickled into each process
+    compiled  serving artifacts, loaded into private memory (MODEL_MMAP=0)
+    mmap      serving artifacts, memory-mapped read-only (MODEL_MMAP=1)
+
+Usage: python3 memory_report.py [--processes 4] [--modes sklearn compiled mmap]
+"""
+
+import sys
+import json
+import argparse
+import os
+import subprocess
+
+MODES = {
+    'sklearn': {'INFERENCE_ENGINE': 'sklearn', 'MODEL_MMAP': '0'},
+    'compiled': {'INFERENCE_ENGINE': 'compiled', 'MODEL_MMAP': '0'},
+    'mmap': {'INFERENCE_ENGINE': 'compiled', 'MODEL_MMAP': '1'},
+}
+
+SERVING_SUFFIX = '_serving.joblib'
+
+# Loads both models, touches every tree array so it is fully resident, reports
+# its own memory before/after loading and then waits until stdin closes
+CHILD_SCRIPT = '''
+import json, os, sys, warnings
+import joblib
+import numpy as np
+import predict_api, windspeed_predict_api
+from thundercast import CompiledForest
+from memory_report import read_rollup
+
+engine = os.environ['INFERENCE_ENGINE']
+if engine == 'sklearn':
+    import sklearn.ensemble  # keep library import cost out of the model delta
+warnings.simplefilter('ignore')
+
+before = read_rollup(os.getpid())
+for api in (predict_api, windspeed_predict_api):
+    model, scaler, feature_names = api.load_model(engine)
+    model.predict(np.zeros((1, len(feature_names))))
+    if isinstance(model, CompiledForest):
+        for array in (model.feature, model.threshold, model.children, model.value, model.roots):
+            np.asarray(array).sum()
+    globals().setdefault('models', []).append(model)
+after = read_rollup(os.getpid())
+
+print(json.dumps({'before': before, 'after': after}), flush=True)
+sys.stdin.read()
+'''
+
+
+def read_rollup(pid):
+    """Rss/Pss/shared/private totals in kB from /proc/<pid>/smaps_rollup"""
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[0].endswith(':'):
+                fields[parts[0][:-1]] = int(parts[1])
+    return {
+        'rss_kb': fields.get('Rss', 0),
+        'pss_kb': fields.get('Pss', 0),
+        'shared_kb': fields.get('Shared_Clean', 0) + fields.get('Shared_Dirty', 0),
+        'private_kb': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0),
+    }
+
+
+def read_artifact_mappings(pid, suffix=SERVING_SUFFIX):
+    """Same totals restricted to file mappings of the serving artifacts"""
+    totals = {'rss_kb': 0, 'pss_kb': 0, 'shared_kb': 0, 'private_kb': 0}
+    in_artifact = False
+    with open(f'/proc/{pid}/smaps') as f:
+        for line in f:
+            parts = line.split()
+            if parts and not parts[0].endswith(':'):
+                # Mapping header: address perms offset dev inode [pathname]
+                in_artifact = len(parts) >= 6 and parts[5].endswith(suffix)
+            elif in_artifact and len(parts) == 3:
+                key, value = parts[0][:-1], int(parts[1])
+                if key == 'Rss':
+                    totals['rss_kb'] += value
+                elif key == 'Pss':
+                    totals['pss_kb'] += value
+                elif key in ('Shared_Clean', 'Shared_Dirty'):
+                    totals['shared_kb'] += value
+                elif key in ('Private_Clean', 'Private_Dirty'):
+                    totals['private_kb'] += value
+    return totals
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Report unique vs shared memory of processes serving the models')
+    parser.add_argument('--processes', type=int, default=4, help='Processes per mode')
+    parser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES))
+    return parser.parse_args()
+
+
+def measure_mode(mode, n_processes):
+    env = dict(os.environ, **MODES[mode])
+    children = [
+        subprocess.Popen([sys.executable, '-c', CHILD_SCRIPT], cwd=os.path.dirname(os.path.abspath(__file__)),
+                         env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        for _ in range(n_processes)
+    ]
+    try:
+        loads = []
+        for child in children:
+            line = child.stdout.readline()
+            if not line:
+                raise RuntimeError(f"{mode} worker {child.pid} exited before loading the models")
+            loads.append(json.loads(line))
+        # Only measured once every process is up, so shared pages are counted as shared
+        rollups = [read_rollup(child.pid) for child in children]
+        artifacts = [read_artifact_mappings(child.pid) for child in children]
+    finally:
+        for child in children:
+            child.stdin.close()
+            child.wait()
+
+    def mean(values):
+        return round(sum(values) / len(values) / 1024, 2)
+
+    return {
+        'processes': n_processes,
+        'per_process_mb': {
+            'rss': mean([r['rss_kb'] for r in rollups]),
+            'pss': mean([r['pss_kb'] for r in rollups]),
+            'shared': mean([r['shared_kb'] for r in rollups]),
+            'unique': mean([r['private_kb'] for r in rollups]),
+        },
+        # What loading the models added to each process, and how much of it is unique
+        'model_load_mb': {
+            'rss': mean([l['after']['rss_kb'] - l['before']['rss_kb'] for l in loads]),
+            'unique': mean([l['after']['private_kb'] - l['before']['private_kb'] for l in loads]),
+        },
+        'artifact_mappings_mb': {
+            'rss': mean([a['rss_kb'] for a in artifacts]),
+            'pss': mean([a['pss_kb'] for a in artifacts]),
+            'shared': mean([a['shared_kb'] for a in artifacts]),
+            'unique': mean([a['private_kb'] for a in artifacts]),
+        },
+        'total_unique_mb': round(sum(r['private_kb'] for r in rollups) / 1024, 2),
+        'total_pss_mb': round(sum(r['pss_kb'] for r in rollups) / 1024, 2),
+    }
+
+
+def main():
+    args = parse_args()
+    if not os.path.exists('/proc/self/smaps_rollup'):
+        print("❌ memory_report.py needs Linux /proc/<pid>/smaps_rollup")
+        sys.exit(1)
+
+    report = {}
+    for mode in args.modes:
+        print(f"📏 Measuring {mode} with {args.processes} processes...", file=sys.stderr)
+        report[mode] = measure_mode(mode, max(1, args.processes))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
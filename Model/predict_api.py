@@ -2,82 +2,128 @@
 """
 API script for thunderstorm prediction
 Reads JSON from stdin and outputs prediction results
+
+Usage: python3 predict_api.py [--engine compiled|sklearn] [--stream]
+
+With --stream the model is loaded once and every stdin line is a JSON
+request ({"id": ..., <features>} or {"id": ..., "parameters": {...}});
+one JSON result line carrying the same id is written per request.
 """
 
 import sys
 import json
+import argparse
 import numpy as np
-import joblib
 import os
 
+from thundercast import ENGINES, load_model_data, select_engine
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Thunderstorm prediction from JSON on stdin')
+    parser.add_argument('--engine', choices=ENGINES, default=None,
+                        help='Inference engine (default: $INFERENCE_ENGINE, then compiled)')
+    parser.add_argument('--stream', action='store_true',
+                        help='Serve newline-delimited JSON requests until stdin closes')
+    return parser.parse_args()
+
+def load_model(engine=None):
+    model_path = os.path.join(os.path.dirname(__file__), 'thunderstorm_model.joblib')
+    model_data = load_model_data(model_path, engine)
+
+    model = select_engine(model_data['model'], engine)
+    scaler = model_data['scaler']
+    feature_names = model_data['feature_names']
+    return model, scaler, feature_names
+
+def predict(model, scaler, feature_names, input_data):
+    # Prepare input array in correct order
+    input_array = np.array([[input_data[feature] for feature in feature_names]])
+
+    # Scale input (exported serving artifacts have the scaler folded in)
+    input_scaled = scaler.transform(input_array) if scaler is not None else input_array
+
+    # Make prediction
+    prediction_binary = model.predict(input_scaled)[0]
+    prediction_proba = model.predict_proba(input_scaled)[0]
+
+    # Get probability of thunderstorm (class 1)
+    thunderstorm_probability = prediction_proba[1] if len(prediction_proba) > 1 else prediction_proba[0]
+
+    # Calculate confidence
+    confidence = max(prediction_proba) * 100
+
+    # Determine risk level
+    if thunderstorm_probability >= 0.75:
+        risk_level = "Red"
+        alert = f"SEVERE: {thunderstorm_probability*100:.1f}% thunderstorm probability"
+    elif thunderstorm_probability >= 0.50:
+        risk_level = "Yellow"
+        alert = f"MODERATE: {thunderstorm_probability*100:.1f}% thunderstorm probability"
+    elif thunderstorm_probability >= 0.25:
+        risk_level = "Yellow"
+        alert = f"LOW-MODERATE: {thunderstorm_probability*100:.1f}% thunderstorm risk"
+    else:
+        risk_level = "Green"
+        alert = f"LOW: {thunderstorm_probability*100:.1f}% thunderstorm risk"
+
+    return {
+        'prediction': int(prediction_binary),
+        'probability': float(thunderstorm_probability),
+        'confidence': float(confidence),
+        'risk_level': risk_level,
+        'riskLevel': risk_level,
+        'alert': alert,
+        'model_info': {
+            'type': 'Random Forest Classifier',
+            'version': '1.0'
+        }
+    }
+
+def error_result(e):
+    return {
+        'error': str(e),
+        'prediction': 0,
+        'probability': 0.0,
+        'confidence': 0.0,
+        'risk_level': 'Error',
+        'alert': f'Prediction failed: {str(e)}'
+    }
+
+def stream(model, scaler, feature_names):
+    """Answer one NDJSON request per stdin line until EOF"""
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        request_id = None
+        try:
+            payload = json.loads(line)
+            request_id = payload.get('id')
+            input_data = payload.get('parameters', payload)
+            result = predict(model, scaler, feature_names, input_data)
+        except Exception as e:
+            result = error_result(e)
+        sys.stdout.write(json.dumps({'id': request_id, **result}) + '\n')
+        sys.stdout.flush()
+
 def main():
+    args = parse_args()
     try:
+        if args.stream:
+            # Load model once for the lifetime of the process
+            model, scaler, feature_names = load_model(args.engine)
+            stream(model, scaler, feature_names)
+            return
+
         # Read input from stdin
         input_data = json.loads(sys.stdin.read())
-        
+
         # Load model
-        model_path = os.path.join(os.path.dirname(__file__), 'thunderstorm_model.joblib')
-        model_data = joblib.load(model_path)
-        
-        model = model_data['model']
-        scaler = model_data['scaler']
-        feature_names = model_data['feature_names']
-        
-        # Prepare input array in correct order
-        input_array = np.array([[input_data[feature] for feature in feature_names]])
-        
-        # Scale input
-        input_scaled = scaler.transform(input_array)
-        
-        # Make prediction
-        prediction_binary = model.predict(input_scaled)[0]
-        prediction_proba = model.predict_proba(input_scaled)[0]
-        
-        # Get probability of thunderstorm (class 1)
-        thunderstorm_probability = prediction_proba[1] if len(prediction_proba) > 1 else prediction_proba[0]
-        
-        # Calculate confidence
-        confidence = max(prediction_proba) * 100
-        
-        # Determine risk level
-        if thunderstorm_probability >= 0.75:
-            risk_level = "Red"
-            alert = f"SEVERE: {thunderstorm_probability*100:.1f}% thunderstorm probability"
-        elif thunderstorm_probability >= 0.50:
-            risk_level = "Yellow"
-            alert = f"MODERATE: {thunderstorm_probability*100:.1f}% thunderstorm probability"
-        elif thunderstorm_probability >= 0.25:
-            risk_level = "Yellow"
-            alert = f"LOW-MODERATE: {thunderstorm_probability*100:.1f}% thunderstorm risk"
-        else:
-            risk_level = "Green"
-            alert = f"LOW: {thunderstorm_probability*100:.1f}% thunderstorm risk"
-        
-        result = {
-            'prediction': int(prediction_binary),
-            'probability': float(thunderstorm_probability),
-            'confidence': float(confidence),
-            'risk_level': risk_level,
-            'riskLevel': risk_level,
-            'alert': alert,
-            'model_info': {
-                'type': 'Random Forest Classifier',
-                'version': '1.0'
-            }
-        }
-        
-        print(json.dumps(result))
-        
+        model, scaler, feature_names = load_model(args.engine)
+
+        print(json.dumps(predict(model, scaler, feature_names, input_data)))
+
     except Exception as e:
-        error_result = {
-            'error': str(e),
-            'prediction': 0,
-            'probability': 0.0,
-            'confidence': 0.0,
-            'risk_level': 'Error',
-            'alert': f'Prediction failed: {str(e)}'
-        }
-        print(json.dumps(error_result))
+        print(json.dumps(error_result(e)))
         sys.exit(1)
 
 if __name__ == "__main__":
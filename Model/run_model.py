@@ -0,0 +1,653 @@
+#!/usr/bin/env python3
+"""
+Prediction daemon for the thunderstorm and windspeed models
+
+The master process loads both model artifacts once, binds a Unix domain
+socket and forks worker processes that inherit the models copy-on-write.
+Clients keep a connection open and exchange length-prefixed frames: a
+4-byte big-endian length followed by a JSON object (or msgpack, when the
+msgpack package is installed). Replies use the encoding of the request.
+
+Requests:
+    {"id": 1, "model": "thunderstorm", "parameters": {...}}
+    {"id": 2, "model": "windspeed", "parameters": {...}}
+    {"op": "health"}
+
+Signals (to the master): SIGHUP reloads the models and replaces the workers
+gracefully; SIGTERM/SIGINT shut down after in-flight requests finish.
+
+The score command rescores an archive CSV in fixed-size chunks on a process
+pool, appending results in input order. A sidecar <output>.progress.json
+records the last completed chunk so an interrupted run can --resume.
+
+Usage:
+    python3 run_model.py serve [--socket PATH] [--workers N] [--engine compiled|sklearn]
+    python3 run_model.py health [--socket PATH]
+    python3 run_model.py score --input CSV --output CSV [--model thunderstorm|windspeed]
+                               [--chunk-rows 50000] [--workers N] [--keep COLUMN ...] [--resume]
+"""
+
+import sys
+import json
+import argparse
+import errno
+import gc
+import os
+import selectors
+import signal
+import socket
+import struct
+import time
+import traceback
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.sharedctypes import RawArray
+
+import numpy as np
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+import predict_api
+import windspeed_predict_api
+from thundercast import (
+    ENGINES, RISK_LEVELS, RISK_THRESHOLDS, WIND_CATEGORIES, WIND_THRESHOLDS, ThunderstormPredictor, WindspeedPredictor,
+    threshold_bands
+)
+
+DEFAULT_SOCKET = os.environ.get('THUNDERCAST_SOCKET', '/tmp/thundercast.sock')
+FRAME_HEADER = struct.Struct('>I')
+MAX_FRAME_BYTES = 16 * 1024 * 1024
+# Unsent reply bytes per connection before the worker stops reading that client's requests
+MAX_PENDING_REPLY_BYTES = 1024 * 1024
+# Seconds a stopping worker keeps flushing queued replies
+SHUTDOWN_FLUSH_S = 5.0
+
+# Per-worker slots in shared memory: pid, requests, errors, connections
+SLOT_FIELDS = ('pid', 'requests', 'errors', 'connections')
+# accept() failures that leave the listener usable: the client gave up, or descriptors/buffers ran out for now
+TRANSIENT_ACCEPT_ERRORS = (errno.ECONNABORTED, errno.EPROTO, errno.EMFILE, errno.ENFILE, errno.ENOBUFS, errno.ENOMEM)
+
+MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
+SCORERS = {
+    'thunderstorm': (ThunderstormPredictor, 'thunderstorm_model.joblib'),
+    'windspeed': (WindspeedPredictor, 'windspeed_model.joblib'),
+}
+
+
+def encode_frame(payload, use_msgpack=False):
+    body = msgpack.packb(payload) if use_msgpack else json.dumps(payload).encode('utf-8')
+    return FRAME_HEADER.pack(len(body)) + body
+
+
+def decode_body(body):
+    """Decode a frame body; returns (payload, is_msgpack)"""
+    if body[:1] in (b'{', b'[', b' ') or msgpack is None:
+        return json.loads(body), False
+    return msgpack.unpackb(body, raw=False), True
+
+
+def request(payload, socket_path=DEFAULT_SOCKET, timeout=5.0):
+    """Send one request over a fresh connection and return the reply (for probes and scripts)"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(socket_path)
+        client.sendall(encode_frame(payload))
+        header = _recv_exact(client, FRAME_HEADER.size)
+        return json.loads(_recv_exact(client, FRAME_HEADER.unpack(header)[0]))
+
+
+def _recv_exact(sock, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError('Connection closed by daemon')
+        data.extend(chunk)
+    return bytes(data)
+
+
+def load_models(engine):
+    models = {}
+    for name, api in (('thunderstorm', predict_api), ('windspeed', windspeed_predict_api)):
+        try:
+            models[name] = (api, api.load_model(engine))
+            print(f"✅ {name.capitalize()} model loaded successfully!", flush=True)
+        except Exception as e:
+            print(f"❌ Error loading {name} model: {e}", flush=True)
+    return models
+
+
+class Worker:
+    """One forked worker: multiplexes persistent client connections with selectors"""
+
+    def __init__(self, slot, listener, models, counters, generation):
+        self.slot = slot
+        self.listener = listener
+        self.models = models
+        self.counters = counters
+        self.generation = generation
+        self.stopping = False
+        self.buffers = {}
+        self.outboxes = {}
+
+    def _count(self, field, amount=1):
+        self.counters[self.slot * len(SLOT_FIELDS) + SLOT_FIELDS.index(field)] += amount
+
+    def _stop(self, signum, frame):
+        self.stopping = True
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        # Ctrl-C reaches the whole process group; the master coordinates shutdown
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+        base = self.slot * len(SLOT_FIELDS)
+        self.counters[base:base + len(SLOT_FIELDS)] = [os.getpid(), 0, 0, 0]
+
+        selector = selectors.DefaultSelector()
+        self.listener.setblocking(False)
+        selector.register(self.listener, selectors.EVENT_READ, None)
+
+        while not self.stopping:
+            for key, mask in selector.select(timeout=0.5):
+                if key.data is None:
+                    self._accept(selector)
+                    continue
+                if mask & selectors.EVENT_WRITE:
+                    self._serve(selector, key.fileobj)
+                if mask & selectors.EVENT_READ and key.fileobj in self.buffers:
+                    self._read(selector, key.fileobj)
+
+        self._drain(selector)
+        for conn in list(self.buffers):
+            conn.close()
+
+    def _accept(self, selector):
+        try:
+            conn, _ = self.listener.accept()
+        except (BlockingIOError, InterruptedError):
+            # Another worker won the race for this connection
+            return
+        except OSError as e:
+            if e.errno not in TRANSIENT_ACCEPT_ERRORS:
+                raise
+            self._count('errors')
+            if e.errno != errno.ECONNABORTED:
+                # Out of descriptors or memory: the listener stays readable, so back off instead of spinning
+                time.sleep(0.05)
+            return
+        # Non-blocking: a client that stops reading must not stall the other connections
+        conn.setblocking(False)
+        self.buffers[conn] = bytearray()
+        self.outboxes[conn] = bytearray()
+        selector.register(conn, selectors.EVENT_READ, 'client')
+        self._count('connections')
+
+    def _close(self, selector, conn):
+        selector.unregister(conn)
+        self.buffers.pop(conn, None)
+        self.outboxes.pop(conn, None)
+        conn.close()
+
+    def _read(self, selector, conn):
+        try:
+            chunk = conn.recv(65536)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            chunk = b''
+        if not chunk:
+            self._close(selector, conn)
+            return
+        self.buffers[conn].extend(chunk)
+        self._serve(selector, conn)
+
+    def _serve(self, selector, conn):
+        """Answer the complete frames buffered for conn, then send what the socket accepts"""
+        buffer = self.buffers[conn]
+        outbox = self.outboxes[conn]
+        while len(buffer) >= FRAME_HEADER.size and len(outbox) < MAX_PENDING_REPLY_BYTES:
+            size = FRAME_HEADER.unpack_from(buffer)[0]
+            if size > MAX_FRAME_BYTES:
+                self._close(selector, conn)
+                return
+            if len(buffer) < FRAME_HEADER.size + size:
+                break
+            body = bytes(buffer[FRAME_HEADER.size:FRAME_HEADER.size + size])
+            del buffer[:FRAME_HEADER.size + size]
+            outbox.extend(self._handle(body))
+        self._flush(selector, conn)
+
+    def _flush(self, selector, conn):
+        outbox = self.outboxes[conn]
+        try:
+            while outbox:
+                sent = conn.send(outbox)
+                del outbox[:sent]
+        except (BlockingIOError, InterruptedError):
+            pass
+        except OSError:
+            self._close(selector, conn)
+            return
+        # Wait for EVENT_WRITE while replies are queued; stop reading a client that does not read its replies
+        events = selectors.EVENT_WRITE if outbox else 0
+        if len(outbox) < MAX_PENDING_REPLY_BYTES and not self.stopping:
+            events |= selectors.EVENT_READ
+        if events and selector.get_key(conn).events != events:
+            selector.modify(conn, events, 'client')
+
+    def _drain(self, selector):
+        """Flush queued replies for up to SHUTDOWN_FLUSH_S; requests not yet answered are dropped"""
+        selector.unregister(self.listener)
+        for conn in list(self.buffers):
+            if self.outboxes[conn]:
+                selector.modify(conn, selectors.EVENT_WRITE, 'client')
+            else:
+                self._close(selector, conn)
+        deadline = time.monotonic() + SHUTDOWN_FLUSH_S
+        while self.buffers and time.monotonic() < deadline:
+            for key, _ in selector.select(timeout=0.1):
+                self._flush(selector, key.fileobj)
+                if key.fileobj in self.outboxes and not self.outboxes[key.fileobj]:
+                    self._close(selector, key.fileobj)
+
+    def _handle(self, body):
+        use_msgpack = False
+        request_id = None
+        try:
+            payload, use_msgpack = decode_body(body)
+            request_id = payload.get('id')
+            if payload.get('op') == 'health':
+                reply = {'id': request_id, 'success': True, 'data': self._health()}
+            else:
+                reply = {'id': request_id, 'success': True, 'data': self._predict(payload)}
+        except Exception as e:
+            self._count('errors')
+            reply = {'id': request_id, 'success': False, 'error': str(e)}
+        self._count('requests')
+        return encode_frame(reply, use_msgpack)
+
+    def _predict(self, payload):
+        name = payload.get('model', 'thunderstorm')
+        if name not in self.models:
+            raise ValueError(f"Model '{name}' is not available")
+        api, (model, scaler, feature_names) = self.models[name]
+        return api.predict(model, scaler, feature_names, payload.get('parameters', {}))
+
+    def _health(self):
+        workers = []
+        for slot in range(len(self.counters) // len(SLOT_FIELDS)):
+            values = self.counters[slot * len(SLOT_FIELDS):(slot + 1) * len(SLOT_FIELDS)]
+            if values[0]:
+                workers.append({'slot': slot, **dict(zip(SLOT_FIELDS, values))})
+        return {
+            'status': 'OK',
+            'worker_pid': os.getpid(),
+            'generation': self.generation,
+            'models': {name: name in self.models for name in ('thunderstorm', 'windspeed')},
+            'workers': workers,
+        }
+
+
+class Master:
+    """Owns the socket and models; forks, supervises and replaces workers"""
+
+    def __init__(self, socket_path, n_workers, engine):
+        self.socket_path = socket_path
+        self.n_workers = n_workers
+        self.engine = engine
+        self.generation = 0
+        self.workers = {}
+        self.running = True
+        self.reload_requested = False
+        # Two generations can overlap during a graceful reload
+        self.counters = RawArray('Q', 2 * n_workers * len(SLOT_FIELDS))
+
+    def _bind(self):
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(self.socket_path)
+        listener.listen(1024)
+        return listener
+
+    def _spawn(self, slot):
+        pid = os.fork()
+        if pid == 0:
+            # The child must never return into its copy of serve(): that would signal the
+            # sibling workers and unlink the shared socket on the way out
+            exit_code = 1
+            try:
+                Worker(slot, self.listener, self.models, self.counters, self.generation).run()
+                exit_code = 0
+            except BaseException as e:
+                print(f"❌ Worker {os.getpid()} crashed: {e!r}", flush=True)
+                traceback.print_exc()
+            finally:
+                os._exit(exit_code)
+        self.workers[pid] = (slot, self.generation)
+
+    def _start_generation(self):
+        self.generation += 1
+        self.models = load_models(self.engine)
+        # Keep the loaded models out of the cyclic GC so children do not dirty their pages
+        gc.collect()
+        gc.freeze()
+        # Alternate between the two slot banks so old and new workers never share a slot
+        bank = (self.generation % 2) * self.n_workers
+        for slot in range(bank, bank + self.n_workers):
+            self._spawn(slot)
+
+    def _signal_workers(self, signum, generation=None):
+        for pid, (_, worker_generation) in self.workers.items():
+            if generation is None or worker_generation == generation:
+                try:
+                    os.kill(pid, signum)
+                except ProcessLookupError:
+                    pass
+
+    def _reap(self):
+        while self.workers:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            slot, generation = self.workers.pop(pid)
+            self.counters[slot * len(SLOT_FIELDS)] = 0
+            if self.running and generation == self.generation:
+                print(f"⚠️ Worker {pid} exited, restarting", flush=True)
+                self._spawn(slot)
+
+    def _on_stop(self, signum, frame):
+        self.running = False
+
+    def _on_reload(self, signum, frame):
+        self.reload_requested = True
+
+    def serve(self):
+        self.listener = self._bind()
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        signal.signal(signal.SIGHUP, self._on_reload)
+
+        self._start_generation()
+        print(f"🚀 Prediction daemon on {self.socket_path} with {self.n_workers} workers (pid {os.getpid()})", flush=True)
+
+        try:
+            while self.running:
+                if self.reload_requested:
+                    self.reload_requested = False
+                    previous = self.generation
+                    gc.unfreeze()
+                    self._start_generation()
+                    self._signal_workers(signal.SIGTERM, previous)
+                    print(f"🔄 Reloaded models (generation {self.generation})", flush=True)
+                self._reap()
+                time.sleep(0.2)
+        finally:
+            self._signal_workers(signal.SIGTERM)
+            while self.workers:
+                self._reap()
+                time.sleep(0.05)
+            self.listener.close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            print("👋 Prediction daemon stopped", flush=True)
+
+
+# Bulk scoring: one predictor per pool process, loaded by the initializer
+_scorer = None
+
+
+def load_scorer(model_name, engine=None):
+    predictor_class, filename = SCORERS[model_name]
+    return predictor_class(engine).load_model(os.path.join(MODEL_DIR, filename))
+
+
+def _init_scorer(model_name, engine):
+    global _scorer
+    # Forked children already inherit the parent's predictor
+    if _scorer is None:
+        _scorer = load_scorer(model_name, engine)
+
+
+def score_chunk(matrix):
+    """Output columns for one (N, features) chunk, same values as the API responses.
+
+    Rows with a missing, non-numeric or non-finite feature are not scored:
+    their outputs are left empty (NaN / '' / prediction -1) and 'error'
+    names the offending features. 'error' is '' for every scored row.
+    """
+    finite = np.isfinite(matrix)
+    valid = finite.all(axis=1)
+    scored = matrix[valid] if not valid.all() else matrix
+    errors = np.full(len(matrix), '', dtype=object)
+    for i in np.flatnonzero(~valid).tolist():
+        errors[i] = 'Invalid values: ' + ', '.join(
+            _scorer.feature_names[j] for j in np.flatnonzero(~finite[i]).tolist())
+
+    def scatter(values, missing):
+        if valid.all():
+            return values
+        out = np.full(len(matrix), missing, dtype=values.dtype)
+        out[valid] = values
+        return out
+
+    if isinstance(_scorer, ThunderstormPredictor):
+        if len(scored):
+            prediction, probability, confidence = _scorer.score_matrix(scored)
+        else:
+            prediction, probability, confidence = np.empty(0, np.int64), np.empty(0), np.empty(0)
+        # Same banding as ThunderstormPredictor.build_results
+        risk_levels = np.array(RISK_LEVELS, dtype=object)[threshold_bands(probability, RISK_THRESHOLDS)]
+        return {
+            'prediction': scatter(np.asarray(prediction).astype(np.int64), -1),
+            'probability': scatter(np.asarray(probability, dtype=np.float64), np.nan),
+            'confidence': scatter(np.asarray(confidence, dtype=np.float64), np.nan),
+            'risk_level': scatter(risk_levels, ''),
+            'error': errors,
+        }
+    windspeed = np.asarray(_scorer.score_matrix(scored), dtype=np.float64) if len(scored) else np.empty(0)
+    wind_categories = np.array(WIND_CATEGORIES, dtype=object)[threshold_bands(windspeed, WIND_THRESHOLDS)]
+    return {
+        'predicted_windspeed': scatter(windspeed, np.nan),
+        'wind_category': scatter(wind_categories, ''),
+        'error': errors,
+    }
+
+
+def chunk_matrix(chunk, feature_names, dtype):
+    """(N, features) matrix of a chunk; blank or non-numeric cells become NaN instead of failing the run"""
+    columns = []
+    for name in feature_names:
+        values = chunk[name]
+        if values.dtype.kind not in 'fiu':
+            import pandas as pd
+            values = pd.to_numeric(values, errors='coerce')
+        columns.append(values.to_numpy(dtype=np.float64, na_value=np.nan))
+    matrix = np.column_stack(columns) if columns else np.empty((len(chunk), 0))
+    # Values beyond float32 range become inf here and are then reported like NaN
+    with np.errstate(over='ignore'):
+        return matrix.astype(dtype, copy=False)
+
+
+def input_dtype(predictor):
+    """float32 when the model compares raw inputs in float32 anyway (bit-identical), else float64"""
+    dtype = getattr(predictor.model, 'input_dtype', None)
+    return np.float32 if predictor.scaler is None and dtype == np.float32 else np.float64
+
+
+def _read_progress(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _write_progress(path, progress):
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(progress, f)
+    os.replace(tmp, path)
+
+
+def bulk_score(input_path, output_path, model_name='thunderstorm', chunk_rows=50000, workers=1,
+               engine=None, keep=(), resume=False):
+    """Score input_path chunk by chunk into output_path; returns (rows this run, rows with errors, seconds)"""
+    import pandas as pd
+
+    global _scorer
+    _scorer = load_scorer(model_name, engine)
+    feature_names = _scorer.feature_names
+    dtype = input_dtype(_scorer)
+
+    progress_path = output_path + '.progress.json'
+    settings = {'input': os.path.abspath(input_path), 'model': model_name, 'chunk_rows': chunk_rows,
+                'keep': list(keep)}
+    progress = _read_progress(progress_path) if resume else None
+    if progress is not None:
+        if {key: progress.get(key) for key in settings} != settings:
+            raise ValueError(f"{progress_path} was written with different settings: "
+                             f"{ {key: progress.get(key) for key in settings} }")
+        if progress['complete']:
+            print(f"✅ {output_path} is already complete ({progress['rows_done']} rows)", flush=True)
+            return 0, 0, 0.0
+        # Drop anything written after the last checkpoint (a partially flushed chunk)
+        with open(output_path, 'r+b') as f:
+            f.truncate(progress['output_bytes'])
+        print(f"🔄 Resuming after chunk {progress['chunks_done']} ({progress['rows_done']} rows)", flush=True)
+    else:
+        progress = {**settings, 'chunks_done': 0, 'rows_done': 0, 'rows_failed': 0, 'output_bytes': 0,
+                    'complete': False}
+        open(output_path, 'w').close()
+
+    reader = pd.read_csv(
+        input_path, usecols=list(feature_names) + list(keep), chunksize=chunk_rows,
+        # Parse values exactly as float() would, like the JSON API; features are cast to the model's
+        # dtype afterwards, and a column holding text in some chunk is coerced there (see chunk_matrix)
+        float_precision='round_trip',
+    )
+
+    pool = ProcessPoolExecutor(workers, initializer=_init_scorer, initargs=(model_name, engine)) if workers > 1 else None
+    # At most two chunks per worker in flight keeps memory bounded whatever the file size
+    in_flight = deque()
+    max_in_flight = 2 * workers
+    started = time.perf_counter()
+    rows_scored = 0
+    rows_failed = 0
+
+    def write(chunk, columns):
+        nonlocal rows_scored, rows_failed
+        failed = columns['error'] != ''
+        out = pd.DataFrame({'row': np.arange(progress['rows_done'], progress['rows_done'] + len(chunk))})
+        for name in keep:
+            out[name] = chunk[name].to_numpy()
+        for name, values in columns.items():
+            if values.dtype.kind == 'i' and failed.any():
+                # Unscored rows get an empty cell, not the -1 placeholder of the integer column
+                values = pd.array(values, dtype='Int64')
+                values[failed] = pd.NA
+            out[name] = values
+        with open(output_path, 'a', newline='') as f:
+            out.to_csv(f, header=progress['output_bytes'] == 0, index=False)
+            f.flush()
+            os.fsync(f.fileno())
+            progress['output_bytes'] = f.tell()
+        progress['chunks_done'] += 1
+        progress['rows_done'] += len(chunk)
+        progress['rows_failed'] = progress.get('rows_failed', 0) + int(failed.sum())
+        _write_progress(progress_path, progress)
+        rows_scored += len(chunk)
+        rows_failed += int(failed.sum())
+        elapsed = time.perf_counter() - started
+        print(f"📦 Chunk {progress['chunks_done']}: {progress['rows_done']} rows "
+              f"({rows_scored / elapsed:,.0f} rows/s)", flush=True)
+
+    try:
+        for number, chunk in enumerate(reader):
+            # Chunk boundaries depend only on chunk_rows, so the chunks already written are skipped
+            # whole; they are parsed again but never held together, keeping resume memory bounded
+            if number < progress['chunks_done']:
+                continue
+            matrix = chunk_matrix(chunk, feature_names, dtype)
+            if pool is None:
+                write(chunk, score_chunk(matrix))
+                continue
+            in_flight.append((chunk, pool.submit(score_chunk, matrix)))
+            if len(in_flight) >= max_in_flight:
+                chunk, future = in_flight.popleft()
+                write(chunk, future.result())
+        while in_flight:
+            chunk, future = in_flight.popleft()
+            write(chunk, future.result())
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    progress['complete'] = True
+    _write_progress(progress_path, progress)
+    return rows_scored, rows_failed, time.perf_counter() - started
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Thundercast prediction daemon')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    serve = subparsers.add_parser('serve', help='Run the prediction daemon')
+    serve.add_argument('--socket', default=DEFAULT_SOCKET, help='Unix socket path')
+    serve.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes')
+    serve.add_argument('--engine', choices=ENGINES, default=None,
+                       help='Inference engine (default: $INFERENCE_ENGINE, then compiled)')
+
+    health = subparsers.add_parser('health', help='Probe a running daemon')
+    health.add_argument('--socket', default=DEFAULT_SOCKET, help='Unix socket path')
+
+    score = subparsers.add_parser('score', help='Score an archive CSV in chunks')
+    score.add_argument('--input', required=True, help='CSV with the model feature columns')
+    score.add_argument('--output', required=True, help='Output CSV (progress kept in OUTPUT.progress.json)')
+    score.add_argument('--model', choices=sorted(SCORERS), default='thunderstorm')
+    score.add_argument('--chunk-rows', type=int, default=50000, help='Rows per chunk')
+    score.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Scoring processes')
+    score.add_argument('--engine', choices=ENGINES, default=None,
+                       help='Inference engine (default: $INFERENCE_ENGINE, then compiled)')
+    score.add_argument('--keep', nargs='*', default=[], help='Input columns copied to the output (e.g. time_utc)')
+    score.add_argument('--resume', action='store_true', help='Continue after the last completed chunk')
+
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.command == 'serve':
+        Master(args.socket, max(1, args.workers), args.engine).serve()
+    elif args.command == 'health':
+        try:
+            print(json.dumps(request({'op': 'health'}, args.socket), indent=2))
+        except (OSError, ConnectionError) as e:
+            print(json.dumps({'status': 'DOWN', 'error': str(e)}))
+            sys.exit(1)
+    elif args.command == 'score':
+        try:
+            rows, failed, elapsed = bulk_score(args.input, args.output, args.model, max(1, args.chunk_rows),
+                                               max(1, args.workers), args.engine, args.keep, args.resume)
+        except (OSError, ValueError) as e:
+            print(f"❌ Scoring failed: {e}", flush=True)
+            sys.exit(1)
+        except KeyboardInterrupt:
+            print(f"⏹️ Interrupted; rerun with --resume to continue {args.output}", flush=True)
+            sys.exit(130)
+        if rows:
+            print(f"✅ Scored {rows} rows in {elapsed:.2f}s ({rows / elapsed:,.0f} rows/s) -> {args.output}", flush=True)
+        if failed:
+            print(f"⚠️ {failed} rows had missing or invalid features; see their 'error' column", flush=True)
+
+
+if __name__ == "__main__":
+    main()
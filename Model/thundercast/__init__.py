@@ -0,0 +1,57 @@
+"""
+Serving-side helpers for the Thundercast models.
+
+Only numpy is imported here; training-time dependencies (pandas,
+matplotlib, seaborn) stay in the training scripts.
+"""
+
+from .forest import (
+    DEFAULT_QUANTILES,
+    ENGINES,
+    RISK_THRESHOLDS,
+    CompiledForest,
+    predict_proba_anytime,
+    predict_with_contributions,
+    predict_with_spread,
+    select_engine,
+    threshold_bands,
+)
+from .export import export_model_data, load_model_data, served_artifact_path, serving_artifact_path
+from .features import RAW_WIND_FIELDS, StationFeatures, WindFeatureStore, WindForecastState, recursive_forecast
+from .predictors import (
+    RISK_LEVELS,
+    THUNDERSTORM_FEATURES,
+    WIND_CATEGORIES,
+    WIND_THRESHOLDS,
+    WINDSPEED_FEATURES,
+    ThunderstormPredictor,
+    WindspeedPredictor,
+)
+
+__all__ = [
+    'ENGINES',
+    'CompiledForest',
+    'select_engine',
+    'threshold_bands',
+    'predict_with_spread',
+    'predict_with_contributions',
+    'predict_proba_anytime',
+    'RISK_THRESHOLDS',
+    'DEFAULT_QUANTILES',
+    'export_model_data',
+    'load_model_data',
+    'served_artifact_path',
+    'serving_artifact_path',
+    'THUNDERSTORM_FEATURES',
+    'WINDSPEED_FEATURES',
+    'RISK_LEVELS',
+    'WIND_THRESHOLDS',
+    'WIND_CATEGORIES',
+    'ThunderstormPredictor',
+    'WindspeedPredictor',
+    'RAW_WIND_FIELDS',
+    'StationFeatures',
+    'WindFeatureStore',
+    'WindForecastState',
+    'recursive_forecast',
+]
@@ -0,0 +1,220 @@
+"""
+Export trained model artifacts into a scaler-free serving form.
+
+Tree splits only compare one feature against a threshold, and every step of
+StandardScaler.transform followed by the tree's float32 cast is monotone in
+the raw value. For each split there is therefore a largest raw float64 value
+that still goes left; export finds it by bisection over the float64 bit
+patterns and stores it as the new threshold. The exported CompiledForest
+compares raw float64 inputs against those thresholds and makes exactly the
+same decisions as scaler + forest, without the transform on the hot path.
+
+Export also checks which space the forest was actually fit in. A model fit
+on raw features (e.g. the thunderstorm model, trained on the unscaled
+``X_train`` DataFrame while a separately fitted scaler is saved next to it)
+is exported without the scaler, so serving matches training. Training
+records the space as ``input_space`` in the artifact; for older artifacts
+without it the space is detected. Loading a trained artifact drops the
+scaler of a raw-fit model as well, so every engine scores the same.
+"""
+
+import os
+
+import numpy as np
+
+from .forest import CompiledForest
+
+_SIGN_BIT = np.int64(np.iinfo(np.int64).min)
+_MAGNITUDE = np.int64(np.iinfo(np.int64).max)
+_FLOAT_MAX = np.finfo(np.float64).max
+
+INPUT_SPACES = ('auto', 'scaled', 'raw')
+
+
+def serving_artifact_path(model_path):
+    """Path of the exported serving artifact next to a trained model file"""
+    base, ext = os.path.splitext(model_path)
+    return f"{base}_serving{ext}"
+
+
+def _scaler_params(scaler, n_features):
+    mean = getattr(scaler, 'mean_', None)
+    scale = getattr(scaler, 'scale_', None)
+    mean = np.zeros(n_features) if mean is None or not getattr(scaler, 'with_mean', True) else np.asarray(mean, dtype=np.float64)
+    scale = np.ones(n_features) if scale is None or not getattr(scaler, 'with_std', True) else np.asarray(scale, dtype=np.float64)
+    return mean, scale
+
+
+def detect_input_space(model, scaler):
+    """Report whether a forest's thresholds live in raw or scaled feature units.
+
+    A model that recorded ``feature_names_in_`` was fit on a DataFrame, which
+    in these training scripts means the unscaled features. Otherwise the
+    thresholds decide: read as z-scores they should sit near zero when the
+    model saw scaled data, and near zero after standardising when it saw raw
+    data.
+    """
+    forest = model if isinstance(model, CompiledForest) else CompiledForest.from_sklearn(model)
+    split = forest.is_split
+    feature = forest.feature[split]
+    threshold = forest.threshold[split]
+    mean, scale = _scaler_params(scaler, forest.n_features_in_)
+
+    median_z_if_scaled = float(np.median(np.abs(threshold)))
+    median_z_if_raw = float(np.median(np.abs((threshold - mean[feature]) / scale[feature])))
+    fit_on_dataframe = hasattr(model, 'feature_names_in_')
+
+    if fit_on_dataframe or median_z_if_raw < median_z_if_scaled:
+        space = 'raw'
+    else:
+        space = 'scaled'
+
+    return {
+        'input_space': space,
+        'fit_on_dataframe': fit_on_dataframe,
+        'median_abs_z_if_scaled': round(median_z_if_scaled, 4),
+        'median_abs_z_if_raw': round(median_z_if_raw, 4),
+        'n_splits': int(split.sum()),
+    }
+
+
+def trained_input_space(model_data):
+    """(space, source) of a trained artifact: the space recorded at training, else detected"""
+    recorded = model_data.get('input_space')
+    if recorded in INPUT_SPACES[1:]:
+        return recorded, 'recorded'
+    if model_data.get('scaler') is None:
+        return 'raw', 'no_scaler'
+    return detect_input_space(model_data['model'], model_data['scaler'])['input_space'], 'detected'
+
+
+def _to_ordered(values):
+    # Map float64 bit patterns onto int64 so that integer order == float order
+    bits = values.view(np.int64)
+    return np.where(bits < 0, -(bits & _MAGNITUDE), bits)
+
+
+def _from_ordered(keys):
+    bits = np.where(keys < 0, (-keys) | _SIGN_BIT, keys)
+    return bits.view(np.float64)
+
+
+def fold_scaler_thresholds(forest, scaler):
+    """Rewrite scaled-unit thresholds into raw units with identical decisions.
+
+    Returns a CompiledForest that takes raw float64 features directly.
+    """
+    split = forest.is_split
+    feature = forest.feature[split]
+    mean, scale = _scaler_params(scaler, forest.n_features_in_)
+    mean, scale = mean[feature], scale[feature]
+    threshold = forest.threshold[split]
+
+    def goes_left(raw):
+        # Exactly StandardScaler.transform followed by the tree's float32 cast
+        with np.errstate(over='ignore', invalid='ignore'):
+            return ((raw - mean) / scale).astype(np.float32) <= threshold
+
+    n_splits = len(threshold)
+    lo = _to_ordered(np.full(n_splits, -_FLOAT_MAX))
+    hi = _to_ordered(np.full(n_splits, _FLOAT_MAX))
+    never_left = ~goes_left(_from_ordered(lo))
+    always_left = goes_left(_from_ordered(hi))
+
+    # Invariant: lo goes left, hi goes right; 64 halvings close any int64 gap
+    for _ in range(64):
+        mid = (lo >> 1) + (hi >> 1) + (lo & hi & 1)
+        left = goes_left(_from_ordered(mid))
+        lo = np.where(left, mid, lo)
+        hi = np.where(left, hi, mid)
+
+    raw_threshold = _from_ordered(lo)
+    raw_threshold[never_left] = -np.inf
+    raw_threshold[always_left] = np.inf
+
+    folded = forest.threshold.copy()
+    folded[split] = raw_threshold
+    return forest.with_thresholds(folded, np.float64)
+
+
+def export_model_data(model_data, input_space='auto'):
+    """Build a serving artifact: compiled forest in raw-feature units, no scaler.
+
+    ``input_space`` overrides detection with 'scaled' or 'raw'.
+    Returns (serving_model_data, report).
+    """
+    if input_space not in INPUT_SPACES:
+        raise ValueError(f"input_space must be one of {INPUT_SPACES}")
+
+    model = model_data['model']
+    scaler = model_data.get('scaler')
+    forest = model if isinstance(model, CompiledForest) else CompiledForest.from_sklearn(model)
+
+    report = {'scaler_saved': scaler is not None}
+    if scaler is None:
+        report['input_space'] = 'raw'
+        exported = forest
+    else:
+        report.update(detect_input_space(model, scaler))
+        report['input_space'], report['input_space_source'] = trained_input_space(model_data)
+        if input_space != 'auto':
+            report['input_space'], report['input_space_source'] = input_space, 'override'
+        # Fit on raw features but served through a scaler: training and serving disagree
+        report['scaler_mismatch'] = report['input_space'] == 'raw'
+        exported = fold_scaler_thresholds(forest, scaler) if report['input_space'] == 'scaled' else forest
+
+    serving_data = {
+        'model': exported,
+        'scaler': None,
+        'feature_names': list(model_data['feature_names']),
+        'performance': model_data.get('performance', {}),
+        'export_info': report,
+    }
+    return serving_data, report
+
+
+def export_model_file(model_path, output_path=None, input_space='auto'):
+    """Export a trained joblib artifact; returns (output_path, report)"""
+    import joblib
+
+    output_path = output_path or serving_artifact_path(model_path)
+    serving_data, report = export_model_data(joblib.load(model_path), input_space)
+    # Uncompressed so it can be memory-mapped; written aside and renamed so
+    # processes that currently map the old file never see a partial write
+    temp_path = f"{output_path}.tmp-{os.getpid()}"
+    joblib.dump(serving_data, temp_path)
+    os.replace(temp_path, output_path)
+    return output_path, report
+
+
+def served_artifact_path(model_path, engine=None):
+    """The file load_model_data reads for ``model_path``: the serving artifact for the compiled engine when it exists"""
+    engine = (engine or os.environ.get('INFERENCE_ENGINE') or 'compiled').lower()
+    serving_path = serving_artifact_path(model_path)
+    if engine == 'compiled' and os.path.exists(serving_path):
+        return serving_path
+    return model_path
+
+
+def load_model_data(model_path, engine=None, mmap=None):
+    """Load the artifact to serve ``model_path`` with the given engine.
+
+    The compiled engine prefers the exported serving artifact when it exists;
+    the sklearn engine always loads the trained model. A trained model fit on
+    raw features is returned without its scaler (see trained_input_space), so
+    both engines see the same inputs.
+    Serving artifacts are memory-mapped read-only unless ``mmap`` (default:
+    MODEL_MMAP environment variable, '1') is off, so every process on a host
+    shares one page-cache copy of the tree arrays instead of a private one.
+    """
+    import joblib
+
+    if mmap is None:
+        mmap = os.environ.get('MODEL_MMAP', '1') == '1'
+    path = served_artifact_path(model_path, engine)
+    if path != model_path:
+        return joblib.load(path, mmap_mode='r' if mmap else None)
+    model_data = joblib.load(model_path)
+    if model_data.get('scaler') is not None and trained_input_space(model_data)[0] == 'raw':
+        model_data = {**model_data, 'scaler': None}
+    return model_data
@@ -0,0 +1,247 @@
+"""
+Streaming windspeed features, computed incrementally per station.
+
+windspeed_prediction_model.py derives the lag and rolling features with
+pandas ``shift``/``rolling`` over a station's whole daily history. Here every
+station keeps one ring buffer of its recent WIND values and, per window, a
+running mean and sum of squared deviations updated in O(1) per day
+(Welford's update, extended to slide a value out of the window). The row
+produced after ingesting day t matches the training row for day t: the raw
+values of day t, WIND lags t-1..t-3, and mean/std (ddof=1) over the windows
+ending at t.
+"""
+
+import math
+import threading
+
+import numpy as np
+
+from .predictors import WINDSPEED_FEATURES
+
+RAW_WIND_FIELDS = ['WIND', 'IND', 'RAIN', 'IND.1', 'T.MAX', 'IND.2', 'T.MIN.G']
+EXOGENOUS_FEATURES = ['IND', 'RAIN', 'IND.1', 'T.MAX', 'IND.2', 'T.MIN.G']
+WIND_LAGS = (1, 2, 3)
+ROLLING_WINDOWS = (3, 5, 7)
+HISTORY_DAYS = max(max(WIND_LAGS) + 1, max(ROLLING_WINDOWS))
+
+
+class RollingWindow:
+    """Mean and sample standard deviation over the last ``size`` values"""
+
+    def __init__(self, size):
+        self.size = size
+        self._values = [0.0] * size
+        self._position = 0
+        self._count = 0
+        self._nonfinite = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._run = 0
+
+    def push(self, value):
+        value = float(value)
+        evicted = self._values[self._position] if self._count == self.size else None
+        # Length of the run of identical trailing values, like pandas' constant-window check
+        previous = self._values[self._position - 1] if self._count else None
+        self._run = self._run + 1 if value == previous else 1
+        self._values[self._position] = value
+        self._position = (self._position + 1) % self.size
+        if evicted is None:
+            self._count += 1
+
+        entering_bad = not math.isfinite(value)
+        leaving_bad = evicted is not None and not math.isfinite(evicted)
+        if entering_bad or leaving_bad or self._nonfinite:
+            self._nonfinite += entering_bad - leaving_bad
+            if not self._nonfinite:
+                self._recompute()
+            return
+
+        if evicted is None:
+            delta = value - self._mean
+            self._mean += delta / self._count
+            self._m2 += delta * (value - self._mean)
+        else:
+            # Slide: add value and drop evicted in one step
+            delta = value - evicted
+            mean = self._mean + delta / self.size
+            self._m2 += delta * (value - mean + evicted - self._mean)
+            self._mean = mean
+        if self._m2 < 0.0:
+            self._m2 = 0.0
+
+    def _recompute(self):
+        values = self._values[:self._count]
+        self._mean = sum(values) / len(values)
+        self._m2 = sum((value - self._mean) ** 2 for value in values)
+
+    @property
+    def ready(self):
+        return self._count == self.size and not self._nonfinite
+
+    @property
+    def mean(self):
+        if not self.ready:
+            return math.nan
+        return self._values[self._position - 1] if self._run >= self.size else self._mean
+
+    @property
+    def std(self):
+        if not self.ready:
+            return math.nan
+        if self._run >= self.size:
+            return 0.0
+        return math.sqrt(self._m2 / (self.size - 1))
+
+
+class StationFeatures:
+    """Feature state of one station, advanced one daily observation at a time"""
+
+    def __init__(self):
+        self.days = 0
+        # Newest first
+        self._winds = [math.nan] * HISTORY_DAYS
+        self._windows = {size: RollingWindow(size) for size in ROLLING_WINDOWS}
+        self._latest = {}
+
+    def update(self, observation):
+        """Ingest one day of raw values; returns the feature dict, or None while not ready"""
+        try:
+            # Missing values (null) advance the state but leave the day without features, as dropna() does
+            values = {field: math.nan if observation[field] is None else float(observation[field])
+                      for field in RAW_WIND_FIELDS}
+        except (TypeError, ValueError):
+            raise ValueError(f"Raw wind fields must be numeric: {RAW_WIND_FIELDS}")
+        wind = values['WIND']
+        self._winds = [wind] + self._winds[:-1]
+        for window in self._windows.values():
+            window.push(wind)
+        self._latest = values
+        self.days += 1
+        return self.features()
+
+    def features(self):
+        """Model features for the latest day (WINDSPEED_FEATURES keys), or None"""
+        if not self._latest:
+            return None
+        features = {name: self._latest[name] for name in EXOGENOUS_FEATURES}
+        for lag in WIND_LAGS:
+            features[f'wind_lag_{lag}'] = self._winds[lag]
+        for size, window in self._windows.items():
+            features[f'ma_{size}'] = window.mean
+        for size, window in self._windows.items():
+            features[f'std_{size}'] = window.std
+        # Same rule as the training script's dropna()
+        if not all(math.isfinite(value) for value in features.values()):
+            return None
+        return {name: features[name] for name in WINDSPEED_FEATURES}
+
+    def history(self):
+        """(last HISTORY_DAYS WIND values oldest first, latest exogenous values), or None while not ready"""
+        if self.features() is None:
+            return None
+        winds = self._winds[::-1]
+        return winds, [self._latest[name] for name in EXOGENOUS_FEATURES]
+
+
+class WindForecastState:
+    """Feature state of many stations at once, advanced in place with predicted WIND values.
+
+    Lags shift along one (stations, HISTORY_DAYS) array and every rolling
+    window's mean and squared-deviation sum slide with the same update as
+    RollingWindow, vectorized across stations. Raw inputs other than WIND are
+    held at their last observed values.
+    """
+
+    def __init__(self, histories, exogenous):
+        self.winds = np.array(histories, dtype=np.float64).reshape(-1, HISTORY_DAYS)
+        self.exogenous = np.array(exogenous, dtype=np.float64).reshape(len(self.winds), len(EXOGENOUS_FEATURES))
+        self.mean = {}
+        self.m2 = {}
+        for size in ROLLING_WINDOWS:
+            window = self.winds[:, -size:]
+            self.mean[size] = window.mean(axis=1)
+            self.m2[size] = ((window - self.mean[size][:, None]) ** 2).sum(axis=1)
+        # Trailing run of identical values, for the constant-window rule
+        same = self.winds[:, 1:] == self.winds[:, :-1]
+        self.run = np.ones(len(self.winds), dtype=np.intp)
+        for column in range(HISTORY_DAYS - 2, -1, -1):
+            extend = same[:, column] & (self.run == HISTORY_DAYS - 1 - column)
+            self.run[extend] += 1
+
+    def features(self):
+        """(stations, 15) feature matrix in WINDSPEED_FEATURES order"""
+        latest = self.winds[:, -1]
+        columns = {name: self.exogenous[:, j] for j, name in enumerate(EXOGENOUS_FEATURES)}
+        for lag in WIND_LAGS:
+            columns[f'wind_lag_{lag}'] = self.winds[:, -1 - lag]
+        for size in ROLLING_WINDOWS:
+            constant = self.run >= size
+            columns[f'ma_{size}'] = np.where(constant, latest, self.mean[size])
+            columns[f'std_{size}'] = np.where(constant, 0.0, np.sqrt(self.m2[size] / (size - 1)))
+        return np.column_stack([columns[name] for name in WINDSPEED_FEATURES])
+
+    def push(self, wind):
+        """Append one day with the given WIND per station"""
+        wind = np.asarray(wind, dtype=np.float64)
+        self.run = np.where(wind == self.winds[:, -1], self.run + 1, 1)
+        for size in ROLLING_WINDOWS:
+            evicted = self.winds[:, -size]
+            delta = wind - evicted
+            mean = self.mean[size] + delta / size
+            self.m2[size] = np.maximum(self.m2[size] + delta * (wind - mean + evicted - self.mean[size]), 0.0)
+            self.mean[size] = mean
+        self.winds[:, :-1] = self.winds[:, 1:]
+        self.winds[:, -1] = wind
+
+
+def recursive_forecast(score_fn, histories, exogenous, horizon):
+    """Predict WIND 1..horizon days ahead for many stations: one score_fn call per day.
+
+    score_fn maps a (stations, 15) feature matrix to next-day WIND values.
+    Returns a (stations, horizon) array.
+    """
+    state = WindForecastState(histories, exogenous)
+    forecast = np.empty((len(state.winds), horizon))
+    for step in range(horizon):
+        forecast[:, step] = score_fn(state.features())
+        state.push(forecast[:, step])
+    return forecast
+
+
+class WindFeatureStore:
+    """Thread-safe map of station id to StationFeatures"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stations = {}
+
+    def update(self, station_id, observation):
+        """Apply one daily observation; returns (features or None, days observed)"""
+        missing = [field for field in RAW_WIND_FIELDS if field not in observation]
+        if missing:
+            raise ValueError(f"Missing raw wind fields: {missing}")
+        with self._lock:
+            station = self._stations.setdefault(station_id, StationFeatures())
+            return station.update(observation), station.days
+
+    def features(self, station_id):
+        with self._lock:
+            station = self._stations.get(station_id)
+            return station.features() if station else None
+
+    def forecast_inputs(self, station_ids=None):
+        """(station ids, WIND histories, exogenous values) of the ready stations"""
+        with self._lock:
+            if station_ids is None:
+                station_ids = list(self._stations)
+            ready = [(station_id, self._stations[station_id].history())
+                     for station_id in station_ids if station_id in self._stations]
+        ready = [(station_id, history) for station_id, history in ready if history is not None]
+        return ([station_id for station_id, _ in ready],
+                [history[0] for _, history in ready],
+                [history[1] for _, history in ready])
+
+    def station_ids(self):
+        with self._lock:
+            return list(self._stations)
@@ -0,0 +1,442 @@
+"""
+Array-backed evaluation of fitted scikit-learn random forests.
+
+Every estimator's ``tree_`` is flattened into contiguous node arrays
+(feature, threshold, left/right child, node value) and a batch is pushed
+through all trees at once, one tree level per step. Leaves point back to
+themselves, so ``max_depth`` steps land every row on its leaf.
+
+Results match the source forest bit for bit: inputs are compared as float32
+against float64 thresholds like sklearn's tree code, per-tree class counts
+are normalised the same way, and trees are accumulated in estimator order
+before dividing by the number of trees.
+"""
+
+import os
+import warnings
+
+import numpy as np
+
+ENGINES = ('compiled', 'sklearn')
+
+# Rows evaluated per traversal pass; bounds the (n_trees, rows) index arrays
+CHUNK_ROWS = 8192
+
+# Below this many rows all tree outputs are summed in one vectorized call
+SMALL_BATCH_ROWS = 64
+
+# Per-tree quantiles reported by predict_with_spread
+DEFAULT_QUANTILES = (0.05, 0.5, 0.95)
+
+# Risk level boundaries on P(thunderstorm) (Green / Yellow low-moderate / Yellow moderate / Red)
+RISK_THRESHOLDS = (0.25, 0.5, 0.75)
+
+
+class CompiledForest:
+    """Drop-in predict/predict_proba replacement for a fitted RandomForest"""
+
+    def __init__(self, feature, threshold, children, value,
+                 roots, max_depth, n_features, classes=None, input_dtype=np.float32):
+        self.feature = np.ascontiguousarray(feature, dtype=np.intp)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float64)
+        # (n_nodes, 2): column 0 is the left child, column 1 the right child
+        self.children = np.ascontiguousarray(children, dtype=np.intp)
+        # (n_nodes, n_classes) class probabilities, or (n_nodes, 1) regression values
+        self.value = np.ascontiguousarray(value, dtype=np.float64)
+        self.roots = np.ascontiguousarray(roots, dtype=np.intp)
+        self.max_depth = int(max_depth)
+        self.n_features_in_ = int(n_features)
+        self.classes_ = None if classes is None else np.asarray(classes)
+        # float32 reproduces sklearn; thresholds rewritten by thundercast.export compare in float64
+        self.input_dtype = np.dtype(input_dtype)
+
+    @property
+    def is_classifier(self):
+        return self.classes_ is not None
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    @property
+    def is_split(self):
+        """Boolean mask of internal (split) nodes"""
+        return self.children[:, 0] != np.arange(self.n_nodes)
+
+    def with_thresholds(self, threshold, input_dtype):
+        """Copy of this forest with new split thresholds and input precision"""
+        return type(self)(
+            feature=self.feature,
+            threshold=threshold,
+            children=self.children,
+            value=self.value,
+            roots=self.roots,
+            max_depth=self.max_depth,
+            n_features=self.n_features_in_,
+            classes=self.classes_,
+            input_dtype=input_dtype,
+        )
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """Flatten a fitted RandomForestClassifier/RandomForestRegressor"""
+        estimators = getattr(model, 'estimators_', None)
+        if not estimators or not all(hasattr(estimator, 'tree_') for estimator in estimators):
+            raise TypeError(f"{type(model).__name__} is not a fitted tree ensemble")
+        if getattr(model, 'n_outputs_', 1) != 1:
+            raise TypeError("Only single-output forests are supported")
+
+        classes = getattr(model, 'classes_', None)
+        features, thresholds, children, values, roots = [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in estimators:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(n_nodes)
+            is_leaf = tree.children_left < 0
+
+            # Leaves loop back to themselves so extra traversal steps are no-ops
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            children.append(np.stack([
+                np.where(is_leaf, node_ids, tree.children_left),
+                np.where(is_leaf, node_ids, tree.children_right),
+            ], axis=1) + offset)
+
+            if classes is not None:
+                # Same normalisation as DecisionTreeClassifier.predict_proba
+                proba = tree.value[:, 0, :len(classes)].astype(np.float64)
+                normalizer = proba.sum(axis=1)[:, np.newaxis]
+                normalizer[normalizer == 0.0] = 1.0
+                values.append(proba / normalizer)
+            else:
+                values.append(tree.value[:, 0, :1].astype(np.float64))
+
+            roots.append(offset)
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            children=np.concatenate(children),
+            value=np.concatenate(values),
+            roots=roots,
+            max_depth=max_depth,
+            n_features=model.n_features_in_,
+            classes=classes,
+        )
+
+    def _spread_tables(self):
+        """Per-node lookup tables for predict_with_spread, built on first use"""
+        tables = self.__dict__.get('_spread_cache')
+        if tables is None:
+            # Distinct last-column outputs (P(positive class) / regression value) and each node's rank among them
+            target_values, target_rank = np.unique(self.value[:, -1], return_inverse=True)
+            rank_dtype = np.uint16 if len(target_values) <= np.iinfo(np.uint16).max else np.intp
+            # A tree votes for the last class when it beats every other class (ties go to the first)
+            last_class_wins = (self.value[:, -1] > self.value[:, :-1].max(axis=1)) if self.is_classifier else None
+            tables = (target_values, target_rank.reshape(-1).astype(rank_dtype), last_class_wins)
+            self.__dict__['_spread_cache'] = tables
+        return tables
+
+    def _contribution_tables(self):
+        """(bias per tree, per-node path contributions) for predict_with_contributions, built on first use"""
+        tables = self.__dict__.get('_contribution_cache')
+        if tables is None:
+            target = self.value[:, -1]
+            # Row n: summed change of the target output along the path from the root to node n, per split feature
+            path = np.zeros((self.n_nodes, self.n_features_in_), dtype=np.float64)
+            frontier = self.roots
+            for _ in range(self.max_depth):
+                frontier = frontier[self.is_split[frontier]]
+                for side in (0, 1):
+                    child = self.children[frontier, side]
+                    path[child] = path[frontier]
+                    path[child, self.feature[frontier]] += target[child] - target[frontier]
+                frontier = self.children[frontier].ravel()
+            tables = (target[self.roots], path)
+            self.__dict__['_contribution_cache'] = tables
+        return tables
+
+    def _output_ranges(self):
+        """Smallest and largest last-column leaf output of each tree, for predict_proba_anytime"""
+        ranges = self.__dict__.get('_range_cache')
+        if ranges is None:
+            target = self.value[:, -1]
+            leaf = ~self.is_split
+            ranges = (np.minimum.reduceat(np.where(leaf, target, np.inf), self.roots),
+                      np.maximum.reduceat(np.where(leaf, target, -np.inf), self.roots))
+            self.__dict__['_range_cache'] = ranges
+        return ranges
+
+    def _validate(self, X):
+        X = np.asarray(X)
+        if X.ndim != 2:
+            raise ValueError(f"Expected a 2D array, got {X.ndim}D")
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has {X.shape[1]} features, but the model expects {self.n_features_in_}")
+        # sklearn trees compare float32 inputs against float64 thresholds
+        X = np.ascontiguousarray(X, dtype=self.input_dtype)
+        if not np.isfinite(X).all():
+            raise ValueError("Input X contains NaN or infinity")
+        return X
+
+    def _apply(self, X, roots):
+        n_samples, n_features = X.shape
+        node = np.repeat(roots[:, np.newaxis], n_samples, axis=1)
+        flat = X.ravel()
+        row_offset = np.arange(n_samples) * n_features
+        for _ in range(self.max_depth):
+            go_right = flat[row_offset + self.feature[node]] > self.threshold[node]
+            node = self.children[node, go_right.view(np.int8)]
+        return node
+
+    def apply(self, X):
+        """Global leaf node index per (tree, row), shape (n_estimators, n_samples)"""
+        return self._apply(self._validate(X), self.roots)
+
+    def tree_outputs(self, X):
+        """Per-tree outputs, shape (n_estimators, n_samples, n_values)"""
+        X = self._validate(X)
+        return np.concatenate(
+            [self.value[self._apply(X[start:start + CHUNK_ROWS], self.roots)]
+             for start in range(0, max(len(X), 1), CHUNK_ROWS)],
+            axis=1,
+        )
+
+    def _accumulate(self, leaves):
+        # Trees must be summed in estimator order to reproduce sklearn exactly;
+        # np.sum may switch to pairwise summation, cumsum and += never do
+        if leaves.shape[1] < SMALL_BATCH_ROWS:
+            return np.cumsum(self.value[leaves], axis=0)[-1]
+        total = np.zeros((leaves.shape[1], self.value.shape[1]), dtype=np.float64)
+        for tree_leaves in leaves:
+            total += self.value[tree_leaves]
+        return total
+
+    def _mean_output(self, X):
+        X = self._validate(X)
+        out = np.empty((len(X), self.value.shape[1]), dtype=np.float64)
+        for start in range(0, len(X), CHUNK_ROWS):
+            out[start:start + CHUNK_ROWS] = self._accumulate(self._apply(X[start:start + CHUNK_ROWS], self.roots))
+        out /= self.n_estimators
+        return out
+
+    def predict_proba(self, X):
+        if not self.is_classifier:
+            raise AttributeError("predict_proba is only available for classifiers")
+        return self._mean_output(X)
+
+    def predict(self, X):
+        if self.is_classifier:
+            return self.classes_.take(np.argmax(self._mean_output(X), axis=1), axis=0)
+        return self._mean_output(X)[:, 0]
+
+
+def _quantiles(sorted_rows, quantiles):
+    # np.quantile's default 'linear' method on rows that are already sorted
+    n = sorted_rows.shape[1]
+    position = np.asarray(quantiles, dtype=np.float64) * (n - 1)
+    below = np.floor(position).astype(np.intp)
+    above = np.minimum(below + 1, n - 1)
+    weight = position - below
+    low, high = sorted_rows[:, below], sorted_rows[:, above]
+    difference = high - low
+    # Same two-sided interpolation numpy uses to stay exact at the endpoints
+    return np.where(weight >= 0.5, high - difference * (1 - weight), low + difference * weight)
+
+
+def _spread(per_row, votes, quantiles):
+    # per_row: (n_samples, n_trees) per-tree P(positive class) or regression value, sorted per row
+    spread = {
+        'std': per_row.std(axis=1),
+        'quantiles': _quantiles(per_row, quantiles),
+    }
+    if votes is not None:
+        spread['vote_fraction'] = votes.mean(axis=0)
+    return spread
+
+
+def predict_with_spread(model, X, quantiles=DEFAULT_QUANTILES):
+    """Mean output and the spread of the per-tree outputs behind it.
+
+    Returns (mean, spread). ``mean`` equals predict_proba (classifiers) or
+    predict (regressors, shape (n_samples, 1)); ``spread`` has per-row
+    ``std`` and ``quantiles`` (n_samples, len(quantiles)) of the per-tree
+    positive-class probability or regression value and, for classifiers,
+    ``vote_fraction``: the share of trees whose own prediction is the last
+    class. A CompiledForest gets everything from the one traversal that
+    produces the mean; sklearn forests are evaluated estimator by estimator.
+    """
+    if isinstance(model, CompiledForest):
+        X = model._validate(X)
+        target_values, target_rank, last_class_wins = model._spread_tables()
+        mean = np.empty((len(X), model.value.shape[1]), dtype=np.float64)
+        spreads = []
+        for start in range(0, max(len(X), 1), CHUNK_ROWS):
+            leaves = model._apply(X[start:start + CHUNK_ROWS], model.roots)
+            mean[start:start + CHUNK_ROWS] = model._accumulate(leaves)
+            # Sorting small integer ranks (radix sort) instead of floats, then mapping back
+            ranks = np.sort(np.ascontiguousarray(target_rank[leaves].T), axis=1, kind='stable')
+            votes = last_class_wins[leaves] if last_class_wins is not None else None
+            spreads.append(_spread(target_values[ranks], votes, quantiles))
+        mean /= model.n_estimators
+        return mean, {key: np.concatenate([spread[key] for spread in spreads]) for key in spreads[0]}
+
+    if hasattr(model, 'predict_proba'):
+        outputs = np.stack([estimator.predict_proba(X) for estimator in model.estimators_])
+        votes = np.argmax(outputs, axis=2) == outputs.shape[2] - 1
+    else:
+        outputs = np.stack([estimator.predict(X)[:, np.newaxis] for estimator in model.estimators_])
+        votes = None
+    mean = np.cumsum(outputs, axis=0)[-1] / len(outputs)
+    return mean, _spread(np.sort(outputs[:, :, -1].T, axis=1), votes, quantiles)
+
+
+def predict_with_contributions(model, X):
+    """Mean output and its tree-path decomposition into per-feature contributions.
+
+    Returns (mean, bias, contributions): ``mean`` as predict_with_spread,
+    ``bias`` (n_samples,) the mean root output and ``contributions``
+    (n_samples, n_features) the output changes along each row's decision
+    paths credited to the split features, averaged over trees. For the
+    positive-class probability (classifiers) or the regression value,
+    bias + contributions.sum(axis=1) equals the prediction up to rounding.
+    The per-node table is built once per forest, so explaining a batch is one
+    traversal plus one gather per tree. scikit-learn forests are compiled
+    first; callers serving many requests should keep the compiled forest.
+    """
+    if not isinstance(model, CompiledForest):
+        model = CompiledForest.from_sklearn(model)
+    X = model._validate(X)
+    root_values, path = model._contribution_tables()
+    mean = np.empty((len(X), model.value.shape[1]), dtype=np.float64)
+    contributions = np.zeros((len(X), model.n_features_in_), dtype=np.float64)
+    for start in range(0, len(X), CHUNK_ROWS):
+        leaves = model._apply(X[start:start + CHUNK_ROWS], model.roots)
+        mean[start:start + CHUNK_ROWS] = model._accumulate(leaves)
+        if leaves.shape[1] < SMALL_BATCH_ROWS:
+            contributions[start:start + CHUNK_ROWS] = path[leaves].sum(axis=0)
+        else:
+            chunk = contributions[start:start + CHUNK_ROWS]
+            for tree_leaves in leaves:
+                chunk += path[tree_leaves]
+    mean /= model.n_estimators
+    contributions /= model.n_estimators
+    bias = np.full(len(X), root_values.mean())
+    return mean, bias, contributions
+
+
+def threshold_bands(values, thresholds):
+    """Band index of each value over ascending thresholds: a value equal to a threshold is in the band above it"""
+    return np.searchsorted(thresholds, values, side='right')
+
+
+def predict_proba_anytime(model, X, thresholds=RISK_THRESHOLDS, chunk_trees=10, error_bound=0.01):
+    """predict_proba that stops adding trees once a row's risk band is settled.
+
+    Trees are evaluated in estimator order, ``chunk_trees`` at a time, for
+    the rows still undecided. After each chunk a row stops when the interval
+    its final P(positive class) can still lie in does not cross any of
+    ``thresholds``. The interval is the hard bound given by the remaining
+    trees' smallest and largest leaf outputs, narrowed with
+    ``error_bound > 0`` by a Hoeffding-Serfling interval on the running mean
+    of per-tree outputs (the trees of a forest are exchangeable, so the
+    first k are a sample without replacement of all of them). The interval
+    confidence is split over every checkpoint (union bound), so for each
+    row the chance that its band differs from full evaluation is at most
+    ``error_bound``, however many times it was checked. ``error_bound=0``
+    keeps only the hard bound, so bands always agree.
+
+    Returns (proba, trees_evaluated). Rows that ran every tree get exactly
+    predict_proba; stopped rows get the running mean of P(positive class),
+    clipped into the settled interval. That estimate is only as close to
+    full evaluation as the interval is wide: the guarantee is on the band.
+    Binary classifiers only.
+    """
+    if not isinstance(model, CompiledForest):
+        model = CompiledForest.from_sklearn(model)
+    if not model.is_classifier or len(model.classes_) != 2:
+        raise TypeError("Early-exit evaluation needs a binary classifier")
+    X = model._validate(X)
+    thresholds = np.sort(np.asarray(thresholds, dtype=np.float64))
+    n_trees = model.n_estimators
+    chunk_trees = max(2, int(chunk_trees))
+    tree_min, tree_max = model._output_ranges()
+    # Smallest / largest sum the trees from k onwards can still add
+    remaining_min = np.append(np.cumsum(tree_min[::-1])[::-1], 0.0)
+    remaining_max = np.append(np.cumsum(tree_max[::-1])[::-1], 0.0)
+    # Hoeffding-Serfling: P(|mean_k - mean_n| >= eps) <= 2 exp(-2 k eps^2 / ((1 - (k-1)/n) range^2)),
+    # each of the checkpoints before the last chunk getting error_bound / checkpoints
+    checkpoints = (n_trees - 1) // chunk_trees
+    if error_bound > 0 and checkpoints:
+        output_range = float(tree_max.max() - tree_min.min())
+        log_term = np.log(2 * checkpoints / error_bound)
+    else:
+        log_term = None
+
+    totals = np.zeros((len(X), model.value.shape[1]), dtype=np.float64)
+    trees_evaluated = np.full(len(X), n_trees, dtype=np.intp)
+    estimate = np.full(len(X), np.nan)
+    active = np.arange(len(X))
+
+    for start in range(0, n_trees, chunk_trees):
+        if not len(active):
+            break
+        stop = min(start + chunk_trees, n_trees)
+        leaves = model._apply(X[active], model.roots[start:stop])
+        # Summed per tree in estimator order, like _accumulate, so full rows match predict_proba
+        total = totals[active]
+        for tree_leaves in leaves:
+            total += model.value[tree_leaves]
+        totals[active] = total
+        if stop == n_trees:
+            break
+
+        observed = total[:, -1]
+        low = (observed + remaining_min[stop]) / n_trees
+        high = (observed + remaining_max[stop]) / n_trees
+        mean = observed / stop
+        if log_term is not None:
+            half_width = output_range * np.sqrt((1 - (stop - 1) / n_trees) * log_term / (2 * stop))
+            low = np.maximum(low, mean - half_width)
+            high = np.minimum(high, mean + half_width)
+        settled = threshold_bands(low, thresholds) == threshold_bands(high, thresholds)
+        done = active[settled]
+        trees_evaluated[done] = stop
+        estimate[done] = np.clip(mean[settled], low[settled], high[settled])
+        active = active[~settled]
+
+    proba = totals / n_trees
+    stopped = trees_evaluated < n_trees
+    proba[stopped, -1] = estimate[stopped]
+    proba[stopped, 0] = 1.0 - estimate[stopped]
+    return proba, trees_evaluated
+
+
+def select_engine(model, engine=None):
+    """Return the object that should serve predictions for a fitted forest.
+
+    ``engine`` is 'compiled' (CompiledForest) or 'sklearn' (the model itself);
+    it defaults to the INFERENCE_ENGINE environment variable, then 'compiled'.
+    Models the compiled engine cannot represent are served by sklearn.
+    """
+    engine = (engine or os.environ.get('INFERENCE_ENGINE') or 'compiled').lower()
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown inference engine '{engine}', expected one of {ENGINES}")
+    if isinstance(model, CompiledForest):
+        # Exported artifacts are already compiled
+        return model
+    if engine == 'sklearn':
+        return model
+    try:
+        return CompiledForest.from_sklearn(model)
+    except TypeError as e:
+        warnings.warn(f"Falling back to sklearn inference: {e}")
+        return model
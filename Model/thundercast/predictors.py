@@ -0,0 +1,286 @@
+"""
+Serving predictors for the thunderstorm and windspeed models.
+
+These load a trained (or exported serving) artifact and turn feature rows
+into the response dicts used by the API. Only numpy and joblib are needed;
+scikit-learn is imported by joblib only when the sklearn engine, or an
+artifact that was never exported, is loaded.
+"""
+
+import sys
+
+import numpy as np
+
+from .export import load_model_data, served_artifact_path
+from .forest import (
+    DEFAULT_QUANTILES,
+    RISK_THRESHOLDS,
+    CompiledForest,
+    predict_proba_anytime,
+    predict_with_contributions,
+    predict_with_spread,
+    select_engine,
+    threshold_bands,
+)
+
+THUNDERSTORM_FEATURES = [
+    'wind_sfc_speed_ms', 'wind_sfc_dir_deg', 'wind_500_speed_ms', 'wind_500_dir_deg',
+    'temp_2m_C', 'temp_500_C', 'rh_2m_pct', 'pressure_sfc_hPa',
+    'precipitable_water_mm', 'cloud_cover_frac', 'cloud_top_temp_C',
+    'CAPE_Jkg', 'Lifted_Index_C', 'K_index', 'shear_850_500_ms'
+]
+
+# Labels of the risk bands split by RISK_THRESHOLDS (probability >= threshold moves up a band)
+RISK_LEVELS = ('Green', 'Yellow', 'Yellow', 'Red')
+# Windspeed category bands in m/s, same convention
+WIND_THRESHOLDS = (5.0, 10.0, 15.0)
+WIND_CATEGORIES = ('Light', 'Moderate', 'Strong', 'Very Strong')
+
+# Alert text per band; {} is the value formatted with one decimal
+RISK_ALERTS = (
+    "LOW: {}% thunderstorm risk",
+    "LOW-MODERATE: {}% thunderstorm risk",
+    "MODERATE: {}% thunderstorm probability",
+    "SEVERE: {}% thunderstorm probability",
+)
+WIND_ALERTS = (
+    "Light winds: {} m/s - Calm conditions",
+    "Moderate winds: {} m/s - Normal conditions",
+    "Strong winds: {} m/s - Be cautious",
+    "Very strong winds: {} m/s - High wind warning",
+)
+
+
+class AlertTable:
+    """Interned alert strings for every (band, value to one decimal) with 0 <= value <= max_value"""
+
+    def __init__(self, templates, max_value=100.0):
+        self.templates = templates
+        self.max_tenths = int(round(max_value * 10))
+        self.table = np.array([[sys.intern(template.format(f"{tenths / 10:.1f}"))
+                                for tenths in range(self.max_tenths + 1)] for template in templates], dtype=object)
+
+    def render(self, bands, values):
+        """templates[band].format(f"{value:.1f}") per row, looked up instead of formatted"""
+        values = np.asarray(values, dtype=np.float64)
+        scaled = values * 10
+        tenths = np.floor(scaled + 0.5)
+        # Values within float error of a rounding tie, negative or beyond the table are formatted directly
+        direct = ~((np.abs(scaled - np.floor(scaled) - 0.5) > 1e-6) & ~np.signbit(values)
+                   & (tenths <= self.max_tenths))
+        tenths[direct] = 0
+        alerts = self.table[bands, tenths.astype(np.intp)]
+        for i in np.flatnonzero(direct).tolist():
+            alerts[i] = self.templates[bands[i]].format(f"{values[i]:.1f}")
+        return alerts.tolist()
+
+
+_risk_alerts = AlertTable(RISK_ALERTS)
+_wind_alerts = AlertTable(WIND_ALERTS)
+
+WINDSPEED_FEATURES = [
+    'IND', 'RAIN', 'IND.1', 'T.MAX', 'IND.2', 'T.MIN.G',
+    'wind_lag_1', 'wind_lag_2', 'wind_lag_3',
+    'ma_3', 'ma_5', 'ma_7',
+    'std_3', 'std_5', 'std_7'
+]
+
+
+class _Predictor:
+    default_features = []
+    quantiles = DEFAULT_QUANTILES
+
+    def __init__(self, engine=None):
+        self.engine = engine
+        self.model = None
+        self.scaler = None
+        self.compiled = None
+        self.feature_names = list(self.default_features)
+        self.artifact_path = None
+        self.loaded = False
+
+    def load_model(self, model_path):
+        # The file actually served, so callers can version caches on it
+        self.artifact_path = served_artifact_path(model_path, self.engine)
+        model_data = load_model_data(model_path, self.engine)
+        self.model = select_engine(model_data['model'], self.engine)
+        self.scaler = model_data.get('scaler')
+        self.feature_names = list(model_data['feature_names'])
+        # Array form of the forest for explanations and early exit, whatever the serving engine;
+        # tree-path contribution tables are built here so explaining a row costs about one prediction
+        self.compiled = self.model if isinstance(self.model, CompiledForest) else CompiledForest.from_sklearn(self.model)
+        self.compiled._contribution_tables()
+        self.loaded = True
+        return self
+
+    def row_from_parameters(self, parameters):
+        return [parameters[feature] for feature in self.feature_names]
+
+    def _prepare(self, input_array):
+        # Rows already in the dtype the forest compares (e.g. a float32 binary batch) are passed through uncopied
+        if (self.scaler is None and isinstance(input_array, np.ndarray)
+                and input_array.dtype == getattr(self.model, 'input_dtype', np.float64)):
+            return input_array.reshape(-1, len(self.feature_names))
+        input_array = np.asarray(input_array, dtype=np.float64).reshape(-1, len(self.feature_names))
+        # Exported serving artifacts carry no scaler: thresholds are already in raw units
+        return self.scaler.transform(input_array) if self.scaler is not None else input_array
+
+    def _uncertainty(self, spread):
+        """Per-row 'uncertainty' dicts from predict_with_spread output"""
+        names = [f"p{q * 100:g}" for q in self.quantiles]
+        rows = [{'std': std, 'quantiles': dict(zip(names, quantiles))}
+                for std, quantiles in zip(spread['std'].tolist(), spread['quantiles'].tolist())]
+        if 'vote_fraction' in spread:
+            for row, fraction in zip(rows, spread['vote_fraction'].tolist()):
+                row['storm_vote_fraction'] = fraction
+        return rows
+
+    def _factors(self, bias, contributions):
+        """Per-row ('factorsBaseline', 'factors') from predict_with_contributions output"""
+        return [(baseline, dict(zip(self.feature_names, row)))
+                for baseline, row in zip(bias.tolist(), contributions.tolist())]
+
+    def _add_details(self, results, spread=None, factors=None):
+        if spread is not None:
+            for result, uncertainty in zip(results, self._uncertainty(spread)):
+                result['uncertainty'] = uncertainty
+        if factors is not None:
+            for result, (baseline, row_factors) in zip(results, self._factors(*factors)):
+                result['factorsBaseline'] = baseline
+                result['factors'] = row_factors
+        return results
+
+
+class ThunderstormPredictor(_Predictor):
+    """RandomForestClassifier thunderstorm risk"""
+
+    default_features = THUNDERSTORM_FEATURES
+    model_type = 'Random Forest Classifier (Trained)'
+    # Error bound of early-exit scoring in predict_batch (None: always evaluate every tree)
+    early_exit = None
+    early_exit_chunk_trees = 10
+
+    def score_matrix(self, input_array):
+        """One predict_proba pass over (N, 15) raw features; returns (predictions, probabilities, confidences)"""
+        return self._from_proba(self.model.predict_proba(self._prepare(input_array)))
+
+    def score_matrix_with_spread(self, input_array):
+        """score_matrix plus the per-tree spread, from the same traversal"""
+        prediction_proba, spread = predict_with_spread(self.model, self._prepare(input_array), self.quantiles)
+        return (*self._from_proba(prediction_proba), spread)
+
+    def score_matrix_with_factors(self, input_array):
+        """score_matrix plus (bias, contributions) of P(thunderstorm), from the same traversal"""
+        prediction_proba, bias, contributions = predict_with_contributions(self.compiled, self._prepare(input_array))
+        return (*self._from_proba(prediction_proba), (bias, contributions))
+
+    def score_matrix_anytime(self, input_array):
+        """score_matrix with early exit once each row's risk level is settled; adds trees evaluated per row"""
+        prediction_proba, trees_evaluated = predict_proba_anytime(
+            self.compiled, self._prepare(input_array), RISK_THRESHOLDS,
+            chunk_trees=self.early_exit_chunk_trees, error_bound=self.early_exit,
+        )
+        return (*self._from_proba(prediction_proba), trees_evaluated)
+
+    def _from_proba(self, prediction_proba):
+        # Probability of thunderstorm (class 1)
+        thunderstorm_probability = prediction_proba[:, 1] if prediction_proba.shape[1] > 1 else prediction_proba[:, 0]
+        prediction_binary = self.model.classes_[np.argmax(prediction_proba, axis=1)]
+        confidence = prediction_proba.max(axis=1) * 100
+        return prediction_binary, thunderstorm_probability, confidence
+
+    def build_results(self, prediction_binary, thunderstorm_probability, confidence, spread=None, factors=None):
+        """Per-row response dicts, with 'uncertainty' / 'factors' entries when spread / factors are given"""
+        probability = np.asarray(thunderstorm_probability, dtype=np.float64)
+        # Risk band per row: probability >= 0.25 / 0.50 / 0.75 moves up one band
+        bands = threshold_bands(probability, RISK_THRESHOLDS)
+        levels = [RISK_LEVELS[band] for band in bands.tolist()]
+        alerts = _risk_alerts.render(bands, probability * 100)
+        model_type = self.model_type
+        results = [
+            {
+                'prediction': prediction,
+                'probability': row_probability,
+                'confidence': row_confidence,
+                'risk_level': risk_level,
+                'riskLevel': risk_level,
+                'alert': alert,
+                'modelType': model_type
+            }
+            for prediction, row_probability, row_confidence, risk_level, alert in zip(
+                np.asarray(prediction_binary).astype(np.int64).tolist(), probability.tolist(),
+                np.asarray(confidence, dtype=np.float64).tolist(), levels, alerts)
+        ]
+        return self._add_details(results, spread, factors)
+
+    def predict_batch(self, input_array, uncertainty=False, explain=False):
+        if uncertainty:
+            factors = self.score_matrix_with_factors(input_array)[-1] if explain else None
+            return self.build_results(*self.score_matrix_with_spread(input_array), factors=factors)
+        if explain:
+            *scores, factors = self.score_matrix_with_factors(input_array)
+            return self.build_results(*scores, factors=factors)
+        if self.early_exit is not None:
+            *scores, trees_evaluated = self.score_matrix_anytime(input_array)
+            results = self.build_results(*scores)
+            for result, trees in zip(results, trees_evaluated.tolist()):
+                result['treesEvaluated'] = trees
+            return results
+        return self.build_results(*self.score_matrix(input_array))
+
+    def predict_thunderstorm(self, parameters):
+        """Score one observation given as a dict of feature values"""
+        return self.predict_batch([self.row_from_parameters(parameters)])[0]
+
+
+class WindspeedPredictor(_Predictor):
+    """RandomForestRegressor next-day windspeed"""
+
+    default_features = WINDSPEED_FEATURES
+    model_type = 'Random Forest Regressor (Trained)'
+
+    def score_matrix(self, input_array):
+        """One predict pass over (N, 15) raw features; returns predicted windspeeds"""
+        return self.model.predict(self._prepare(input_array))
+
+    def score_matrix_with_spread(self, input_array):
+        """score_matrix plus the per-tree spread, from the same traversal"""
+        prediction, spread = predict_with_spread(self.model, self._prepare(input_array), self.quantiles)
+        return prediction[:, 0], spread
+
+    def score_matrix_with_factors(self, input_array):
+        """score_matrix plus (bias, contributions) of the windspeed, from the same traversal"""
+        prediction, bias, contributions = predict_with_contributions(self.compiled, self._prepare(input_array))
+        return prediction[:, 0], (bias, contributions)
+
+    def build_results(self, predicted_windspeeds, spread=None, factors=None):
+        """Per-row response dicts, with 'uncertainty' / 'factors' entries when spread / factors are given"""
+        windspeeds = np.asarray(predicted_windspeeds, dtype=np.float64)
+        # Category per row: windspeed >= 5 / 10 / 15 m/s moves up one category
+        bands = threshold_bands(windspeeds, WIND_THRESHOLDS)
+        categories = [WIND_CATEGORIES[band] for band in bands.tolist()]
+        alerts = _wind_alerts.render(bands, windspeeds)
+        model_type = self.model_type
+        results = [
+            {
+                'predicted_windspeed': windspeed,
+                'wind_category': wind_category,
+                'alert': alert,
+                'modelType': model_type
+            }
+            for windspeed, wind_category, alert in zip(windspeeds.tolist(), categories, alerts)
+        ]
+        return self._add_details(results, spread, factors)
+
+    def predict_batch(self, input_array, uncertainty=False, explain=False):
+        if uncertainty:
+            factors = self.score_matrix_with_factors(input_array)[-1] if explain else None
+            return self.build_results(*self.score_matrix_with_spread(input_array), factors=factors)
+        if explain:
+            prediction, factors = self.score_matrix_with_factors(input_array)
+            return self.build_results(prediction, factors=factors)
+        return self.build_results(self.score_matrix(input_array))
+
+    def predict_windspeed(self, parameters):
+        """Score one observation given as a dict of feature values"""
+        return self.predict_batch([self.row_from_parameters(parameters)])[0]
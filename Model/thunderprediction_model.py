@@ -8,7 +8,6 @@ from sklearn.metrics import accuracy_score, precision_score, classification_repo
 from sklearn.preprocessing import StandardScaler
 import joblib
 import json
-import os
 
 # Load and prepare data
 df = pd.read_csv('thunderstorm_sample_dataset.csv', index_col='time_utc', parse_dates=True)
@@ -117,6 +116,8 @@ try:
     model_data = {
         'model': model,
         'scaler': StandardScaler().fit(X_train),  # Fit scaler on training data
+        # The forest was fit on the unscaled X_train: serving must not apply the scaler
+        'input_space': 'raw',
         'feature_names': feature_columns,
         'performance': {
             'train_auc': float(roc_auc_train),
@@ -168,6 +169,24 @@ feature_info = {
         'K_index': 25,
         'shear_850_500_ms': 10
     },
+    'feature_precision': {
+        # Decimal places used to bucket near-identical inputs in the backend prediction cache
+        'wind_sfc_speed_ms': 1,
+        'wind_sfc_dir_deg': 0,
+        'wind_500_speed_ms': 1,
+        'wind_500_dir_deg': 0,
+        'temp_2m_C': 1,
+        'temp_500_C': 1,
+        'rh_2m_pct': 0,
+        'pressure_sfc_hPa': 1,
+        'precipitable_water_mm': 1,
+        'cloud_cover_frac': 2,
+        'cloud_top_temp_C': 1,
+        'CAPE_Jkg': -1,
+        'Lifted_Index_C': 1,
+        'K_index': 1,
+        'shear_850_500_ms': 1
+    },
     'model_type': 'RandomForestClassifier',
     'model_params': {
         'n_estimators': 100,
@@ -195,109 +214,25 @@ print("Model and feature information saved successfully!")
 print(f"Model performance - Test Accuracy: {feature_info['performance']['test_accuracy']:.4f}")
 print(f"Model performance - Test AUC: {feature_info['performance']['test_auc']:.4f}")
 
-# Create a simple prediction API script
-api_script = '''#!/usr/bin/env python3
-"""
-API script for thunderstorm prediction
-Reads JSON from stdin and outputs prediction results
-"""
-
-import sys
-import json
-import numpy as np
-import joblib
-import os
-
-def main():
-    try:
-        # Read input from stdin
-        input_data = json.loads(sys.stdin.read())
-        
-        # Load model
-        model_path = os.path.join(os.path.dirname(__file__), 'thunderstorm_model.joblib')
-        model_data = joblib.load(model_path)
-        
-        model = model_data['model']
-        scaler = model_data['scaler']
-        feature_names = model_data['feature_names']
-        
-        # Prepare input array in correct order
-        input_array = np.array([[input_data[feature] for feature in feature_names]])
-        
-        # Scale input
-        input_scaled = scaler.transform(input_array)
-        
-        # Make prediction
-        prediction_binary = model.predict(input_scaled)[0]
-        prediction_proba = model.predict_proba(input_scaled)[0]
-        
-        # Get probability of thunderstorm (class 1)
-        thunderstorm_probability = prediction_proba[1] if len(prediction_proba) > 1 else prediction_proba[0]
-        
-        # Calculate confidence
-        confidence = max(prediction_proba) * 100
-        
-        # Determine risk level
-        if thunderstorm_probability >= 0.75:
-            risk_level = "Red"
-            alert = f"SEVERE: {thunderstorm_probability*100:.1f}% thunderstorm probability"
-        elif thunderstorm_probability >= 0.50:
-            risk_level = "Yellow"
-            alert = f"MODERATE: {thunderstorm_probability*100:.1f}% thunderstorm probability"
-        elif thunderstorm_probability >= 0.25:
-            risk_level = "Yellow"
-            alert = f"LOW-MODERATE: {thunderstorm_probability*100:.1f}% thunderstorm risk"
-        else:
-            risk_level = "Green"
-            alert = f"LOW: {thunderstorm_probability*100:.1f}% thunderstorm risk"
-        
-        result = {
-            'prediction': int(prediction_binary),
-            'probability': float(thunderstorm_probability),
-            'confidence': float(confidence),
-            'risk_level': risk_level,
-            'riskLevel': risk_level,
-            'alert': alert,
-            'model_info': {
-                'type': 'Random Forest Classifier',
-                'version': '1.0'
-            }
-        }
-        
-        print(json.dumps(result))
-        
-    except Exception as e:
-        error_result = {
-            'error': str(e),
-            'prediction': 0,
-            'probability': 0.0,
-            'confidence': 0.0,
-            'risk_level': 'Error',
-            'alert': f'Prediction failed: {str(e)}'
-        }
-        print(json.dumps(error_result))
-        sys.exit(1)
-
-if __name__ == "__main__":
-    main()
-'''
-
-# Save API script
-with open('predict_api.py', 'w') as f:
-    f.write(api_script)
-
-# Make it executable
-import stat
-os.chmod('predict_api.py', stat.S_IRWXU | stat.S_IRGRP | stat.S_IROTH)
+# Export a scaler-free serving artifact (tree thresholds in raw feature units)
+try:
+    from thundercast.export import export_model_file
+    serving_path, export_report = export_model_file(model_save_path)
+    print(f"✅ Serving artifact exported: {serving_path}")
+    if export_report.get('scaler_mismatch'):
+        print("⚠️ Model was fit on unscaled X_train; the separately fitted scaler saved with it is not applied")
+        print("   at inference (by any engine), so predictions match training")
+except Exception as e:
+    print(f"❌ Error exporting serving artifact: {e}")
 
-print("✅ API script created: predict_api.py")
+# predict_api.py is maintained alongside the thundercast package and is not regenerated here
 
 print("\nModel training and saving completed successfully!")
 print("Files created:")
 print("- thunderstorm_model.joblib (trained model)")
+print("- thunderstorm_model_serving.joblib (exported serving model)")
 print("- model_info.json (model metadata)")
 print("- roc_curve.png (ROC curve plot)")
 print("- confusion_matrix.png (confusion matrix)")
 print("- probability_distribution.png (probability histogram)")
 print("- feature_importance.png (feature importance plot)")
-print("- predict_api.py (prediction API script)")
@@ -2,70 +2,116 @@
 """
 API script for windspeed prediction
 Reads JSON from stdin and outputs prediction results
+
+Usage: python3 windspeed_predict_api.py [--engine compiled|sklearn] [--stream]
+
+With --stream the model is loaded once and every stdin line is a JSON
+request ({"id": ..., <features>} or {"id": ..., "parameters": {...}});
+one JSON result line carrying the same id is written per request.
 """
 
 import sys
 import json
+import argparse
 import numpy as np
-import joblib
 import os
 
+from thundercast import ENGINES, load_model_data, select_engine
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Windspeed prediction from JSON on stdin')
+    parser.add_argument('--engine', choices=ENGINES, default=None,
+                        help='Inference engine (default: $INFERENCE_ENGINE, then compiled)')
+    parser.add_argument('--stream', action='store_true',
+                        help='Serve newline-delimited JSON requests until stdin closes')
+    return parser.parse_args()
+
+def load_model(engine=None):
+    model_path = os.path.join(os.path.dirname(__file__), 'windspeed_model.joblib')
+    model_data = load_model_data(model_path, engine)
+
+    model = select_engine(model_data['model'], engine)
+    scaler = model_data['scaler']
+    feature_names = model_data['feature_names']
+    return model, scaler, feature_names
+
+def predict(model, scaler, feature_names, input_data):
+    # Prepare input array in correct order
+    input_array = np.array([[input_data[feature] for feature in feature_names]])
+
+    # Scale input (exported serving artifacts have the scaler folded in)
+    input_scaled = scaler.transform(input_array) if scaler is not None else input_array
+
+    # Make prediction
+    predicted_windspeed = model.predict(input_scaled)[0]
+
+    # Determine wind category
+    if predicted_windspeed < 5:
+        wind_category = "Light"
+        alert = f"Light winds: {predicted_windspeed:.1f} m/s - Calm conditions"
+    elif predicted_windspeed < 10:
+        wind_category = "Moderate"
+        alert = f"Moderate winds: {predicted_windspeed:.1f} m/s - Normal conditions"
+    elif predicted_windspeed < 15:
+        wind_category = "Strong"
+        alert = f"Strong winds: {predicted_windspeed:.1f} m/s - Be cautious"
+    else:
+        wind_category = "Very Strong"
+        alert = f"Very strong winds: {predicted_windspeed:.1f} m/s - High wind warning"
+
+    return {
+        'predicted_windspeed': float(predicted_windspeed),
+        'wind_category': wind_category,
+        'alert': alert,
+        'model_info': {
+            'type': 'Random Forest Regressor',
+            'version': '1.0'
+        }
+    }
+
+def error_result(e):
+    return {
+        'error': str(e),
+        'predicted_windspeed': 0.0,
+        'wind_category': 'Error',
+        'alert': f'Windspeed prediction failed: {str(e)}'
+    }
+
+def stream(model, scaler, feature_names):
+    """Answer one NDJSON request per stdin line until EOF"""
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        request_id = None
+        try:
+            payload = json.loads(line)
+            request_id = payload.get('id')
+            input_data = payload.get('parameters', payload)
+            result = predict(model, scaler, feature_names, input_data)
+        except Exception as e:
+            result = error_result(e)
+        sys.stdout.write(json.dumps({'id': request_id, **result}) + '\n')
+        sys.stdout.flush()
+
 def main():
+    args = parse_args()
     try:
+        if args.stream:
+            # Load model once for the lifetime of the process
+            model, scaler, feature_names = load_model(args.engine)
+            stream(model, scaler, feature_names)
+            return
+
         # Read input from stdin
         input_data = json.loads(sys.stdin.read())
-        
+
         # Load model
-        model_path = os.path.join(os.path.dirname(__file__), 'windspeed_model.joblib')
-        model_data = joblib.load(model_path)
-        
-        model = model_data['model']
-        scaler = model_data['scaler']
-        feature_names = model_data['feature_names']
-        
-        # Prepare input array in correct order
-        input_array = np.array([[input_data[feature] for feature in feature_names]])
-        
-        # Scale input
-        input_scaled = scaler.transform(input_array)
-        
-        # Make prediction
-        predicted_windspeed = model.predict(input_scaled)[0]
-        
-        # Determine wind category
-        if predicted_windspeed < 5:
-            wind_category = "Light"
-            alert = f"Light winds: {predicted_windspeed:.1f} m/s - Calm conditions"
-        elif predicted_windspeed < 10:
-            wind_category = "Moderate"
-            alert = f"Moderate winds: {predicted_windspeed:.1f} m/s - Normal conditions"
-        elif predicted_windspeed < 15:
-            wind_category = "Strong"
-            alert = f"Strong winds: {predicted_windspeed:.1f} m/s - Be cautious"
-        else:
-            wind_category = "Very Strong"
-            alert = f"Very strong winds: {predicted_windspeed:.1f} m/s - High wind warning"
-        
-        result = {
-            'predicted_windspeed': float(predicted_windspeed),
-            'wind_category': wind_category,
-            'alert': alert,
-            'model_info': {
-                'type': 'Random Forest Regressor',
-                'version': '1.0'
-            }
-        }
-        
-        print(json.dumps(result))
-        
+        model, scaler, feature_names = load_model(args.engine)
+
+        print(json.dumps(predict(model, scaler, feature_names, input_data)))
+
     except Exception as e:
-        error_result = {
-            'error': str(e),
-            'predicted_windspeed': 0.0,
-            'wind_category': 'Error',
-            'alert': f'Windspeed prediction failed: {str(e)}'
-        }
-        print(json.dumps(error_result))
+        print(json.dumps(error_result(e)))
         sys.exit(1)
 
 if __name__ == "__main__":
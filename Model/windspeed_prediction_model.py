@@ -8,7 +8,6 @@ from sklearn.preprocessing import StandardScaler, MinMaxScaler
 import seaborn as sns
 import joblib
 import json
-import os
 
 df = pd.read_csv('wind_dataset.csv', index_col='DATE', parse_dates=True)
 
@@ -83,6 +82,7 @@ try:
     model_data = {
         'model': model,
         'scaler': scaler,
+        'input_space': 'scaled',
         'feature_names': X.columns.tolist(),
         'performance': {
             'test_mae': float(mean_absolute_error(y_test, test_pred)),
@@ -117,6 +117,24 @@ feature_info = {
         'std_5': '5-day standard deviation',
         'std_7': '7-day standard deviation'
     },
+    'feature_precision': {
+        # Decimal places used to bucket near-identical inputs in the backend prediction cache
+        'IND': 0,
+        'RAIN': 1,
+        'IND.1': 0,
+        'T.MAX': 1,
+        'IND.2': 0,
+        'T.MIN.G': 1,
+        'wind_lag_1': 2,
+        'wind_lag_2': 2,
+        'wind_lag_3': 2,
+        'ma_3': 2,
+        'ma_5': 2,
+        'ma_7': 2,
+        'std_3': 2,
+        'std_5': 2,
+        'std_7': 2
+    },
     'model_type': 'RandomForestRegressor',
     'model_params': {
         'n_estimators': 60,
@@ -133,90 +151,18 @@ try:
 except Exception as e:
     print(f"❌ Error saving windspeed model info: {e}")
 
-# Create windspeed prediction API script
-api_script = '''#!/usr/bin/env python3
-"""
-API script for windspeed prediction
-Reads JSON from stdin and outputs prediction results
-"""
-
-import sys
-import json
-import numpy as np
-import joblib
-import os
-
-def main():
-    try:
-        # Read input from stdin
-        input_data = json.loads(sys.stdin.read())
-        
-        # Load model
-        model_path = os.path.join(os.path.dirname(__file__), 'windspeed_model.joblib')
-        model_data = joblib.load(model_path)
-        
-        model = model_data['model']
-        scaler = model_data['scaler']
-        feature_names = model_data['feature_names']
-        
-        # Prepare input array in correct order
-        input_array = np.array([[input_data[feature] for feature in feature_names]])
-        
-        # Scale input
-        input_scaled = scaler.transform(input_array)
-        
-        # Make prediction
-        predicted_windspeed = model.predict(input_scaled)[0]
-        
-        # Determine wind category
-        if predicted_windspeed < 5:
-            wind_category = "Light"
-            alert = f"Light winds: {predicted_windspeed:.1f} m/s - Calm conditions"
-        elif predicted_windspeed < 10:
-            wind_category = "Moderate"
-            alert = f"Moderate winds: {predicted_windspeed:.1f} m/s - Normal conditions"
-        elif predicted_windspeed < 15:
-            wind_category = "Strong"
-            alert = f"Strong winds: {predicted_windspeed:.1f} m/s - Be cautious"
-        else:
-            wind_category = "Very Strong"
-            alert = f"Very strong winds: {predicted_windspeed:.1f} m/s - High wind warning"
-        
-        result = {
-            'predicted_windspeed': float(predicted_windspeed),
-            'wind_category': wind_category,
-            'alert': alert,
-            'model_info': {
-                'type': 'Random Forest Regressor',
-                'version': '1.0'
-            }
-        }
-        
-        print(json.dumps(result))
-        
-    except Exception as e:
-        error_result = {
-            'error': str(e),
-            'predicted_windspeed': 0.0,
-            'wind_category': 'Error',
-            'alert': f'Windspeed prediction failed: {str(e)}'
-        }
-        print(json.dumps(error_result))
-        sys.exit(1)
-
-if __name__ == "__main__":
-    main()
-'''
-
-# Save windspeed API script
-with open('windspeed_predict_api.py', 'w') as f:
-    f.write(api_script)
-
-# Make it executable
-import stat
-os.chmod('windspeed_predict_api.py', stat.S_IRWXU | stat.S_IRGRP | stat.S_IROTH)
+# Export a scaler-free serving artifact (tree thresholds in raw feature units)
+try:
+    from thundercast.export import export_model_file
+    serving_path, export_report = export_model_file(model_save_path)
+    print(f"✅ Serving artifact exported: {serving_path}")
+    if export_report.get('scaler_mismatch'):
+        print("⚠️ Model thresholds look unscaled; the saved scaler is not applied at inference")
+        print("   (by any engine), so predictions match training")
+except Exception as e:
+    print(f"❌ Error exporting windspeed serving artifact: {e}")
 
-print("✅ Windspeed API script created: windspeed_predict_api.py")
+# windspeed_predict_api.py is maintained alongside the thundercast package and is not regenerated here
 
 print(f"\nWindspeed model performance:")
 print(f"Test MAE: {mean_absolute_error(y_test, test_pred):.4f}")
@@ -226,5 +172,5 @@ print(f"Train R²: {r2_score(y_train, train_pred):.4f}")
 
 print("\nFiles created:")
 print("- windspeed_model.joblib (trained windspeed model)")
-print("- windspeed_model_info.json (windspeed model metadata)")
-print("- windspeed_predict_api.py (windspeed prediction API script)")
\ No newline at end of file
+print("- windspeed_model_serving.joblib (exported serving model)")
+print("- windspeed_model_info.json (windspeed model metadata)")
\ No newline at end of file
@@ -1,49 +1,235 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 import sys
 import os
+import csv
 import random
+import time
+import hashlib
+import math
 import numpy as np
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from microbatch import MicroBatcher
+from prediction_cache import PredictionCache, load_feature_precision
+from singleflight import SingleFlight
+from observation_store import ObservationStore
+from sweep import SweepScheduler
+from spatial_index import KDTREE_AVAILABLE, NearestObservationIndex, blend_features
+from grid import (
+    ENCODINGS, GridField, LRUStore, encode_raster, input_hash, score_cells, tile_bounds, tile_cell_centers
+)
+from json_codec import FastJSONProvider
+from ndjson_stream import NDJSON_MIMETYPE, read_lines, score_lines
+from columnar import (
+    ARROW_MIMETYPE, NPY_MIMETYPE, category_codes, decode_arrow, decode_npy, encode_arrow, encode_npy,
+    parse_feature_names_header, pyarrow_module, scatter_rows
+)
 
 # Add the Model directory to Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'Model'))
 
-predictor = None
+# Serving-only package: numpy/joblib, no pandas/matplotlib or training code
+from thundercast import (
+    RAW_WIND_FIELDS, RISK_LEVELS, RISK_THRESHOLDS, THUNDERSTORM_FEATURES, WIND_CATEGORIES, WIND_THRESHOLDS,
+    WINDSPEED_FEATURES, ThunderstormPredictor, WindFeatureStore, WindspeedPredictor, recursive_forecast
+)
+
+# Upper bound on observations accepted by the batch endpoints
+BATCH_MAX_ROWS = int(os.environ.get('BATCH_MAX_ROWS', 10000))
+
+# Serialize JSON responses with orjson when it is installed
+FAST_JSON_ENABLED = os.environ.get('FAST_JSON_ENABLED', '1') == '1'
+
+# NDJSON streaming endpoints: rows scored per internal batch, longest accepted input line
+STREAM_BATCH_ROWS = min(int(os.environ.get('STREAM_BATCH_ROWS', 1000)), BATCH_MAX_ROWS)
+STREAM_MAX_LINE_BYTES = int(os.environ.get('STREAM_MAX_LINE_BYTES', 65536))
+
+# Micro-batching of concurrent single-row requests
+MICROBATCH_ENABLED = os.environ.get('MICROBATCH_ENABLED', '1') == '1'
+MICROBATCH_WINDOW_MS = float(os.environ.get('MICROBATCH_WINDOW_MS', 2.0))
+MICROBATCH_MAX_ROWS = int(os.environ.get('MICROBATCH_MAX_ROWS', 256))
+
+# Inference engine for both forests: 'compiled' (array-backed) or 'sklearn'
+INFERENCE_ENGINE = os.environ.get('INFERENCE_ENGINE', 'compiled')
+
+# Cache of single-row predictions keyed on rounded feature values
+PREDICTION_CACHE_ENABLED = os.environ.get('PREDICTION_CACHE_ENABLED', '1') == '1'
+PREDICTION_CACHE_SIZE = int(os.environ.get('PREDICTION_CACHE_SIZE', 4096))
+PREDICTION_CACHE_TTL_S = float(os.environ.get('PREDICTION_CACHE_TTL_S', 60))
+
+# Concurrent requests for the same location or feature row share one computation
+COALESCING_ENABLED = os.environ.get('COALESCING_ENABLED', '1') == '1'
+
+# Background re-scoring of every registered location
+SWEEP_ENABLED = os.environ.get('SWEEP_ENABLED', '1') == '1'
+SWEEP_INTERVAL_S = float(os.environ.get('SWEEP_INTERVAL_S', 300))
+SWEEP_CHUNK_ROWS = int(os.environ.get('SWEEP_CHUNK_ROWS', 4096))
+SWEEP_WORKERS = int(os.environ.get('SWEEP_WORKERS', 0)) or None  # default: one per CPU
+
+# Longest recursive windspeed forecast, in days
+FORECAST_MAX_HORIZON = int(os.environ.get('FORECAST_MAX_HORIZON', 7))
+
+# Threads scoring the two models of a combined request side by side
+COMBINED_WORKERS = int(os.environ.get('COMBINED_WORKERS', 4))
+
+# Gridded risk rasters and map tiles
+GRID_MAX_CELLS = int(os.environ.get('GRID_MAX_CELLS', 262144))
+GRID_TILE_SIZE = int(os.environ.get('GRID_TILE_SIZE', 256))
+GRID_TILE_CACHE_SIZE = int(os.environ.get('GRID_TILE_CACHE_SIZE', 128))
+# Registered grid inputs are evicted by total size, not count
+GRID_FIELDS_MAX_MB = float(os.environ.get('GRID_FIELDS_MAX_MB', 256))
+
+# Nearest-observation feature filling for lat/lon-only requests
+NEAREST_ENABLED = os.environ.get('NEAREST_ENABLED', '1') == '1'
+NEAREST_SEED_CSV = os.environ.get('NEAREST_SEED_CSV', os.path.join(os.path.dirname(__file__), '..', 'Model',
+                                                                   'thunderstorm_sample_dataset.csv'))
+NEAREST_K = int(os.environ.get('NEAREST_K', 5))
+NEAREST_MAX_K = int(os.environ.get('NEAREST_MAX_K', 32))
+NEAREST_IDW_POWER = float(os.environ.get('NEAREST_IDW_POWER', 2.0))
+NEAREST_BUFFER_SIZE = int(os.environ.get('NEAREST_BUFFER_SIZE', 4096))
+
+# Early-exit thunderstorm scoring: stop adding trees once the risk level is settled
+EARLY_EXIT_ENABLED = os.environ.get('EARLY_EXIT_ENABLED', '0') == '1'
+EARLY_EXIT_ERROR_BOUND = float(os.environ.get('EARLY_EXIT_ERROR_BOUND', 0.01))
+EARLY_EXIT_CHUNK_TREES = int(os.environ.get('EARLY_EXIT_CHUNK_TREES', 10))
+
+MODEL_DIR = os.path.join(os.path.dirname(__file__), '..', 'Model')
+
+predictor = ThunderstormPredictor(INFERENCE_ENGINE)
+if EARLY_EXIT_ENABLED:
+    predictor.early_exit = EARLY_EXIT_ERROR_BOUND
+    predictor.early_exit_chunk_trees = EARLY_EXIT_CHUNK_TREES
 model_loaded = False
-windspeed_model_data = None
+thunderstorm_model_version = None
+# Bumped on every load_models(); tags stored location results with the models that scored them
+model_generation = 0
+windspeed_predictor = WindspeedPredictor(INFERENCE_ENGINE)
 windspeed_model_loaded = False
 
-try:
-    from thunderstorm_prediction_model import ThunderstormPredictor
-    import joblib
-
-    # Load thunderstorm model
-    predictor = ThunderstormPredictor()
-    model_path = os.path.join(os.path.dirname(__file__), '..', 'Model', 'thunderstorm_model.joblib')
-    if os.path.exists(model_path):
-        predictor.load_model(model_path)
-        print("✅ Thunderstorm model loaded successfully!")
-        model_loaded = True
-    else:
-        print("⚠️ Thunderstorm model file not found")
-        model_loaded = False
-
-    # Load windspeed model
-    windspeed_model_path = os.path.join(os.path.dirname(__file__), '..', 'Model', 'windspeed_model.joblib')
-    if os.path.exists(windspeed_model_path):
-        windspeed_model_data = joblib.load(windspeed_model_path)
-        print("✅ Windspeed model loaded successfully!")
-        windspeed_model_loaded = True
-    else:
-        print("⚠️ Windspeed model file not found")
-        windspeed_model_loaded = False
-except Exception as e:
-    print(f"❌ Error during model loading: {e}")
+thunderstorm_cache = PredictionCache(max_size=PREDICTION_CACHE_SIZE, ttl_s=PREDICTION_CACHE_TTL_S, name='thunderstorm')
+windspeed_cache = PredictionCache(max_size=PREDICTION_CACHE_SIZE, ttl_s=PREDICTION_CACHE_TTL_S, name='windspeed')
+
+thunderstorm_flight = SingleFlight(name='thunderstorm')
+windspeed_flight = SingleFlight(name='windspeed')
+
+# Latest ingested observation and its precomputed predictions per location
+location_store = ObservationStore()
+# Per-station lag/rolling windspeed features built from raw daily values
+wind_feature_store = WindFeatureStore()
+
+# Thunderstorm feature rows by coordinates: the seed dataset plus ingested observations with latitude/longitude
+nearest_index = NearestObservationIndex(len(THUNDERSTORM_FEATURES), buffer_size=NEAREST_BUFFER_SIZE)
+# Angles are blended as unit vectors
+CIRCULAR_FEATURES = [THUNDERSTORM_FEATURES.index(name) for name in ('wind_sfc_dir_deg', 'wind_500_dir_deg')]
+
+# Registered grid inputs by input hash, and scored tiles by (model version, input hash, z, x, y)
+grid_fields = LRUStore(max_size=None, max_bytes=GRID_FIELDS_MAX_MB * 1024 * 1024, name='grid_fields')
+tile_cache = LRUStore(max_size=GRID_TILE_CACHE_SIZE, name='tiles')
+
+combined_pool = ThreadPoolExecutor(max_workers=COMBINED_WORKERS, thread_name_prefix='combined')
+
+location_sweeper = SweepScheduler(
+    lambda model_name: location_store.scored_observations(model_name, model_generation),
+    lambda model_name, matrix: score_location_matrix(model_name, matrix),
+    location_store.models, interval_s=SWEEP_INTERVAL_S, chunk_rows=SWEEP_CHUNK_ROWS, workers=SWEEP_WORKERS,
+    version_fn=lambda: model_generation
+)
+
+def model_file_version(model_path):
+    """Short version id of a model file, changing whenever the file is rewritten (pass the file actually loaded)"""
+    stat = os.stat(model_path)
+    return hashlib.sha256(f"{stat.st_mtime_ns}:{stat.st_size}".encode()).hexdigest()[:12]
+
+def load_models():
+    """(Re)load both models and invalidate their prediction caches"""
+    global model_loaded, windspeed_model_loaded, thunderstorm_model_version, model_generation
+    try:
+        # Load thunderstorm model
+        model_path = os.path.join(MODEL_DIR, 'thunderstorm_model.joblib')
+        if os.path.exists(model_path):
+            predictor.load_model(model_path)
+            print("✅ Thunderstorm model loaded successfully!")
+            model_loaded = True
+            # The serving artifact when the compiled engine loaded one, so regenerating it alone changes the version
+            thunderstorm_model_version = model_file_version(predictor.artifact_path)
+        else:
+            print("⚠️ Thunderstorm model file not found")
+            model_loaded = False
+        thunderstorm_cache.clear(load_feature_precision(os.path.join(MODEL_DIR, 'model_info.json'),
+                                                        predictor.feature_names))
+
+        # Load windspeed model
+        windspeed_model_path = os.path.join(MODEL_DIR, 'windspeed_model.joblib')
+        if os.path.exists(windspeed_model_path):
+            windspeed_predictor.load_model(windspeed_model_path)
+            print("✅ Windspeed model loaded successfully!")
+            windspeed_model_loaded = True
+        else:
+            print("⚠️ Windspeed model file not found")
+            windspeed_model_loaded = False
+        windspeed_cache.clear(load_feature_precision(os.path.join(MODEL_DIR, 'windspeed_model_info.json'),
+                                                     windspeed_predictor.feature_names))
+    except Exception as e:
+        print(f"❌ Error during model loading: {e}")
+    # After the models are replaced: results tagged with the new generation never come from the old ones
+    model_generation += 1
+
+load_models()
+
+def seed_nearest_index(csv_path):
+    """Index the lat/lon rows of a CSV with THUNDERSTORM_FEATURES columns (and optional time_utc)"""
+    ids, latitudes, longitudes, rows, observed_at = [], [], [], [], []
+    with open(csv_path, newline='') as f:
+        for number, record in enumerate(csv.DictReader(f)):
+            try:
+                row = [float(record[name]) for name in THUNDERSTORM_FEATURES]
+                latitude, longitude = float(record['latitude']), float(record['longitude'])
+            except (KeyError, TypeError, ValueError):
+                continue
+            timestamp = record.get('time_utc')
+            try:
+                observed = datetime.fromisoformat(timestamp).replace(tzinfo=timezone.utc).timestamp()
+            except (TypeError, ValueError):
+                observed = time.time()
+            ids.append(f"seed-{number}")
+            latitudes.append(latitude)
+            longitudes.append(longitude)
+            rows.append(row)
+            observed_at.append(observed)
+    if ids:
+        nearest_index.add(ids, latitudes, longitudes, rows, observed_at)
+        nearest_index.rebuild()
+    return len(ids)
+
+if NEAREST_ENABLED and not KDTREE_AVAILABLE:
+    print("⚠️ scipy is not installed: nearest-observation lookups fall back to brute force (pip install scipy)")
+
+if NEAREST_ENABLED and os.path.exists(NEAREST_SEED_CSV):
+    try:
+        print(f"📍 Indexed {seed_nearest_index(NEAREST_SEED_CSV)} observation points for nearest lookup")
+    except Exception as e:
+        print(f"❌ Error seeding the nearest-observation index: {e}")
+
+thunderstorm_batcher = MicroBatcher(
+    predictor.predict_batch,
+    window_ms=MICROBATCH_WINDOW_MS, max_rows=MICROBATCH_MAX_ROWS, name='thunderstorm'
+)
+windspeed_batcher = MicroBatcher(
+    lambda matrix: windspeed_predictor.score_matrix(matrix).tolist(),
+    window_ms=MICROBATCH_WINDOW_MS, max_rows=MICROBATCH_MAX_ROWS, name='windspeed'
+)
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app, enabled=FAST_JSON_ENABLED)
 CORS(app)
 
+@app.before_request
+def start_background_sweep():
+    if SWEEP_ENABLED:
+        location_sweeper.start()
+
 @app.route('/')
 def home():
     return jsonify({
@@ -54,8 +240,18 @@ def home():
         },
         "endpoints": {
             "thunderstorm_predict": "/api/ml/predict",
+            "thunderstorm_predict_batch": "/api/ml/predict/batch",
             "windspeed_predict": "/api/windspeed/predict",
-            "health": "/api/health"
+            "windspeed_predict_batch": "/api/windspeed/predict/batch",
+            "locations": "/api/locations",
+            "ingest_observation": "/api/locations/<location_id>/observations",
+            "ingest_observations_bulk": "/api/locations/observations",
+            "windspeed_station_observation": "/api/windspeed/stations/<station_id>/observations",
+            "windspeed_station_observations_bulk": "/api/windspeed/stations/observations",
+            "windspeed_forecast": "/api/windspeed/forecast?horizon=7",
+            "health": "/api/health",
+            "metrics": "/api/metrics",
+            "reload_models": "/api/models/reload"
         }
     })
 
@@ -65,36 +261,126 @@ def health():
         "status": "OK",
         "thunderstorm_model": model_loaded,
         "windspeed_model": windspeed_model_loaded,
+        "inference_engine": INFERENCE_ENGINE,
+        "timestamp": datetime.now().isoformat()
+    })
+
+@app.route('/api/metrics')
+def metrics():
+    return jsonify({
+        "microbatch": {
+            "enabled": MICROBATCH_ENABLED,
+            "thunderstorm": thunderstorm_batcher.stats(),
+            "windspeed": windspeed_batcher.stats()
+        },
+        "prediction_cache": {
+            "enabled": PREDICTION_CACHE_ENABLED,
+            "thunderstorm": thunderstorm_cache.stats(),
+            "windspeed": windspeed_cache.stats()
+        },
+        "coalescing": {
+            "enabled": COALESCING_ENABLED,
+            "thunderstorm": thunderstorm_flight.stats(),
+            "windspeed": windspeed_flight.stats()
+        },
+        "location_store": location_store.stats(),
+        "grid_tiles": tile_cache.stats(),
+        "grid_fields": grid_fields.stats(),
+        "nearest_index": {
+            "enabled": NEAREST_ENABLED,
+            **nearest_index.stats()
+        },
+        "sweep": {
+            "enabled": SWEEP_ENABLED,
+            **location_sweeper.stats()
+        },
         "timestamp": datetime.now().isoformat()
     })
 
+@app.route('/api/models/reload', methods=['POST'])
+def reload_models():
+    load_models()
+    # Stored location results came from the previous models: the sweep re-scores them in the
+    # background (reads serve the previous snapshot until it publishes), else rescore them now
+    if SWEEP_ENABLED:
+        location_sweeper.invalidate()
+    else:
+        for model_name in location_store.models:
+            location_store.rescore(model_name, lambda rows, model_name=model_name:
+                                   score_location_matrix(model_name, np.array(rows, dtype=np.float64)),
+                                   version=model_generation)
+    # Tiles of the old model can no longer be hit (their key has the old version); free them
+    tile_cache.clear()
+    return jsonify({
+        "success": True,
+        "data": {
+            "thunderstorm_model": model_loaded,
+            "windspeed_model": windspeed_model_loaded
+        }
+    })
+
 @app.route('/api/ml/predict', methods=['POST'])
 def predict_thunderstorm():
     try:
-        data = request.get_json()
+        feature_names = predictor.feature_names if model_loaded else THUNDERSTORM_FEATURES
+        try:
+            row = parse_observation(request.get_json(silent=True), feature_names)
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": str(e)
+            }), 400
 
-        required_params = [
-            'wind_sfc_speed_ms', 'wind_sfc_dir_deg', 'wind_500_speed_ms', 'wind_500_dir_deg',
-            'temp_2m_C', 'temp_500_C', 'rh_2m_pct', 'pressure_sfc_hPa',
-            'precipitable_water_mm', 'cloud_cover_frac', 'cloud_top_temp_C',
-            'CAPE_Jkg', 'Lifted_Index_C', 'K_index', 'shear_850_500_ms'
-        ]
+        if model_loaded:
+            if wants_uncertainty() or wants_factors():
+                # Needs the per-tree outputs, so it bypasses the cache and micro-batcher
+                result = predictor.predict_batch(np.array([row], dtype=np.float64),
+                                                 uncertainty=wants_uncertainty(), explain=wants_factors())[0]
+            else:
+                result = predict_thunderstorm_row(row)
+        else:
+            result = fallback_thunderstorm_prediction(dict(zip(feature_names, row)))
 
-        missing_params = [param for param in required_params if param not in data]
-        if missing_params:
+        return jsonify({
+            "success": True,
+            "data": result
+        })
+
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@app.route('/api/ml/predict/batch', methods=['POST'])
+def predict_thunderstorm_batch():
+    try:
+        feature_names = predictor.feature_names if model_loaded else THUNDERSTORM_FEATURES
+        try:
+            matrix, row_ids, errors, total, response_type = parse_batch_request(feature_names)
+        except ValueError as e:
             return jsonify({
                 "success": False,
-                "error": f"Missing parameters: {missing_params}"
+                "error": str(e)
             }), 400
+        except LookupError as e:
+            return jsonify({
+                "success": False,
+                "error": str(e)
+            }), 415
 
-        if predictor and model_loaded:
-            result = predictor.predict_thunderstorm(data)
+        if response_type != 'application/json':
+            return columnar_response(response_type, 'thunderstorm', matrix, row_ids, total)
+
+        if model_loaded:
+            results = predictor.predict_batch(matrix, uncertainty=wants_uncertainty(),
+                                              explain=wants_factors()) if len(row_ids) else []
         else:
-            result = fallback_thunderstorm_prediction(data)
+            results = [fallback_thunderstorm_prediction(dict(zip(feature_names, row.tolist()))) for row in matrix]
 
         return jsonify({
             "success": True,
-            "data": result
+            "data": merge_batch_results(results, row_ids, errors, total)
         })
 
     except Exception as e:
@@ -106,57 +392,451 @@ def predict_thunderstorm():
 @app.route('/api/windspeed/predict', methods=['POST'])
 def predict_windspeed():
     try:
-        data = request.get_json()
+        feature_names = windspeed_predictor.feature_names if windspeed_model_loaded else WINDSPEED_FEATURES
+        try:
+            row = parse_observation(request.get_json(silent=True), feature_names, 'windspeed')
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": str(e)
+            }), 400
 
-        # Your windspeed parameters
-        required_params = [
-            'IND', 'RAIN', 'IND.1', 'T.MAX', 'IND.2', 'T.MIN.G',
-            'wind_lag_1', 'wind_lag_2', 'wind_lag_3',
-            'ma_3', 'ma_5', 'ma_7',
-            'std_3', 'std_5', 'std_7'
-        ]
+        if windspeed_model_loaded:
+            if wants_uncertainty() or wants_factors():
+                result = windspeed_predictor.predict_batch(np.array([row], dtype=np.float64),
+                                                           uncertainty=wants_uncertainty(), explain=wants_factors())[0]
+            else:
+                result = windspeed_predictor.build_results([predict_windspeed_row(row)])[0]
+        else:
+            result = fallback_windspeed_prediction(dict(zip(feature_names, row)))
 
-        missing_params = [param for param in required_params if param not in data]
-        if missing_params:
+        return jsonify({
+            "success": True,
+            "data": result
+        })
+
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@app.route('/api/windspeed/predict/batch', methods=['POST'])
+def predict_windspeed_batch():
+    try:
+        feature_names = windspeed_predictor.feature_names if windspeed_model_loaded else WINDSPEED_FEATURES
+        try:
+            matrix, row_ids, errors, total, response_type = parse_batch_request(feature_names)
+        except ValueError as e:
             return jsonify({
                 "success": False,
-                "error": f"Missing windspeed parameters: {missing_params}"
+                "error": str(e)
             }), 400
+        except LookupError as e:
+            return jsonify({
+                "success": False,
+                "error": str(e)
+            }), 415
+
+        if response_type != 'application/json':
+            return columnar_response(response_type, 'windspeed', matrix, row_ids, total)
 
         if windspeed_model_loaded:
-            model = windspeed_model_data['model']
-            scaler = windspeed_model_data['scaler']
-            feature_names = windspeed_model_data['feature_names']
-
-            input_array = np.array([[data[feature] for feature in feature_names]])
-            input_scaled = scaler.transform(input_array)
-            predicted_windspeed = model.predict(input_scaled)[0]
-
-            if predicted_windspeed < 5:
-                wind_category = "Light"
-                alert = f"Light winds: {predicted_windspeed:.1f} m/s - Calm conditions"
-            elif predicted_windspeed < 10:
-                wind_category = "Moderate"
-                alert = f"Moderate winds: {predicted_windspeed:.1f} m/s - Normal conditions"
-            elif predicted_windspeed < 15:
-                wind_category = "Strong"
-                alert = f"Strong winds: {predicted_windspeed:.1f} m/s - Be cautious"
+            results = windspeed_predictor.predict_batch(matrix, uncertainty=wants_uncertainty(),
+                                                        explain=wants_factors()) if len(row_ids) else []
+        else:
+            results = [fallback_windspeed_prediction(dict(zip(feature_names, row.tolist()))) for row in matrix]
+
+        return jsonify({
+            "success": True,
+            "data": merge_batch_results(results, row_ids, errors, total)
+        })
+
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@app.route('/api/ml/predict/stream', methods=['POST'])
+def predict_thunderstorm_stream():
+    feature_names = predictor.feature_names if model_loaded else THUNDERSTORM_FEATURES
+    if model_loaded:
+        uncertainty, explain = wants_uncertainty(), wants_factors()
+        score_batch = lambda matrix: predictor.predict_batch(matrix, uncertainty=uncertainty, explain=explain)
+    else:
+        score_batch = lambda matrix: [fallback_thunderstorm_prediction(dict(zip(feature_names, row)))
+                                      for row in matrix.tolist()]
+    return ndjson_response(feature_names, score_batch)
+
+@app.route('/api/windspeed/predict/stream', methods=['POST'])
+def predict_windspeed_stream():
+    feature_names = windspeed_predictor.feature_names if windspeed_model_loaded else WINDSPEED_FEATURES
+    if windspeed_model_loaded:
+        uncertainty, explain = wants_uncertainty(), wants_factors()
+        score_batch = lambda matrix: windspeed_predictor.predict_batch(matrix, uncertainty=uncertainty,
+                                                                       explain=explain)
+    else:
+        score_batch = lambda matrix: [fallback_windspeed_prediction(dict(zip(feature_names, row)))
+                                      for row in matrix.tolist()]
+    return ndjson_response(feature_names, score_batch)
+
+@app.route('/api/predict/combined', methods=['POST'])
+def predict_combined():
+    try:
+        payload = request.get_json(silent=True)
+        try:
+            if isinstance(payload, list) or (isinstance(payload, dict) and 'observations' in payload):
+                entries = payload['observations'] if isinstance(payload, dict) else payload
+                if not isinstance(entries, list):
+                    raise ValueError("'observations' must be an array")
+                if len(entries) > BATCH_MAX_ROWS:
+                    raise ValueError(f"Batch too large: {len(entries)} observations (max {BATCH_MAX_ROWS})")
+                data = score_combined_batch(entries)
             else:
-                wind_category = "Very Strong"
-                alert = f"Very strong winds: {predicted_windspeed:.1f} m/s - High wind warning"
-
-            result = {
-                'predicted_windspeed': float(predicted_windspeed),
-                'wind_category': wind_category,
-                'alert': alert,
-                'modelType': 'Random Forest Regressor (Trained)'
+                data = score_combined_single(payload)
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": str(e)
+            }), 400
+
+        return jsonify({
+            "success": True,
+            "data": data
+        })
+
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@app.route('/api/ml/grid', methods=['POST'])
+def thunderstorm_grid():
+    try:
+        if not model_loaded:
+            return jsonify({
+                "success": False,
+                "error": "Thunderstorm model not loaded"
+            }), 503
+        try:
+            encoding = raster_encoding()
+            field = GridField.from_payload(request.get_json(), predictor.feature_names, GRID_MAX_CELLS)
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": str(e)
+            }), 400
+
+        longitudes, latitudes = field.cell_centers()
+        probability = score_cells(field.sample(longitudes, latitudes, predictor.feature_names), grid_probability)
+        return raster_response(probability, encoding, [field.west, field.south, field.east, field.north], 'EPSG:4326')
+
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@app.route('/api/ml/grid/fields', methods=['POST'])
+def register_grid_field():
+    try:
+        payload = request.get_json()
+        try:
+            field = GridField.from_payload(payload, location_feature_names('thunderstorm'), GRID_MAX_CELLS)
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": str(e)
+            }), 400
+
+        field_hash = input_hash(payload)
+        grid_fields.put(field_hash, field)
+        return jsonify({
+            "success": True,
+            "data": {
+                "inputHash": field_hash,
+                "tileUrl": f"/api/ml/grid/tiles/{field_hash}/{{z}}/{{x}}/{{y}}",
+                "tileSize": GRID_TILE_SIZE,
+                "bbox": [field.west, field.south, field.east, field.north]
             }
+        })
+
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@app.route('/api/ml/grid/tiles/<field_hash>/<int:z>/<int:x>/<int:y>')
+def thunderstorm_grid_tile(field_hash, z, x, y):
+    try:
+        if not model_loaded:
+            return jsonify({
+                "success": False,
+                "error": "Thunderstorm model not loaded"
+            }), 503
+        field = grid_fields.get(field_hash)
+        if field is None:
+            return jsonify({
+                "success": False,
+                "error": f"Unknown grid input '{field_hash}'; register it with POST /api/ml/grid/fields"
+            }), 404
+        try:
+            encoding = raster_encoding()
+            longitudes, latitudes = tile_cell_centers(z, x, y, GRID_TILE_SIZE)
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": str(e)
+            }), 400
+
+        key = (thunderstorm_model_version, field_hash, z, x, y)
+        probability = tile_cache.get(key)
+        cached = probability is not None
+        if not cached:
+            probability = score_cells(field.sample(longitudes, latitudes, predictor.feature_names), grid_probability)
+            tile_cache.put(key, probability)
+        response = raster_response(probability, encoding, tile_bounds(z, x, y), 'EPSG:3857')
+        response.headers['X-Tile-Cache'] = 'hit' if cached else 'miss'
+        return response
+
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@app.route('/api/ml/nearest')
+def predict_thunderstorm_nearest():
+    try:
+        if not NEAREST_ENABLED:
+            return jsonify({
+                "success": False,
+                "error": "Nearest-observation lookup is disabled"
+            }), 404
+        try:
+            latitude = float(request.args['lat'])
+            longitude = float(request.args['lon'])
+            k = int(request.args.get('k', NEAREST_K))
+            max_age_s = float(request.args['max_age_s']) if 'max_age_s' in request.args else None
+        except (KeyError, ValueError):
+            return jsonify({
+                "success": False,
+                "error": "Query needs numeric 'lat' and 'lon' (optional integer 'k', numeric 'max_age_s')"
+            }), 400
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180 and 1 <= k <= NEAREST_MAX_K):
+            return jsonify({
+                "success": False,
+                "error": f"'lat' must be in [-90, 90], 'lon' in [-180, 180] and 'k' in [1, {NEAREST_MAX_K}]"
+            }), 400
+
+        neighbors = nearest_index.query(latitude, longitude, k, max_age_s)
+        if not neighbors:
+            return jsonify({
+                "success": False,
+                "error": "No observations to interpolate from"
+            }), 404
+
+        blended = blend_features(neighbors, NEAREST_IDW_POWER, CIRCULAR_FEATURES)
+        features = dict(zip(THUNDERSTORM_FEATURES, blended.tolist()))
+        if model_loaded:
+            result = predict_thunderstorm_row([features[name] for name in predictor.feature_names])
         else:
-            result = fallback_windspeed_prediction(data)
+            result = fallback_thunderstorm_prediction(features)
 
         return jsonify({
             "success": True,
-            "data": result
+            "data": {
+                **result,
+                "features": features,
+                "neighbors": [{
+                    "id": neighbor['id'],
+                    "distanceKm": round(neighbor['distance_km'], 3),
+                    "observedAt": datetime.fromtimestamp(neighbor['observed_at'], timezone.utc).isoformat()
+                } for neighbor in neighbors]
+            }
+        })
+
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@app.route('/api/locations')
+def list_locations():
+    location_ids = location_store.location_ids()
+    return jsonify({
+        "success": True,
+        "data": {
+            "count": len(location_ids),
+            "locations": location_ids
+        }
+    })
+
+@app.route('/api/locations/<location_id>/observations', methods=['POST'])
+def ingest_location_observation(location_id):
+    try:
+        payload = request.get_json()
+        if not isinstance(payload, dict):
+            return jsonify({
+                "success": False,
+                "error": "Request body must be a JSON object"
+            }), 400
+
+        outcome = ingest_observations([{**payload, 'location_id': location_id}])['results'][0]
+        if not outcome['success']:
+            return jsonify({
+                "success": False,
+                "error": outcome['error'],
+                "locationId": location_id
+            }), 400
+
+        return jsonify({
+            "success": True,
+            "data": {key: value for key, value in outcome.items() if key not in ('index', 'success')}
+        })
+
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e),
+            "locationId": location_id
+        }), 500
+
+@app.route('/api/locations/observations', methods=['POST'])
+def ingest_location_observations_bulk():
+    try:
+        payload = request.get_json()
+        if isinstance(payload, dict) and 'observations' in payload:
+            payload = payload['observations']
+        if not isinstance(payload, list):
+            return jsonify({
+                "success": False,
+                "error": "Request body must be a JSON array of location observations"
+            }), 400
+        if len(payload) > BATCH_MAX_ROWS:
+            return jsonify({
+                "success": False,
+                "error": f"Batch too large: {len(payload)} observations (max {BATCH_MAX_ROWS})"
+            }), 400
+
+        return jsonify({
+            "success": True,
+            "data": ingest_observations(payload)
+        })
+
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@app.route('/api/windspeed/stations/<station_id>/observations', methods=['POST'])
+def ingest_station_observation(station_id):
+    try:
+        payload = request.get_json()
+        # One day of raw values, or several consecutive days oldest first
+        days = payload if isinstance(payload, list) else [payload]
+        if not days or not all(isinstance(day, dict) for day in days):
+            return jsonify({
+                "success": False,
+                "error": f"Request body must be an object (or array of objects) with {RAW_WIND_FIELDS}"
+            }), 400
+
+        summary = ingest_station_days([{**day, 'station_id': station_id} for day in days])
+        if summary['failed']:
+            return jsonify({
+                "success": False,
+                "error": summary['errors'][0]['error'],
+                "stationId": station_id
+            }), 400
+
+        return jsonify({
+            "success": True,
+            "data": summary['stations'][0]
+        })
+
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e),
+            "stationId": station_id
+        }), 500
+
+@app.route('/api/windspeed/stations/observations', methods=['POST'])
+def ingest_station_observations_bulk():
+    try:
+        payload = request.get_json()
+        if isinstance(payload, dict) and 'observations' in payload:
+            payload = payload['observations']
+        if not isinstance(payload, list):
+            return jsonify({
+                "success": False,
+                "error": "Request body must be a JSON array of station observations"
+            }), 400
+        if len(payload) > BATCH_MAX_ROWS:
+            return jsonify({
+                "success": False,
+                "error": f"Batch too large: {len(payload)} observations (max {BATCH_MAX_ROWS})"
+            }), 400
+
+        return jsonify({
+            "success": True,
+            "data": ingest_station_days(payload)
+        })
+
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@app.route('/api/windspeed/forecast')
+def forecast_windspeed():
+    try:
+        try:
+            horizon = int(request.args.get('horizon', FORECAST_MAX_HORIZON))
+        except ValueError:
+            horizon = 0
+        if not 1 <= horizon <= FORECAST_MAX_HORIZON:
+            return jsonify({
+                "success": False,
+                "error": f"horizon must be an integer from 1 to {FORECAST_MAX_HORIZON}"
+            }), 400
+        if not windspeed_model_loaded:
+            return jsonify({
+                "success": False,
+                "error": "Windspeed model not loaded"
+            }), 503
+
+        # ?stations=a,b limits the forecast; default: every station with enough history
+        requested = request.args.get('stations')
+        station_ids, histories, exogenous = wind_feature_store.forecast_inputs(
+            [station_id for station_id in requested.split(',') if station_id] if requested else None
+        )
+
+        forecasts = []
+        if station_ids:
+            # One vectorized predict per day ahead, covering every station
+            predicted = recursive_forecast(windspeed_predictor.score_matrix, histories, exogenous, horizon)
+            results = windspeed_predictor.build_results(predicted.ravel())
+            for i, station_id in enumerate(station_ids):
+                forecasts.append({
+                    "stationId": station_id,
+                    "days": [{"day": day + 1, **results[i * horizon + day]} for day in range(horizon)]
+                })
+
+        return jsonify({
+            "success": True,
+            "data": {
+                "horizon": horizon,
+                "count": len(forecasts),
+                "issuedAt": datetime.now().isoformat(),
+                "forecasts": forecasts
+            }
         })
 
     except Exception as e:
@@ -168,17 +848,11 @@ def predict_windspeed():
 @app.route('/api/ml/predict/<location_id>')
 def predict_thunderstorm_for_location(location_id):
     try:
-        location_data = {
-            'wind_sfc_speed_ms': 12.5, 'wind_sfc_dir_deg': 225, 'wind_500_speed_ms': 18.2, 'wind_500_dir_deg': 230,
-            'temp_2m_C': 35.5, 'temp_500_C': -8.2, 'rh_2m_pct': 85, 'pressure_sfc_hPa': 995,
-            'precipitable_water_mm': 45, 'cloud_cover_frac': 0.8, 'cloud_top_temp_C': -45,
-            'CAPE_Jkg': 3200, 'Lifted_Index_C': -6.5, 'K_index': 35, 'shear_850_500_ms': 18
-        }
-
-        if predictor and model_loaded:
-            result = predictor.predict_thunderstorm(location_data)
+        stored = latest_location_result('thunderstorm', location_id)
+        if stored is not None:
+            result = {**stored['result'], "observedAt": stored['observed_at']}
         else:
-            result = fallback_thunderstorm_prediction(location_data)
+            result = coalesce(thunderstorm_flight, ('location', location_id), thunderstorm_location_result, location_id)
 
         return jsonify({
             "success": True,
@@ -198,44 +872,18 @@ def predict_thunderstorm_for_location(location_id):
 @app.route('/api/windspeed/predict/<location_id>')
 def predict_windspeed_for_location(location_id):
     try:
-        location_windspeed_data = {
-            'IND': 1.2, 'RAIN': 0.5, 'IND.1': 0.8, 'T.MAX': 25.0, 'IND.2': 1.1, 'T.MIN.G': 15.0,
-            'wind_lag_1': 8.5, 'wind_lag_2': 7.2, 'wind_lag_3': 9.1,
-            'ma_3': 8.3, 'ma_5': 8.1, 'ma_7': 7.9,
-            'std_3': 1.2, 'std_5': 1.5, 'std_7': 1.8
-        }
-
-        if windspeed_model_loaded:
-            model = windspeed_model_data['model']
-            scaler = windspeed_model_data['scaler']
-            feature_names = windspeed_model_data['feature_names']
-
-            input_array = np.array([[location_windspeed_data[feature] for feature in feature_names]])
-            input_scaled = scaler.transform(input_array)
-            predicted_windspeed = model.predict(input_scaled)[0]
-
-            if predicted_windspeed < 5:
-                wind_category = "Light"
-            elif predicted_windspeed < 10:
-                wind_category = "Moderate"
-            elif predicted_windspeed < 15:
-                wind_category = "Strong"
-            else:
-                wind_category = "Very Strong"
-
-            result = {
-                'predicted_windspeed': float(predicted_windspeed),
-                'wind_category': wind_category,
-                'alert': f"{wind_category} winds: {predicted_windspeed:.1f} m/s",
-                'locationId': location_id
-            }
+        stored = latest_location_result('windspeed', location_id)
+        if stored is not None:
+            result = {**stored['result'], "observedAt": stored['observed_at']}
         else:
-            result = fallback_windspeed_prediction(location_windspeed_data)
-            result['locationId'] = location_id
+            result = coalesce(windspeed_flight, ('location', location_id), windspeed_location_result, location_id)
 
         return jsonify({
             "success": True,
-            "data": result
+            "data": {
+                **result,
+                "locationId": location_id
+            }
         })
 
     except Exception as e:
@@ -245,6 +893,545 @@ def predict_windspeed_for_location(location_id):
             "locationId": location_id
         }), 500
 
+def thunderstorm_location_result(location_id):
+    """Thunderstorm prediction from default inputs, for locations with no ingested observation"""
+    location_data = {
+        'wind_sfc_speed_ms': 12.5, 'wind_sfc_dir_deg': 225, 'wind_500_speed_ms': 18.2, 'wind_500_dir_deg': 230,
+        'temp_2m_C': 35.5, 'temp_500_C': -8.2, 'rh_2m_pct': 85, 'pressure_sfc_hPa': 995,
+        'precipitable_water_mm': 45, 'cloud_cover_frac': 0.8, 'cloud_top_temp_C': -45,
+        'CAPE_Jkg': 3200, 'Lifted_Index_C': -6.5, 'K_index': 35, 'shear_850_500_ms': 18
+    }
+
+    if model_loaded:
+        return predict_thunderstorm_row([location_data[feature] for feature in predictor.feature_names])
+    return fallback_thunderstorm_prediction(location_data)
+
+def windspeed_location_result(location_id):
+    """Windspeed prediction from default inputs, for locations with no ingested observation"""
+    location_windspeed_data = {
+        'IND': 1.2, 'RAIN': 0.5, 'IND.1': 0.8, 'T.MAX': 25.0, 'IND.2': 1.1, 'T.MIN.G': 15.0,
+        'wind_lag_1': 8.5, 'wind_lag_2': 7.2, 'wind_lag_3': 9.1,
+        'ma_3': 8.3, 'ma_5': 8.1, 'ma_7': 7.9,
+        'std_3': 1.2, 'std_5': 1.5, 'std_7': 1.8
+    }
+
+    if not windspeed_model_loaded:
+        return fallback_windspeed_prediction(location_windspeed_data)
+
+    feature_names = windspeed_predictor.feature_names
+    predicted_windspeed = predict_windspeed_row([location_windspeed_data[feature] for feature in feature_names])
+    # Category and alert from the same table as every other windspeed response
+    return windspeed_predictor.build_results([predicted_windspeed])[0]
+
+def wants_uncertainty():
+    """True when the request asks for per-tree spread (?uncertainty=1)"""
+    return request.args.get('uncertainty', '').lower() in ('1', 'true', 'yes')
+
+def wants_factors():
+    """True when the request asks for per-feature contributions (?explain=1)"""
+    return request.args.get('explain', '').lower() in ('1', 'true', 'yes')
+
+def _coerce_float(value):
+    """Convert a single JSON value to float, returning None when it is not numeric"""
+    if isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def parse_observation(observation, feature_names, label=''):
+    """Feature row (floats in feature_names order) of one observation object.
+
+    Raises ValueError naming the missing or non-numeric features.
+    """
+    if not isinstance(observation, dict):
+        raise ValueError(f"{label or 'Request body'} must be a JSON object of features")
+    missing_params = [param for param in feature_names if param not in observation]
+    if missing_params:
+        raise ValueError(f"Missing {label + ' ' if label else ''}parameters: {missing_params}")
+    row = [_coerce_float(observation[feature]) for feature in feature_names]
+    bad_features = [feature for feature, value in zip(feature_names, row) if value is None or not math.isfinite(value)]
+    if bad_features:
+        raise ValueError(f"Invalid (non-numeric or non-finite) values for: {bad_features}")
+    return row
+
+def parse_observation_batch(payload, feature_names):
+    """Validate a batch payload and assemble one (N, n_features) matrix in feature_names order.
+
+    Accepts a JSON array of observations, {"observations": [...]}, or columnar
+    arrays keyed by feature name (optionally nested under "columns").
+    Returns (matrix, row_ids, errors, total): row_ids maps matrix rows back to
+    request indices and errors maps request indices to a per-row error message.
+    Raises ValueError when the payload as a whole is unusable.
+    """
+    if isinstance(payload, dict) and 'observations' in payload:
+        payload = payload['observations']
+
+    errors = {}
+    if isinstance(payload, list):
+        total = len(payload)
+        if total > BATCH_MAX_ROWS:
+            raise ValueError(f"Batch too large: {total} observations (max {BATCH_MAX_ROWS})")
+
+        rows = []
+        row_ids = []
+        for index, observation in enumerate(payload):
+            if not isinstance(observation, dict):
+                errors[index] = "Observation must be a JSON object"
+                continue
+            missing_params = [param for param in feature_names if param not in observation]
+            if missing_params:
+                errors[index] = f"Missing parameters: {missing_params}"
+                continue
+            rows.append([observation[feature] for feature in feature_names])
+            row_ids.append(index)
+
+        try:
+            matrix = np.array(rows, dtype=np.float64).reshape(len(rows), len(feature_names))
+        except (TypeError, ValueError):
+            # Slow path: find the offending rows instead of failing the batch
+            matrix = np.array([[_coerce_float(value) for value in row] for row in rows],
+                              dtype=np.float64).reshape(len(rows), len(feature_names))
+    elif isinstance(payload, dict):
+        columns = payload.get('columns', payload)
+        if not isinstance(columns, dict):
+            raise ValueError("'columns' must be an object of feature arrays")
+        missing_params = [param for param in feature_names if param not in columns]
+        if missing_params:
+            raise ValueError(f"Missing parameters: {missing_params}")
+        if not all(isinstance(columns[feature], list) for feature in feature_names):
+            raise ValueError("Columnar batches must map every feature to an array")
+        lengths = {len(columns[feature]) for feature in feature_names}
+        if len(lengths) != 1:
+            raise ValueError("All feature arrays must have the same length")
+        total = lengths.pop()
+        if total > BATCH_MAX_ROWS:
+            raise ValueError(f"Batch too large: {total} observations (max {BATCH_MAX_ROWS})")
+
+        matrix = np.empty((total, len(feature_names)), dtype=np.float64)
+        for j, feature in enumerate(feature_names):
+            try:
+                matrix[:, j] = np.asarray(columns[feature], dtype=np.float64)
+            except (TypeError, ValueError):
+                matrix[:, j] = [_coerce_float(value) for value in columns[feature]]
+        row_ids = list(range(total))
+    else:
+        raise ValueError("Request body must be a JSON array of observations or an object of feature arrays")
+
+    matrix, row_ids, errors = drop_invalid_rows(matrix, row_ids, errors, feature_names)
+    return matrix, row_ids, errors, total
+
+def drop_invalid_rows(matrix, row_ids, errors, feature_names):
+    """Move rows with NaN or infinite values from the matrix into errors"""
+    # Non-numeric and null values surface as NaN; report them per row
+    invalid = ~np.isfinite(matrix).all(axis=1)
+    if invalid.any():
+        for position in np.flatnonzero(invalid):
+            bad_features = [feature_names[j] for j in np.flatnonzero(~np.isfinite(matrix[position]))]
+            errors[row_ids[position]] = f"Invalid (non-numeric or non-finite) values for: {bad_features}"
+        matrix = matrix[~invalid]
+        row_ids = [index for index, bad in zip(row_ids, invalid) if not bad]
+    return matrix, row_ids, errors
+
+def batch_response_type():
+    """JSON unless the Accept header prefers .npy (or Arrow, when pyarrow is installed)"""
+    offers = ['application/json', NPY_MIMETYPE] + ([ARROW_MIMETYPE] if pyarrow_module() is not None else [])
+    return request.accept_mimetypes.best_match(offers, default='application/json')
+
+def parse_batch_request(feature_names):
+    """(matrix, row_ids, errors, total, response_type) of a JSON, .npy or Arrow batch request.
+
+    Raises ValueError for an unusable request and LookupError for an Arrow
+    body without pyarrow.
+    """
+    response_type = batch_response_type()
+    if response_type != 'application/json' and (wants_uncertainty() or wants_factors()):
+        raise ValueError("?uncertainty and ?explain need a JSON response")
+    if request.mimetype == NPY_MIMETYPE:
+        matrix = decode_npy(request.get_data(cache=False), feature_names,
+                            parse_feature_names_header(request.headers.get('X-Feature-Names')))
+    elif request.mimetype == ARROW_MIMETYPE:
+        matrix = decode_arrow(request.get_data(cache=False), feature_names)
+    else:
+        return (*parse_observation_batch(request.get_json(), feature_names), response_type)
+    total = len(matrix)
+    if total > BATCH_MAX_ROWS:
+        raise ValueError(f"Batch too large: {total} observations (max {BATCH_MAX_ROWS})")
+    return (*drop_invalid_rows(matrix, list(range(total)), {}, feature_names), total, response_type)
+
+def batch_output_columns(model_name, matrix, row_ids, total):
+    """(columns, category labels) for a binary batch response: one entry per request row.
+
+    Rows that failed validation get success 0, NaN values, -1 integers and
+    category code 255.
+    """
+    feature_names = location_feature_names(model_name)
+    rows = matrix.tolist() if len(matrix) else []
+    columns = {'success': scatter_rows(np.ones(len(row_ids), dtype=np.uint8), row_ids, total, 0)}
+    if model_name == 'thunderstorm':
+        trees_evaluated = None
+        if not model_loaded:
+            results = [fallback_thunderstorm_prediction(dict(zip(feature_names, row))) for row in rows]
+            prediction, probability, confidence = (np.array([result[key] for result in results], dtype=np.float64)
+                                                   for key in ('prediction', 'probability', 'confidence'))
+        elif predictor.early_exit is not None and len(matrix):
+            prediction, probability, confidence, trees_evaluated = predictor.score_matrix_anytime(matrix)
+        elif len(matrix):
+            prediction, probability, confidence = predictor.score_matrix(matrix)
+        else:
+            prediction = probability = confidence = np.empty(0)
+        columns['prediction'] = scatter_rows(np.asarray(prediction).astype(np.int8), row_ids, total, -1)
+        columns['probability'] = scatter_rows(np.asarray(probability, dtype=np.float64), row_ids, total, np.nan)
+        columns['confidence'] = scatter_rows(np.asarray(confidence, dtype=np.float64), row_ids, total, np.nan)
+        columns['risk_level'] = category_codes(columns['probability'], RISK_THRESHOLDS)
+        if trees_evaluated is not None:
+            columns['treesEvaluated'] = scatter_rows(trees_evaluated.astype(np.int16), row_ids, total, -1)
+        return columns, RISK_LEVELS
+
+    if not windspeed_model_loaded:
+        windspeed = np.array([fallback_windspeed_prediction(dict(zip(feature_names, row)))['predicted_windspeed']
+                              for row in rows], dtype=np.float64)
+    elif len(matrix):
+        windspeed = np.asarray(windspeed_predictor.score_matrix(matrix), dtype=np.float64)
+    else:
+        windspeed = np.empty(0)
+    columns['predicted_windspeed'] = scatter_rows(windspeed, row_ids, total, np.nan)
+    columns['wind_category'] = category_codes(columns['predicted_windspeed'], WIND_THRESHOLDS)
+    return columns, WIND_CATEGORIES
+
+def columnar_response(response_type, model_name, matrix, row_ids, total):
+    """.npy or Arrow batch response; category codes are explained by X-Category-Labels"""
+    columns, labels = batch_output_columns(model_name, matrix, row_ids, total)
+    body = encode_npy(columns) if response_type == NPY_MIMETYPE else encode_arrow(columns)
+    response = Response(body, mimetype=response_type)
+    response.headers['X-Category-Labels'] = ','.join(labels)
+    response.headers['X-Batch-Count'] = str(total)
+    response.headers['X-Batch-Failed'] = str(total - len(row_ids))
+    response.headers['Access-Control-Expose-Headers'] = 'X-Category-Labels, X-Batch-Count, X-Batch-Failed'
+    return response
+
+def ndjson_response(feature_names, score_batch):
+    """Stream NDJSON results while the NDJSON request body is still being read"""
+    lines = read_lines(request.stream, STREAM_MAX_LINE_BYTES)
+    chunks = score_lines(lines, lambda observations: parse_observation_batch(observations, feature_names),
+                         score_batch, STREAM_BATCH_ROWS)
+    return Response(stream_with_context(chunks), mimetype=NDJSON_MIMETYPE)
+
+def merge_batch_results(results, row_ids, errors, total):
+    """Interleave scored rows and per-row errors back into request order"""
+    merged = [None] * total
+    for index, result in zip(row_ids, results):
+        merged[index] = {"index": index, "success": True, **result}
+    for index, error in errors.items():
+        merged[index] = {"index": index, "success": False, "error": error}
+
+    return {
+        "count": total,
+        "succeeded": len(row_ids),
+        "failed": len(errors),
+        "results": merged
+    }
+
+def latest_location_result(model_name, location_id):
+    """Newest of the sweep snapshot and the ingest-time result for a location, or None"""
+    stored = location_store.get(location_id, model_name)
+    swept = location_sweeper.lookup(model_name, location_id)
+    if swept is not None and (stored is None or swept['observed_at'] >= stored['observed_at']):
+        return swept
+    return stored
+
+def ingest_observations(entries):
+    """Score and store location observations; each model runs once over all entries.
+
+    An entry is {"location_id": ..., "thunderstorm": {...}, "windspeed": {...}}
+    with at least one of the two observations. An entry is stored only when
+    all of its observations are valid. Thunderstorm observations that come
+    with "latitude"/"longitude" are added to the nearest-observation index.
+    """
+    errors = {}
+    location_ids = {}
+    pending = {model_name: ([], []) for model_name in location_store.models}
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            errors[index] = "Entry must be a JSON object"
+            continue
+        location_id = entry.get('location_id', entry.get('locationId'))
+        if location_id is None or str(location_id) == '':
+            errors[index] = "Missing location_id"
+            continue
+        provided = [model_name for model_name in location_store.models if model_name in entry]
+        if not provided:
+            errors[index] = "Entry needs a 'thunderstorm' and/or 'windspeed' observation"
+            continue
+        if ('latitude' in entry) != ('longitude' in entry) or (
+                'latitude' in entry and not valid_coordinates(entry['latitude'], entry['longitude'])):
+            errors[index] = "'latitude' and 'longitude' must be given together, within [-90, 90] and [-180, 180]"
+            continue
+        location_ids[index] = str(location_id)
+        for model_name in provided:
+            pending[model_name][0].append(index)
+            pending[model_name][1].append(entry[model_name])
+
+    # Taken before scoring: results that race a reload are tagged with the models they came from
+    generation = model_generation
+    scored = {}
+    for model_name, (indices, observations) in pending.items():
+        if not indices:
+            continue
+        matrix, row_ids, row_errors, _ = parse_observation_batch(observations, location_feature_names(model_name))
+        for position, error in row_errors.items():
+            errors.setdefault(indices[position], f"{model_name}: {error}")
+        results = score_location_matrix(model_name, matrix)
+        scored[model_name] = [(indices[position], row, result)
+                              for position, row, result in zip(row_ids, matrix.tolist(), results)]
+
+    observed_at = datetime.now().isoformat()
+    stored = {}
+    for model_name, rows in scored.items():
+        rows = [(index, row, result) for index, row, result in rows if index not in errors]
+        location_store.put_many(model_name, [location_ids[index] for index, _, _ in rows],
+                                [row for _, row, _ in rows], [result for _, _, result in rows], observed_at, generation)
+        for index, _, result in rows:
+            stored.setdefault(index, {"locationId": location_ids[index], "observedAt": observed_at})[model_name] = result
+        if model_name == 'thunderstorm' and NEAREST_ENABLED:
+            located = [(index, row) for index, row, _ in rows if 'latitude' in entries[index]]
+            if located:
+                columns = [location_feature_names(model_name).index(name) for name in THUNDERSTORM_FEATURES]
+                nearest_index.add([location_ids[index] for index, _ in located],
+                                  [float(entries[index]['latitude']) for index, _ in located],
+                                  [float(entries[index]['longitude']) for index, _ in located],
+                                  np.asarray([row for _, row in located])[:, columns])
+
+    row_ids = sorted(stored)
+    return merge_batch_results([stored[index] for index in row_ids], row_ids, errors, len(entries))
+
+def valid_coordinates(latitude, longitude):
+    if isinstance(latitude, bool) or isinstance(longitude, bool):
+        return False
+    try:
+        return -90 <= float(latitude) <= 90 and -180 <= float(longitude) <= 180
+    except (TypeError, ValueError):
+        return False
+
+def ingest_station_days(entries):
+    """Advance station feature state with raw daily values, then score every ready station once.
+
+    Entries are {"station_id": ..., "WIND": ..., "RAIN": ..., ...} in
+    chronological order per station. The next-day windspeed for each
+    station's latest day is stored under its id in the location store.
+    """
+    errors = []
+    stations = {}
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            errors.append({"index": index, "error": "Observation must be a JSON object"})
+            continue
+        station_id = entry.get('station_id', entry.get('stationId'))
+        if station_id is None or str(station_id) == '':
+            errors.append({"index": index, "error": "Missing station_id"})
+            continue
+        try:
+            features, days = wind_feature_store.update(str(station_id), entry)
+        except ValueError as e:
+            errors.append({"index": index, "error": str(e)})
+            continue
+        stations[str(station_id)] = {"stationId": str(station_id), "days": days, "ready": features is not None,
+                                     "features": features}
+
+    ready = [station for station in stations.values() if station['ready']]
+    if ready:
+        scored = ingest_observations([{'location_id': station['stationId'], 'windspeed': station['features']}
+                                      for station in ready])['results']
+        for station, outcome in zip(ready, scored):
+            if outcome['success']:
+                station['prediction'] = outcome['windspeed']
+                station['observedAt'] = outcome['observedAt']
+            else:
+                station['ready'] = False
+                station['error'] = outcome['error']
+
+    return {
+        "count": len(entries),
+        "succeeded": len(entries) - len(errors),
+        "failed": len(errors),
+        "errors": errors,
+        "stations": list(stations.values())
+    }
+
+def _timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - started) * 1000
+
+def run_models_concurrently(jobs):
+    """Run {model_name: (fn, *args)} on the combined pool; returns ({model_name: result}, timing_ms).
+
+    Tree inference spends its time in NumPy and releases the GIL, so the
+    models overlap. timing_ms has each model's own time plus the wall time.
+    """
+    started = time.perf_counter()
+    futures = {model_name: combined_pool.submit(_timed, *job) for model_name, job in jobs.items()}
+    results = {}
+    timing_ms = {}
+    for model_name, future in futures.items():
+        results[model_name], elapsed_ms = future.result()
+        timing_ms[model_name] = round(elapsed_ms, 3)
+    timing_ms['total'] = round((time.perf_counter() - started) * 1000, 3)
+    return results, timing_ms
+
+def _combined_single_thunderstorm(row):
+    if model_loaded:
+        return predict_thunderstorm_row(row)
+    return fallback_thunderstorm_prediction(dict(zip(location_feature_names('thunderstorm'), row)))
+
+def _combined_single_windspeed(row):
+    if windspeed_model_loaded:
+        return windspeed_predictor.build_results([predict_windspeed_row(row)])[0]
+    return fallback_windspeed_prediction(dict(zip(location_feature_names('windspeed'), row)))
+
+def score_combined_single(payload):
+    """Score {"thunderstorm": {...}, "windspeed": {...}} (either or both) with the models in parallel"""
+    if not isinstance(payload, dict):
+        raise ValueError("Request body must be a JSON object")
+    scorers = {'thunderstorm': _combined_single_thunderstorm, 'windspeed': _combined_single_windspeed}
+    jobs = {}
+    for model_name, scorer in scorers.items():
+        if model_name not in payload:
+            continue
+        jobs[model_name] = (scorer, parse_observation(payload[model_name], location_feature_names(model_name),
+                                                      model_name))
+    if not jobs:
+        raise ValueError("Request needs a 'thunderstorm' and/or 'windspeed' observation")
+
+    results, timing_ms = run_models_concurrently(jobs)
+    return {**results, "timing_ms": timing_ms}
+
+def score_combined_batch(entries):
+    """Score [{"thunderstorm": {...}, "windspeed": {...}}, ...]: one vectorized pass per model, in parallel.
+
+    An entry succeeds only when all of its observations are valid.
+    """
+    errors = {}
+    pending = {model_name: ([], []) for model_name in ('thunderstorm', 'windspeed')}
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            errors[index] = "Entry must be a JSON object"
+            continue
+        provided = [model_name for model_name in pending if model_name in entry]
+        if not provided:
+            errors[index] = "Entry needs a 'thunderstorm' and/or 'windspeed' observation"
+            continue
+        for model_name in provided:
+            pending[model_name][0].append(index)
+            pending[model_name][1].append(entry[model_name])
+
+    jobs = {}
+    parsed = {}
+    for model_name, (indices, observations) in pending.items():
+        if not indices:
+            continue
+        matrix, row_ids, row_errors, _ = parse_observation_batch(observations, location_feature_names(model_name))
+        for position, error in row_errors.items():
+            errors.setdefault(indices[position], f"{model_name}: {error}")
+        parsed[model_name] = [indices[position] for position in row_ids]
+        jobs[model_name] = (score_location_matrix, model_name, matrix)
+
+    results, timing_ms = run_models_concurrently(jobs)
+    combined = {}
+    for model_name, indices in parsed.items():
+        for index, result in zip(indices, results[model_name]):
+            if index not in errors:
+                combined.setdefault(index, {})[model_name] = result
+
+    row_ids = sorted(combined)
+    return {
+        **merge_batch_results([combined[index] for index in row_ids], row_ids, errors, len(entries)),
+        "timing_ms": timing_ms
+    }
+
+def grid_probability(matrix):
+    """P(thunderstorm) for a stack of grid cells, one vectorized pass"""
+    return predictor.score_matrix(matrix)[1]
+
+def raster_encoding():
+    encoding = request.args.get('encoding', 'probability')
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown encoding '{encoding}', expected one of {list(ENCODINGS)}")
+    return encoding
+
+def raster_response(probability, encoding, bbox, crs):
+    """Binary uint8 raster, described by X-Grid-* headers"""
+    response = Response(encode_raster(probability, encoding, RISK_THRESHOLDS), mimetype='application/octet-stream')
+    response.headers['X-Grid-Width'] = str(probability.shape[1])
+    response.headers['X-Grid-Height'] = str(probability.shape[0])
+    # Outer edges in degrees (west, south, east, north); rows are evenly spaced in crs
+    response.headers['X-Grid-Bbox'] = ','.join(f"{value:.6f}" for value in bbox)
+    response.headers['X-Grid-Crs'] = crs
+    response.headers['X-Grid-Encoding'] = encoding
+    response.headers['X-Grid-No-Data'] = '255'
+    response.headers['X-Model-Version'] = thunderstorm_model_version or ''
+    response.headers['Access-Control-Expose-Headers'] = ', '.join(
+        ['X-Grid-Width', 'X-Grid-Height', 'X-Grid-Bbox', 'X-Grid-Crs', 'X-Grid-Encoding', 'X-Grid-No-Data',
+         'X-Model-Version', 'X-Tile-Cache'])
+    return response
+
+def location_feature_names(model_name):
+    if model_name == 'thunderstorm':
+        return predictor.feature_names if model_loaded else THUNDERSTORM_FEATURES
+    return windspeed_predictor.feature_names if windspeed_model_loaded else WINDSPEED_FEATURES
+
+def score_location_matrix(model_name, matrix):
+    """Per-row result dicts for an (N, n_features) matrix, scored in one model pass"""
+    if len(matrix) == 0:
+        return []
+    feature_names = location_feature_names(model_name)
+    if model_name == 'thunderstorm':
+        if model_loaded:
+            return predictor.predict_batch(matrix)
+        return [fallback_thunderstorm_prediction(dict(zip(feature_names, row))) for row in matrix.tolist()]
+    if windspeed_model_loaded:
+        return windspeed_predictor.predict_batch(matrix)
+    return [fallback_windspeed_prediction(dict(zip(feature_names, row))) for row in matrix.tolist()]
+
+def coalesce(flight, key, fn, *args):
+    """fn(*args), shared with concurrent callers of the same key when coalescing is on"""
+    if COALESCING_ENABLED:
+        return flight.do(key, fn, *args)
+    return fn(*args)
+
+def predict_thunderstorm_row(row):
+    """Score a single observation; identical concurrent rows share one cache lookup or model call"""
+    return coalesce(thunderstorm_flight, ('row', _row_key(row)), _cached_thunderstorm_row, row)
+
+def predict_windspeed_row(row):
+    """Score a single windspeed observation, coalesced and cached like predict_thunderstorm_row"""
+    return coalesce(windspeed_flight, ('row', _row_key(row)), _cached_windspeed_row, row)
+
+def _row_key(row):
+    return np.asarray(row, dtype=np.float64).tobytes()
+
+def _cached_thunderstorm_row(row):
+    if PREDICTION_CACHE_ENABLED:
+        return thunderstorm_cache.get_or_compute(row, _score_thunderstorm_row)
+    return _score_thunderstorm_row(row)
+
+def _cached_windspeed_row(row):
+    if PREDICTION_CACHE_ENABLED:
+        return windspeed_cache.get_or_compute(row, _score_windspeed_row)
+    return _score_windspeed_row(row)
+
+def _score_thunderstorm_row(row):
+    # Shares a model call with concurrent requests when micro-batching is on
+    if MICROBATCH_ENABLED:
+        return thunderstorm_batcher.predict(row)
+    return predictor.predict_batch(np.array([row], dtype=np.float64))[0]
+
+def _score_windspeed_row(row):
+    if MICROBATCH_ENABLED:
+        return windspeed_batcher.predict(row)
+    return float(windspeed_predictor.score_matrix(np.array([row], dtype=np.float64))[0])
+
 def fallback_thunderstorm_prediction(parameters):
     """Fallback thunderstorm prediction"""
     cape = parameters.get('CAPE_Jkg', 1000)
@@ -332,5 +1519,7 @@ if __name__ == '__main__':
         print("⚠️ Thunderstorm model not loaded, using fallback")
     if not windspeed_model_loaded:
         print("⚠️ Windspeed model not loaded, using fallback")
-    print("🌐 Server starting on http://localhost:5001")
-    app.run(debug=True, host='0.0.0.0', port=5001)
+    port = int(os.environ.get('PORT', 5001))
+    print(f"🌐 Server starting on http://localhost:{port}")
+    print("💡 Development server: for production run `gunicorn` in this directory (see gunicorn.conf.py)")
+    app.run(debug=True, host='0.0.0.0', port=port)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the batch request/response formats
+Posts the same thunderstorm batch to /api/ml/predict/batch (Flask test
+client, no network) as JSON rows, JSON columns, .npy float64/float32 and
+Arrow, with JSON or binary responses, and reports the request time and body
+sizes per format
+
+Usage: python3 bench_columnar.py [--sizes 1000 10000] [--repeats 10]
+"""
+
+import sys
+import json
+import argparse
+import io
+import time
+
+import numpy as np
+
+import app
+from columnar import ARROW_MIMETYPE, NPY_MIMETYPE, pyarrow_module
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Compare JSON and binary columnar batch formats')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--repeats', type=int, default=10)
+    return parser.parse_args()
+
+
+def best_ms(fn, repeats):
+    fn()
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def npy_bytes(array):
+    stream = io.BytesIO()
+    np.save(stream, array)
+    return stream.getvalue()
+
+
+def arrow_bytes(matrix, feature_names):
+    pyarrow = pyarrow_module()
+    table = pyarrow.table({name: matrix[:, j] for j, name in enumerate(feature_names)})
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def request_bodies(matrix, feature_names):
+    """(name, body, content type) per request format"""
+    rows = matrix.tolist()
+    bodies = [
+        ('json_rows', json.dumps([dict(zip(feature_names, row)) for row in rows]).encode(), 'application/json'),
+        ('json_columns', json.dumps({'columns': {name: matrix[:, j].tolist() for j, name in enumerate(feature_names)}}).encode(),
+         'application/json'),
+        ('npy_float64', npy_bytes(matrix), NPY_MIMETYPE),
+        ('npy_float32', npy_bytes(matrix.astype(np.float32)), NPY_MIMETYPE),
+    ]
+    if pyarrow_module() is not None:
+        bodies.append(('arrow', arrow_bytes(matrix, feature_names), ARROW_MIMETYPE))
+    return bodies
+
+
+def main():
+    args = parse_args()
+    if not app.model_loaded:
+        sys.exit("❌ Thunderstorm model not loaded")
+    # Cap large enough for the biggest batch
+    app.BATCH_MAX_ROWS = max(app.BATCH_MAX_ROWS, max(args.sizes))
+    client = app.app.test_client()
+    rng = np.random.default_rng(0)
+    feature_names = app.predictor.feature_names
+    forest = app.predictor.model
+    accepts = ['application/json', NPY_MIMETYPE] + ([ARROW_MIMETYPE] if pyarrow_module() is not None else [])
+
+    report = {}
+    for size in args.sizes:
+        # Spread inputs over the forest's own split thresholds so rows reach varied leaves
+        matrix = np.empty((size, len(feature_names)))
+        for j in range(len(feature_names)):
+            thresholds = forest.threshold[forest.is_split & (forest.feature == j)]
+            matrix[:, j] = rng.uniform(thresholds.min() - 1, thresholds.max() + 1, size)
+        matrix = matrix.astype(np.float32).astype(np.float64)
+
+        scoring = best_ms(lambda: app.predictor.score_matrix(matrix), args.repeats)
+        report[size] = {'score_matrix_ms': round(scoring, 3)}
+        for name, body, content_type in request_bodies(matrix, feature_names):
+            entry = {'request_bytes': len(body)}
+            for accept in accepts:
+                def post():
+                    response = client.post('/api/ml/predict/batch', data=body, content_type=content_type,
+                                           headers={'Accept': accept})
+                    assert response.status_code == 200, response.data[:200]
+                    return response
+                entry[f"{accept.split('/')[-1]}_response_ms"] = round(best_ms(post, args.repeats), 3)
+                entry[f"{accept.split('/')[-1]}_response_bytes"] = len(post().data)
+            report[size][name] = entry
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
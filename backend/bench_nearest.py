@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the nearest-observation index
+Builds a NearestObservationIndex over --points random points on the globe,
+measures k-nearest query latency when idle and while observations stream in
+(triggering background rebuilds), and checks answers against brute force
+
+Usage: python3 bench_nearest.py [--points 1000000] [--k 5] [--queries 5000]
+"""
+
+import sys
+import json
+import argparse
+import threading
+import time
+
+import numpy as np
+
+from spatial_index import NearestObservationIndex, to_unit_vectors
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Measure nearest-observation lookup latency')
+    parser.add_argument('--points', type=int, default=1_000_000)
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--queries', type=int, default=5000)
+    parser.add_argument('--stream-batches', type=int, default=30, help='Batches of 1000 observations streamed in')
+    return parser.parse_args()
+
+
+def random_points(rng, n):
+    # Uniform over the sphere
+    return np.degrees(np.arcsin(rng.uniform(-1, 1, n))), rng.uniform(-180, 180, n)
+
+
+def percentiles_ms(timings):
+    timings = np.array(timings) * 1000
+    return {'p50_ms': round(float(np.percentile(timings, 50)), 4),
+            'p99_ms': round(float(np.percentile(timings, 99)), 4),
+            'max_ms': round(float(timings.max()), 3)}
+
+
+def main():
+    args = parse_args()
+    rng = np.random.default_rng(0)
+    n_features = 15
+    latitudes, longitudes = random_points(rng, args.points)
+    rows = rng.normal(size=(args.points, n_features))
+
+    index = NearestObservationIndex(n_features)
+    started = time.perf_counter()
+    index.add(range(args.points), latitudes, longitudes, rows)
+    index.rebuild()
+    build_s = time.perf_counter() - started
+
+    query_latitudes, query_longitudes = random_points(rng, args.queries)
+    idle = []
+    for latitude, longitude in zip(query_latitudes, query_longitudes):
+        query_started = time.perf_counter()
+        index.query(latitude, longitude, args.k)
+        idle.append(time.perf_counter() - query_started)
+
+    # Stream replacements and new points while another thread keeps querying
+    streaming = []
+    stop = threading.Event()
+
+    def querier():
+        position = 0
+        while not stop.is_set():
+            query_started = time.perf_counter()
+            index.query(query_latitudes[position % args.queries], query_longitudes[position % args.queries], args.k)
+            streaming.append(time.perf_counter() - query_started)
+            position += 1
+
+    latitudes = np.append(latitudes, np.zeros(args.points // 20))
+    longitudes = np.append(longitudes, np.zeros(args.points // 20))
+    rows = np.vstack([rows, np.zeros((args.points // 20, n_features))])
+    thread = threading.Thread(target=querier)
+    thread.start()
+    for _ in range(args.stream_batches):
+        ids = rng.integers(0, len(latitudes), 1000)
+        batch_latitudes, batch_longitudes = random_points(rng, 1000)
+        batch_rows = rng.normal(size=(1000, n_features))
+        index.add(ids, batch_latitudes, batch_longitudes, batch_rows)
+        latitudes[ids], longitudes[ids], rows[ids] = batch_latitudes, batch_longitudes, batch_rows
+        time.sleep(0.05)
+    while index.stats()['rebuilding']:
+        time.sleep(0.05)
+    stop.set()
+    thread.join()
+
+    live = np.array(sorted(int(point_id) for point_id in index._where))
+    xyz = to_unit_vectors(latitudes[live], longitudes[live])
+    mismatches = 0
+    for latitude, longitude in zip(query_latitudes[:50], query_longitudes[:50]):
+        distances = np.linalg.norm(xyz - to_unit_vectors([latitude], [longitude])[0], axis=1)
+        expected = [str(point_id) for point_id in live[np.argsort(distances)[:args.k]]]
+        found = index.query(latitude, longitude, args.k)
+        if [neighbor['id'] for neighbor in found] != expected or not all(
+                np.array_equal(neighbor['features'], rows[int(neighbor['id'])]) for neighbor in found):
+            mismatches += 1
+
+    report = {
+        'points': args.points,
+        'k': args.k,
+        'initial_build_s': round(build_s, 2),
+        'idle_query': percentiles_ms(idle),
+        'query_while_streaming': {**percentiles_ms(streaming), 'queries': len(streaming)},
+        'brute_force_mismatches': mismatches,
+        'index': index.stats(),
+    }
+    print(json.dumps(report, indent=2))
+    if mismatches:
+        print(f"❌ {mismatches} queries differ from brute force")
+        sys.exit(1)
+    print("✅ Nearest lookups match brute force")
+
+
+if __name__ == "__main__":
+    main()
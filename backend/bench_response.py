@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Benchmark of response building for batch predictions
+For each model, times turning one scoring pass into per-row result dicts
+(the per-row if/f-string loop the predictors used before vs the vectorized
+build_results) and serializing the batch response (stdlib json vs orjson),
+and checks that both paths produce the same results
+
+Usage: python3 bench_response.py [--rows 10000] [--repeats 10]
+"""
+
+import sys
+import json
+import argparse
+import time
+
+import numpy as np
+
+import app
+from json_codec import FastJSONProvider, orjson
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Measure response-building cost before and after vectorization')
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeats', type=int, default=10)
+    return parser.parse_args()
+
+
+def best_ms(fn, repeats):
+    fn()
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def legacy_thunderstorm_results(model_type, prediction_binary, thunderstorm_probability, confidence):
+    """The per-row loop build_results used before vectorization"""
+    results = []
+    for prediction, probability, row_confidence in zip(np.asarray(prediction_binary).tolist(),
+                                                       np.asarray(thunderstorm_probability).tolist(),
+                                                       np.asarray(confidence).tolist()):
+        if probability >= 0.75:
+            risk_level = "Red"
+            alert = f"SEVERE: {probability*100:.1f}% thunderstorm probability"
+        elif probability >= 0.50:
+            risk_level = "Yellow"
+            alert = f"MODERATE: {probability*100:.1f}% thunderstorm probability"
+        elif probability >= 0.25:
+            risk_level = "Yellow"
+            alert = f"LOW-MODERATE: {probability*100:.1f}% thunderstorm risk"
+        else:
+            risk_level = "Green"
+            alert = f"LOW: {probability*100:.1f}% thunderstorm risk"
+
+        results.append({
+            'prediction': int(prediction),
+            'probability': float(probability),
+            'confidence': float(row_confidence),
+            'risk_level': risk_level,
+            'riskLevel': risk_level,
+            'alert': alert,
+            'modelType': model_type
+        })
+    return results
+
+
+def legacy_windspeed_results(model_type, predicted_windspeeds):
+    """The per-row loop build_results used before vectorization"""
+    results = []
+    for predicted_windspeed in np.asarray(predicted_windspeeds, dtype=np.float64).tolist():
+        if predicted_windspeed < 5:
+            wind_category = "Light"
+            alert = f"Light winds: {predicted_windspeed:.1f} m/s - Calm conditions"
+        elif predicted_windspeed < 10:
+            wind_category = "Moderate"
+            alert = f"Moderate winds: {predicted_windspeed:.1f} m/s - Normal conditions"
+        elif predicted_windspeed < 15:
+            wind_category = "Strong"
+            alert = f"Strong winds: {predicted_windspeed:.1f} m/s - Be cautious"
+        else:
+            wind_category = "Very Strong"
+            alert = f"Very strong winds: {predicted_windspeed:.1f} m/s - High wind warning"
+
+        results.append({
+            'predicted_windspeed': float(predicted_windspeed),
+            'wind_category': wind_category,
+            'alert': alert,
+            'modelType': model_type
+        })
+    return results
+
+
+def sample_rows(predictor, n_rows, rng):
+    # Spread inputs over the forest's own split thresholds so rows reach varied leaves
+    forest = predictor.compiled
+    rows = np.empty((n_rows, len(predictor.feature_names)))
+    for j in range(rows.shape[1]):
+        thresholds = forest.threshold[forest.is_split & (forest.feature == j)]
+        low, high = (thresholds.min(), thresholds.max()) if len(thresholds) else (0.0, 1.0)
+        rows[:, j] = rng.uniform(low - 1, high + 1, n_rows)
+    return rows
+
+
+def main():
+    args = parse_args()
+    if not (app.model_loaded and app.windspeed_model_loaded):
+        sys.exit("❌ Both models must be loaded")
+    rng = np.random.default_rng(0)
+    stdlib_json = FastJSONProvider(app.app, enabled=False)
+    fast_json = FastJSONProvider(app.app)
+    report = {'rows': args.rows, 'orjson': orjson is not None}
+
+    for name, predictor, legacy in (('thunderstorm', app.predictor, legacy_thunderstorm_results),
+                                    ('windspeed', app.windspeed_predictor, legacy_windspeed_results)):
+        rows = sample_rows(predictor, args.rows, rng)
+        scores = predictor.score_matrix(rows)
+        scores = scores if isinstance(scores, tuple) else (scores,)
+        row_ids = list(range(args.rows))
+
+        before = legacy(predictor.model_type, *scores)
+        after = predictor.build_results(*scores)
+        if before != after:
+            sys.exit(f"❌ {name}: vectorized results differ from the per-row loop")
+        payload = {"success": True, "data": app.merge_batch_results(after, row_ids, {}, args.rows)}
+
+        with app.app.app_context():
+            if json.loads(stdlib_json.response(payload).data) != json.loads(fast_json.response(payload).data):
+                sys.exit(f"❌ {name}: orjson output differs from json")
+            build_before = best_ms(lambda: legacy(predictor.model_type, *scores), args.repeats)
+            build_after = best_ms(lambda: predictor.build_results(*scores), args.repeats)
+            serialize_before = best_ms(lambda: stdlib_json.response(payload), args.repeats)
+            serialize_after = best_ms(lambda: fast_json.response(payload), args.repeats)
+        score = best_ms(lambda: predictor.score_matrix(rows), args.repeats)
+
+        report[name] = {
+            'score_ms': round(score, 2),
+            'build_results_ms': {'before': round(build_before, 2), 'after': round(build_after, 2)},
+            'serialize_ms': {'before': round(serialize_before, 2), 'after': round(serialize_after, 2)},
+            'response_ms': {'before': round(build_before + serialize_before, 2),
+                            'after': round(build_after + serialize_after, 2)},
+        }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
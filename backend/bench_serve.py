@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the serving profiles on this host
+Starts the development server (`python3 app.py`, as run locally) and the
+production profile (`gunicorn`, gunicorn.conf.py) one after the other,
+drives each with --concurrency keep-alive clients for --duration seconds
+per scenario, and reports req/s, p50/p99 latency, errors and the servers'
+total PSS (memory with shared pages split between processes)
+
+Scenarios: predict (one uncached thunderstorm row per request), batch
+(--batch-rows rows per request) and health (no model work)
+
+Usage: python3 bench_serve.py [--duration 10] [--concurrency 16] [--workers N] [--threads 4]
+"""
+
+import sys
+import json
+import argparse
+import csv
+import http.client
+import os
+import signal
+import socket
+import subprocess
+import threading
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+SAMPLE_CSV = os.path.join(BACKEND_DIR, '..', 'Model', 'thunderstorm_sample_dataset.csv')
+SCENARIOS = {
+    'predict': ('POST', '/api/ml/predict'),
+    'batch': ('POST', '/api/ml/predict/batch'),
+    'health': ('GET', '/api/health'),
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Compare the dev server and the gunicorn profile')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds per scenario')
+    parser.add_argument('--concurrency', type=int, default=16, help='Concurrent client connections')
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--servers', nargs='+', choices=['dev', 'gunicorn'], default=['dev', 'gunicorn'])
+    parser.add_argument('--batch-rows', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=None, help='gunicorn workers (default: gunicorn.conf.py)')
+    parser.add_argument('--threads', type=int, default=None, help='gunicorn threads (default: gunicorn.conf.py)')
+    return parser.parse_args()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def sample_rows():
+    """Feature dicts of the sample dataset"""
+    with open(SAMPLE_CSV, newline='') as f:
+        skip = {'time_utc', 'latitude', 'longitude', 'thunder_label'}
+        return [{name: float(value) for name, value in row.items() if name not in skip} for row in csv.DictReader(f)]
+
+
+def request_bodies(scenario, rows, batch_rows, count=2000):
+    """Encoded bodies for a scenario; rows are jittered so the prediction cache never hits"""
+    if scenario == 'health':
+        return [None]
+    rng = np.random.default_rng(0)
+    names = list(rows[0])
+    matrix = np.array([[row[name] for name in names] for row in rows])
+    per_request = batch_rows if scenario == 'batch' else 1
+    bodies = []
+    for _ in range(count):
+        picked = matrix[rng.integers(len(matrix), size=per_request)]
+        picked = picked * rng.uniform(0.98, 1.02, picked.shape)
+        observations = [dict(zip(names, row)) for row in picked.tolist()]
+        bodies.append(json.dumps(observations if scenario == 'batch' else observations[0]).encode())
+    return bodies
+
+
+def start_server(kind, port, args):
+    env = dict(os.environ)
+    if kind == 'dev':
+        command = [sys.executable, 'app.py']
+        env['PORT'] = str(port)
+    else:
+        command = ['gunicorn', '--bind', f'127.0.0.1:{port}']
+        if args.workers:
+            command += ['--workers', str(args.workers)]
+        if args.threads:
+            command += ['--threads', str(args.threads)]
+    # Own session so the reloader's child / gunicorn's workers are stopped with it
+    server = subprocess.Popen(command, cwd=BACKEND_DIR, env=env, start_new_session=True,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f'{kind} server exited with {server.returncode}')
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/api/health')
+            if conn.getresponse().status == 200:
+                return server
+        except OSError:
+            time.sleep(0.2)
+    stop_server(server)
+    raise RuntimeError(f'{kind} server did not answer within 60 s')
+
+
+def stop_server(server):
+    try:
+        os.killpg(server.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        return
+    try:
+        server.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        os.killpg(server.pid, signal.SIGKILL)
+        server.wait()
+
+
+def session_pss_mb(session_id):
+    """Total PSS of every process in a session"""
+    total_kb = 0
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            if os.getsid(int(entry)) != session_id:
+                continue
+            with open(f'/proc/{entry}/smaps_rollup') as f:
+                for line in f:
+                    if line.startswith('Pss:'):
+                        total_kb += int(line.split()[1])
+        except OSError:
+            continue
+    return round(total_kb / 1024, 1)
+
+
+def client(port, method, path, bodies, offset, stop_at, latencies, errors):
+    conn = None
+    i = offset
+    while time.perf_counter() < stop_at:
+        body = bodies[i % len(bodies)]
+        i += 1
+        started = time.perf_counter()
+        try:
+            if conn is None:
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            conn.request(method, path, body=body, headers={'Content-Type': 'application/json'} if body else {})
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+            else:
+                latencies.append(time.perf_counter() - started)
+            # The dev server closes every connection
+            if response.will_close:
+                conn.close()
+                conn = None
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(type(e).__name__)
+            if conn is not None:
+                conn.close()
+            conn = None
+    if conn is not None:
+        conn.close()
+
+
+def run_load(port, scenario, bodies, args):
+    method, path = SCENARIOS[scenario]
+    # Short warm-up so both servers have imported lazily loaded code paths
+    client(port, method, path, bodies, 0, time.perf_counter() + 0.5, [], [])
+    latencies, errors = [], []
+    stop_at = time.perf_counter() + args.duration
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(port, method, path, bodies, n * 97, stop_at, latencies, errors))
+               for n in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    timings_ms = np.array(latencies) * 1000
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'req_per_s': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(float(np.percentile(timings_ms, 50)), 2) if len(timings_ms) else None,
+        'p99_ms': round(float(np.percentile(timings_ms, 99)), 2) if len(timings_ms) else None,
+    }
+
+
+def main():
+    args = parse_args()
+    rows = sample_rows()
+    bodies = {scenario: request_bodies(scenario, rows, args.batch_rows) for scenario in args.scenarios}
+    report = {'cpus': os.cpu_count(), 'concurrency': args.concurrency, 'duration_s': args.duration}
+
+    for kind in args.servers:
+        port = free_port()
+        print(f"⏳ {kind} server on port {port}", file=sys.stderr)
+        server = start_server(kind, port, args)
+        try:
+            result = {}
+            for scenario in args.scenarios:
+                result[scenario] = run_load(port, scenario, bodies[scenario], args)
+                print(f"   {scenario}: {result[scenario]}", file=sys.stderr)
+            result['pss_mb'] = session_pss_mb(server.pid)
+            report[kind] = result
+        finally:
+            stop_server(server)
+
+    if 'dev' in report and 'gunicorn' in report:
+        report['speedup'] = {
+            scenario: round(report['gunicorn'][scenario]['req_per_s'] / report['dev'][scenario]['req_per_s'], 2)
+            for scenario in args.scenarios if report['dev'][scenario]['req_per_s']
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
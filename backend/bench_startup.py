@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the Flask backend
+Imports app.py (which loads both models) in fresh interpreters, reports the
+startup time and fails when the median exceeds the budget or when
+training-only modules end up on the serving path
+
+Usage: python3 bench_startup.py [--runs 5] [--budget-ms 1000]
+"""
+
+import sys
+import json
+import argparse
+import os
+import statistics
+import subprocess
+
+# Never needed to serve predictions
+TRAINING_ONLY_MODULES = ['pandas', 'matplotlib', 'seaborn']
+
+CHILD_SCRIPT = '''
+import json, sys, time
+started = time.perf_counter()
+import app
+elapsed_ms = (time.perf_counter() - started) * 1000
+print(json.dumps({
+    "startup_ms": elapsed_ms,
+    "thunderstorm_model": app.model_loaded,
+    "windspeed_model": app.windspeed_model_loaded,
+    "modules": sorted(name for name in sys.modules if "." not in name),
+}))
+'''
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Measure backend cold-start time against a budget')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=float(os.environ.get('STARTUP_BUDGET_MS', 1000)))
+    return parser.parse_args()
+
+def run_once():
+    completed = subprocess.run(
+        [sys.executable, '-c', CHILD_SCRIPT],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True, check=True
+    )
+    # app.py prints load messages first; the measurement is the last line
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def main():
+    args = parse_args()
+    engine = os.environ.get('INFERENCE_ENGINE', 'compiled')
+    forbidden = TRAINING_ONLY_MODULES + (['sklearn'] if engine == 'compiled' else [])
+
+    runs = [run_once() for _ in range(max(1, args.runs))]
+    timings = [run['startup_ms'] for run in runs]
+    leaked = sorted({name for run in runs for name in run['modules'] if name in forbidden})
+    models_loaded = all(run['thunderstorm_model'] and run['windspeed_model'] for run in runs)
+    median_ms = statistics.median(timings)
+
+    report = {
+        'engine': engine,
+        'runs': len(runs),
+        'median_ms': round(median_ms, 1),
+        'min_ms': round(min(timings), 1),
+        'max_ms': round(max(timings), 1),
+        'budget_ms': args.budget_ms,
+        'models_loaded': models_loaded,
+        'forbidden_modules_imported': leaked,
+    }
+    print(json.dumps(report, indent=2))
+
+    failures = []
+    if median_ms > args.budget_ms:
+        failures.append(f"median startup {median_ms:.0f} ms exceeds budget {args.budget_ms:.0f} ms")
+    if leaked:
+        failures.append(f"serving path imports {leaked}")
+    if not models_loaded:
+        failures.append("models did not load")
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ Startup within budget")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the NDJSON streaming endpoints
+Starts the backend in a child process (threaded werkzeug server), uploads
+--rows observations as a chunked NDJSON body while reading the streamed
+results, and reports rows/s, time to the first result line and the server's
+idle and peak RSS
+
+Usage: python3 bench_stream.py [--rows 100000 1000000] [--path /api/ml/predict/stream]
+"""
+
+import sys
+import json
+import argparse
+import csv
+import http.client
+import os
+import subprocess
+import threading
+import time
+
+SERVER_SCRIPT = '''
+import app
+from werkzeug.serving import make_server
+server = make_server('127.0.0.1', 0, app.app, threaded=True)
+print(server.server_port, flush=True)
+server.serve_forever()
+'''
+
+SAMPLE_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Model', 'thunderstorm_sample_dataset.csv')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Measure NDJSON streaming throughput and server memory')
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--path', default='/api/ml/predict/stream')
+    parser.add_argument('--lines-per-chunk', type=int, default=256, help='Input lines per HTTP chunk')
+    return parser.parse_args()
+
+
+def sample_lines():
+    """Encoded NDJSON lines of the sample dataset's feature columns"""
+    with open(SAMPLE_CSV, newline='') as f:
+        reader = csv.DictReader(f)
+        skip = {'time_utc', 'latitude', 'longitude', 'thunder_label'}
+        return [json.dumps({name: float(value) for name, value in row.items() if name not in skip}).encode() + b'\n'
+                for row in reader]
+
+
+def rss_kb(pid):
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def upload(sock, lines, n_rows, lines_per_chunk):
+    sent = 0
+    while sent < n_rows:
+        count = min(lines_per_chunk, n_rows - sent)
+        body = b''.join(lines[(sent + i) % len(lines)] for i in range(count))
+        sock.sendall(b'%x\r\n%s\r\n' % (len(body), body))
+        sent += count
+    sock.sendall(b'0\r\n\r\n')
+    sock.close()
+
+
+def run(port, pid, path, lines, n_rows, lines_per_chunk):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=600)
+    conn.putrequest('POST', path)
+    conn.putheader('Content-Type', 'application/x-ndjson')
+    conn.putheader('Transfer-Encoding', 'chunked')
+    conn.endheaders()
+
+    peak = [rss_kb(pid)]
+    done = threading.Event()
+
+    def sample():
+        while not done.is_set():
+            value = rss_kb(pid)
+            if value is not None:
+                peak[0] = max(peak[0], value)
+            time.sleep(0.05)
+
+    started = time.perf_counter()
+    # Send and receive at the same time: results stream back while the body is still uploading.
+    # The sender gets its own handle, since getresponse() closes conn on a "Connection: close" reply
+    sender = threading.Thread(target=upload, args=(conn.sock.dup(), lines, n_rows, lines_per_chunk), daemon=True)
+    sampler = threading.Thread(target=sample, daemon=True)
+    sender.start()
+    sampler.start()
+
+    response = conn.getresponse()
+    results = 0
+    first_result_s = None
+    summary = None
+    for line in response:
+        if first_result_s is None:
+            first_result_s = time.perf_counter() - started
+        if line.startswith(b'{"done"'):
+            summary = json.loads(line)
+        else:
+            results += 1
+    elapsed = time.perf_counter() - started
+    done.set()
+    sender.join()
+    sampler.join()
+    conn.close()
+    return {
+        'rows': n_rows,
+        'results': results,
+        'summary': summary,
+        'seconds': round(elapsed, 2),
+        'rows_per_s': round(n_rows / elapsed),
+        'first_result_ms': round(first_result_s * 1000, 1) if first_result_s is not None else None,
+        'peak_rss_mb': round(peak[0] / 1024, 1) if peak[0] else None,
+    }
+
+
+def main():
+    args = parse_args()
+    server = subprocess.Popen([sys.executable, '-c', SERVER_SCRIPT], stdout=subprocess.PIPE,
+                              stderr=subprocess.DEVNULL, cwd=os.path.dirname(os.path.abspath(__file__)), text=True)
+    try:
+        # app prints its startup messages first; the port is the last line before serving
+        port = None
+        while port is None:
+            line = server.stdout.readline()
+            if not line:
+                raise RuntimeError('Server exited before listening')
+            if line.strip().isdigit():
+                port = int(line)
+
+        lines = sample_lines()
+        # Warm up so idle RSS includes the first batch's allocations
+        run(port, server.pid, args.path, lines, 5000, args.lines_per_chunk)
+        idle_kb = rss_kb(server.pid)
+        report = {'path': args.path, 'idle_rss_mb': round(idle_kb / 1024, 1) if idle_kb else None, 'runs': []}
+        for n_rows in args.rows:
+            report['runs'].append(run(port, server.pid, args.path, lines, n_rows, args.lines_per_chunk))
+        print(json.dumps(report, indent=2))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Input validation check for the single-observation prediction routes
+Sends valid and malformed bodies (null, non-object, null / non-numeric /
+missing features) through the Flask test client and checks that each valid
+request scores (200) and each bad one is rejected on its own (400, naming
+the bad field). Then sends bad rows concurrently with valid ones, through
+the routes and straight into one micro-batch, and checks that only the bad
+rows fail. Exits non-zero on any unexpected response
+
+Usage: python3 check_inputs.py
+"""
+
+import sys
+import json
+import os
+import threading
+
+os.environ.setdefault('SWEEP_ENABLED', '0')
+
+import numpy as np
+
+import app as api
+from microbatch import MicroBatcher
+
+VALID = {
+    'thunderstorm': {
+        'wind_sfc_speed_ms': 10, 'wind_sfc_dir_deg': 180, 'wind_500_speed_ms': 15, 'wind_500_dir_deg': 180,
+        'temp_2m_C': 20, 'temp_500_C': -5, 'rh_2m_pct': 60, 'pressure_sfc_hPa': 1013,
+        'precipitable_water_mm': 25, 'cloud_cover_frac': 0.5, 'cloud_top_temp_C': -20, 'CAPE_Jkg': 1000,
+        'Lifted_Index_C': 0, 'K_index': 25, 'shear_850_500_ms': 10
+    },
+    'windspeed': {
+        'IND': 1.2, 'RAIN': 0.5, 'IND.1': 0.8, 'T.MAX': 25, 'IND.2': 1.1, 'T.MIN.G': 15,
+        'wind_lag_1': 8.5, 'wind_lag_2': 7.2, 'wind_lag_3': 9.1, 'ma_3': 8.3, 'ma_5': 8.1, 'ma_7': 7.9,
+        'std_3': 1.2, 'std_5': 1.5, 'std_7': 1.8
+    },
+}
+ROUTES = {'thunderstorm': '/api/ml/predict', 'windspeed': '/api/windspeed/predict'}
+BAD_FEATURE = {'thunderstorm': 'CAPE_Jkg', 'windspeed': 'wind_lag_1'}
+
+
+def cases(model_name):
+    """(name, raw JSON body, expected status, text the error must contain)"""
+    valid = VALID[model_name]
+    field = BAD_FEATURE[model_name]
+    return [
+        ('valid', json.dumps(valid), 200, None),
+        ('numeric string', json.dumps({**valid, field: str(valid[field])}), 200, None),
+        ('null body', 'null', 400, 'JSON object'),
+        ('array body', json.dumps([valid]), 400, 'JSON object'),
+        ('string body', json.dumps('CAPE'), 400, 'JSON object'),
+        ('malformed body', '{"CAPE_Jkg": ', 400, 'JSON object'),
+        ('null feature', json.dumps({**valid, field: None}), 400, field),
+        ('non-numeric feature', json.dumps({**valid, field: 'high'}), 400, field),
+        ('boolean feature', json.dumps({**valid, field: True}), 400, field),
+        ('overflowing feature', json.dumps({**valid, field: '1e999'}), 400, field),
+        ('missing feature', json.dumps({k: v for k, v in valid.items() if k != field}), 400, field),
+    ]
+
+
+def concurrent_requests(route, bodies):
+    """Status codes of the bodies posted to route all at once"""
+    statuses = [None] * len(bodies)
+    barrier = threading.Barrier(len(bodies))
+
+    def post(index):
+        client = api.app.test_client()
+        barrier.wait()
+        statuses[index] = client.post(route, data=bodies[index], content_type='application/json').status_code
+
+    threads = [threading.Thread(target=post, args=(index,)) for index in range(len(bodies))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return statuses
+
+
+def shared_batch_outcomes(rows):
+    """'ok' or the error of each row, all rows queued into a single micro-batch"""
+    batched = []
+    batcher = MicroBatcher(lambda matrix: batched.append(len(matrix)) or api.predictor.predict_batch(matrix),
+                           window_ms=200, max_rows=len(rows), name='check')
+    futures = [batcher.submit(row) for row in rows]
+    outcomes = []
+    for future in futures:
+        try:
+            future.result(timeout=30)
+            outcomes.append('ok')
+        except Exception as e:
+            outcomes.append(str(e))
+    return outcomes, batched
+
+
+def main():
+    client = api.app.test_client()
+    failures = []
+    report = {}
+    for model_name, route in ROUTES.items():
+        report[model_name] = {}
+        for name, body, expected, message in cases(model_name):
+            response = client.post(route, data=body, content_type='application/json')
+            payload = response.get_json(silent=True) or {}
+            report[model_name][name] = response.status_code
+            if response.status_code != expected or (message and message not in payload.get('error', '')):
+                failures.append(f"{model_name} {name}: {response.status_code} {payload.get('error')}")
+
+    # Valid and invalid requests scored concurrently: only the invalid one fails
+    for model_name, route in ROUTES.items():
+        valid = json.dumps(VALID[model_name])
+        invalid = json.dumps({**VALID[model_name], BAD_FEATURE[model_name]: None})
+        statuses = concurrent_requests(route, [valid] * 8 + [invalid])
+        report[model_name]['concurrent (8 valid + 1 null)'] = statuses
+        if statuses != [200] * 8 + [400]:
+            failures.append(f"{model_name} concurrent: {statuses}")
+
+    # Rows that reach the batcher together: a non-finite row and a row the model rejects (wrong width)
+    if api.model_loaded:
+        row = [VALID['thunderstorm'][feature] for feature in api.predictor.feature_names]
+        rows = [row, row[:-1] + [np.nan], row, row[:-1], row]
+        outcomes, batched = shared_batch_outcomes(rows)
+        report['shared_batch'] = {'outcomes': outcomes, 'model_calls': batched}
+        if [outcome == 'ok' for outcome in outcomes] != [True, False, True, False, True]:
+            failures.append(f"shared batch: {outcomes}")
+
+    print(json.dumps(report, indent=2))
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✅ Every bad observation was rejected on its own")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Binary columnar batches for the batch prediction routes.
+
+Requests and responses can be NumPy ``.npy`` files or Arrow IPC streams
+instead of JSON, chosen by Content-Type and Accept:
+
+- ``application/x-npy`` in: a 2D float32/float64 array with one column per
+  feature (C or Fortran order), its columns named by an ``X-Feature-Names``
+  header (comma separated; default: the model's feature order), or a 1D
+  structured array with one float field per feature. The data section is
+  wrapped with ``np.frombuffer``, not parsed.
+- ``application/vnd.apache.arrow.stream`` in: a table with one float
+  column per feature (requires pyarrow).
+- Responses in either format carry one record per request row: ``success``
+  plus the model's numeric outputs, with categories as small integer codes
+  whose labels are listed in the ``X-Category-Labels`` header.
+"""
+
+import io
+
+import numpy as np
+
+NPY_MIMETYPE = 'application/x-npy'
+ARROW_MIMETYPE = 'application/vnd.apache.arrow.stream'
+BINARY_MIMETYPES = (NPY_MIMETYPE, ARROW_MIMETYPE)
+# Category code of rows that could not be scored
+NO_CATEGORY = 255
+
+
+def pyarrow_module():
+    """pyarrow, imported on first use (it is optional and slow to import), or None"""
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        return None
+    return pyarrow
+
+
+def read_npy(body):
+    """(array, dtype names) of an .npy body; the data section is a view of body, not a copy"""
+    stream = io.BytesIO(body)
+    try:
+        version = np.lib.format.read_magic(stream)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(stream)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(stream)
+    except (ValueError, SyntaxError):
+        raise ValueError("Body is not a valid .npy file")
+    if dtype.hasobject:
+        raise ValueError(".npy arrays of Python objects are not accepted")
+    count = int(np.prod(shape))
+    if len(body) - stream.tell() < count * dtype.itemsize:
+        raise ValueError(".npy body is shorter than its header says")
+    array = np.frombuffer(body, dtype=dtype, count=count, offset=stream.tell())
+    return array.reshape(shape, order='F' if fortran_order else 'C'), dtype.names
+
+
+def _select_columns(columns, names, feature_names, total):
+    """(total, n_features) matrix in feature_names order from per-name column getters"""
+    missing_params = [param for param in feature_names if param not in names]
+    if missing_params:
+        raise ValueError(f"Missing parameters: {missing_params}")
+    matrix = np.empty((total, len(feature_names)), dtype=np.float64)
+    for j, feature in enumerate(feature_names):
+        matrix[:, j] = columns(feature)
+    return matrix
+
+
+def decode_npy(body, feature_names, column_names=None):
+    """(N, n_features) float matrix from an .npy body.
+
+    A 2D array already in feature_names order is returned as the wrapped
+    buffer itself (no copy); otherwise its columns are gathered into a new
+    matrix.
+    """
+    array, field_names = read_npy(body)
+    if field_names is not None:
+        if array.ndim != 1:
+            raise ValueError("Structured .npy arrays must be one-dimensional")
+        if any(array.dtype[name].kind not in 'fiu' for name in field_names):
+            raise ValueError("Every .npy field must be numeric")
+        return _select_columns(lambda name: array[name], field_names, feature_names, len(array))
+
+    if array.ndim != 2 or array.dtype.kind not in 'fiu':
+        raise ValueError("Expected a 2D numeric .npy array with one column per feature")
+    names = list(column_names) if column_names is not None else list(feature_names)
+    if len(names) != array.shape[1]:
+        raise ValueError(f"Array has {array.shape[1]} columns but {len(names)} feature names were given")
+    if len(set(names)) != len(names):
+        raise ValueError("Feature names must be unique")
+    if names == list(feature_names) and array.dtype.kind == 'f':
+        return array
+    positions = {name: j for j, name in enumerate(names)}
+    return _select_columns(lambda name: array[:, positions[name]], positions, feature_names, len(array))
+
+
+def decode_arrow(body, feature_names):
+    """(N, n_features) float matrix from an Arrow IPC stream body"""
+    pyarrow = pyarrow_module()
+    if pyarrow is None:
+        raise LookupError("Arrow bodies need the pyarrow package, which is not installed")
+    try:
+        table = pyarrow.ipc.open_stream(body).read_all()
+    except (pyarrow.ArrowInvalid, OSError):
+        raise ValueError("Body is not a valid Arrow IPC stream")
+
+    def column(name):
+        values = table.column(name)
+        if not pyarrow.types.is_integer(values.type) and not pyarrow.types.is_floating(values.type):
+            raise ValueError(f"Column {name} must be numeric")
+        # Nulls become NaN and are reported per row like non-numeric JSON values
+        return values.cast(pyarrow.float64()).to_numpy(zero_copy_only=False)
+
+    return _select_columns(column, table.column_names, feature_names, table.num_rows)
+
+
+def parse_feature_names_header(value):
+    if value is None:
+        return None
+    return [name.strip() for name in value.split(',')]
+
+
+def encode_npy(columns):
+    """.npy bytes of a 1D structured array with one field per (name, array) of columns"""
+    columns = [(name, np.asarray(values)) for name, values in columns.items()]
+    total = len(columns[0][1]) if columns else 0
+    records = np.empty(total, dtype=[(name, values.dtype) for name, values in columns])
+    for name, values in columns:
+        records[name] = values
+    stream = io.BytesIO()
+    np.lib.format.write_array(stream, records, allow_pickle=False)
+    return stream.getvalue()
+
+
+def encode_arrow(columns):
+    """Arrow IPC stream bytes of a table with the given (name, array) columns"""
+    pyarrow = pyarrow_module()
+    if pyarrow is None:
+        raise LookupError("Arrow responses need the pyarrow package, which is not installed")
+    table = pyarrow.table({name: np.asarray(values) for name, values in columns.items()})
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def scatter_rows(values, row_ids, total, missing):
+    """Array of length total with values at row_ids and missing everywhere else"""
+    out = np.full(total, missing, dtype=values.dtype)
+    out[row_ids] = values
+    return out
+
+
+def category_codes(values, thresholds):
+    """uint8 band index of each value over ascending thresholds (value >= threshold moves up); NO_CATEGORY for NaN"""
+    codes = np.searchsorted(thresholds, values, side='right').astype(np.uint8)
+    codes[np.isnan(values)] = NO_CATEGORY
+    return codes
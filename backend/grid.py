@@ -0,0 +1,242 @@
+"""
+Gridded thunderstorm risk over latitude/longitude.
+
+A ``GridField`` describes inputs over a bounding box: scalar base values for
+every feature, optionally overridden per cell by (height, width) arrays.
+Any set of cell centres (a requested raster, or a web-mercator map tile) is
+sampled from it nearest-cell, stacked into one feature matrix and scored in
+a single vectorized pass. Rasters are returned as one uint8 per cell, row
+major from the north-west corner, with 255 marking cells without data.
+Scored tiles are kept in an LRU keyed on (model version, input hash, z, x, y).
+"""
+
+import hashlib
+import json
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+NO_DATA = 255
+ENCODINGS = ('probability', 'risk')
+# Deepest web-mercator zoom served; beyond it 2 ** z overflows the float tile math
+MAX_ZOOM = 24
+
+
+class GridField:
+    """Feature inputs over a lat/lon bounding box"""
+
+    def __init__(self, bbox, width, height, base, grids):
+        self.west, self.south, self.east, self.north = bbox
+        self.width = width
+        self.height = height
+        self.base = base
+        self.grids = grids
+
+    @classmethod
+    def from_payload(cls, payload, feature_names, max_cells):
+        """Validate a request body: {"bbox", "width"/"height" or "resolution", "base", "grids"}"""
+        if not isinstance(payload, dict):
+            raise ValueError("Request body must be a JSON object")
+        try:
+            bbox = [float(value) for value in payload['bbox']]
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("'bbox' must be [west, south, east, north]")
+        if len(bbox) != 4 or not all(math.isfinite(value) for value in bbox):
+            raise ValueError("'bbox' must be [west, south, east, north]")
+        west, south, east, north = bbox
+        if not (-180 <= west < east <= 180 and -90 <= south < north <= 90):
+            raise ValueError("'bbox' must satisfy -180 <= west < east <= 180 and -90 <= south < north <= 90")
+
+        try:
+            if 'resolution' in payload:
+                resolution = float(payload['resolution'])
+                if not resolution > 0:
+                    raise ValueError
+                width = math.ceil(round((east - west) / resolution, 9))
+                height = math.ceil(round((north - south) / resolution, 9))
+            else:
+                width, height = int(payload['width']), int(payload['height'])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("Give a positive 'resolution' (degrees) or integer 'width' and 'height'")
+        if width < 1 or height < 1:
+            raise ValueError("Grid must have at least one cell")
+        if width * height > max_cells:
+            raise ValueError(f"Grid too large: {width}x{height} cells (max {max_cells})")
+
+        base = payload.get('base', {})
+        grids = payload.get('grids', {})
+        if not isinstance(base, dict) or not isinstance(grids, dict):
+            raise ValueError("'base' and 'grids' must be objects keyed by feature name")
+        unknown = [name for name in list(base) + list(grids) if name not in feature_names]
+        if unknown:
+            raise ValueError(f"Unknown features: {unknown}")
+        missing = [name for name in feature_names if name not in base and name not in grids]
+        if missing:
+            raise ValueError(f"Missing parameters (give a base value or a grid): {missing}")
+
+        parsed_base = {}
+        for name, value in base.items():
+            if name in grids:
+                continue
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+                raise ValueError(f"Base value for {name} must be a finite number")
+            parsed_base[name] = float(value)
+        parsed_grids = {}
+        for name, values in grids.items():
+            try:
+                array = np.array(values, dtype=np.float64)
+            except (TypeError, ValueError):
+                raise ValueError(f"Grid for {name} must be numeric")
+            # Row-major flat arrays are accepted as well as nested rows
+            if array.shape not in ((height, width), (height * width,)):
+                raise ValueError(f"Grid for {name} must be {height}x{width} (rows north to south)")
+            # Kept as float32: registered fields stay in memory, and half the bytes doubles how many fit
+            with np.errstate(over='ignore'):
+                parsed_grids[name] = array.reshape(height, width).astype(np.float32)
+        return cls(bbox, width, height, parsed_base, parsed_grids)
+
+    @property
+    def nbytes(self):
+        """Memory held by the per-cell grids"""
+        return sum(grid.nbytes for grid in self.grids.values())
+
+    def cell_centers(self):
+        """Longitudes (width,) and latitudes (height,) of this field's own cell centres, north first"""
+        longitudes = self.west + (np.arange(self.width) + 0.5) * (self.east - self.west) / self.width
+        latitudes = self.north - (np.arange(self.height) + 0.5) * (self.north - self.south) / self.height
+        return longitudes, latitudes
+
+    def sample(self, longitudes, latitudes, feature_names):
+        """(rows, cols, features) inputs at the given cell centres, nearest field cell; NaN outside the field"""
+        cols = np.floor((longitudes - self.west) / (self.east - self.west) * self.width).astype(np.intp)
+        rows = np.floor((self.north - latitudes) / (self.north - self.south) * self.height).astype(np.intp)
+        col_ok = (cols >= 0) & (cols < self.width)
+        row_ok = (rows >= 0) & (rows < self.height)
+        cols = np.clip(cols, 0, self.width - 1)
+        rows = np.clip(rows, 0, self.height - 1)
+
+        inputs = np.empty((len(latitudes), len(longitudes), len(feature_names)), dtype=np.float64)
+        for j, name in enumerate(feature_names):
+            if name in self.grids:
+                inputs[:, :, j] = self.grids[name][rows[:, np.newaxis], cols[np.newaxis, :]]
+            else:
+                inputs[:, :, j] = self.base[name]
+        inputs[~(row_ok[:, np.newaxis] & col_ok[np.newaxis, :])] = np.nan
+        return inputs
+
+
+def input_hash(payload):
+    """Stable short hash of a grid request body"""
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+
+def tile_bounds(z, x, y):
+    """[west, south, east, north] of web-mercator tile z/x/y in degrees"""
+    n = 2 ** z
+    west, east = x / n * 360.0 - 180.0, (x + 1) / n * 360.0 - 180.0
+    north = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    south = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 1) / n))))
+    return [west, south, east, north]
+
+
+def tile_cell_centers(z, x, y, size):
+    """Longitudes and latitudes of the size x size pixel centres of web-mercator tile z/x/y"""
+    if not 0 <= z <= MAX_ZOOM:
+        raise ValueError(f"Zoom {z} is out of range; expected 0 to {MAX_ZOOM}")
+    n = 2 ** z
+    if not (0 <= x < n and 0 <= y < n):
+        raise ValueError(f"Tile {z}/{x}/{y} does not exist")
+    offsets = (np.arange(size) + 0.5) / size
+    longitudes = (x + offsets) / n * 360.0 - 180.0
+    latitudes = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * (y + offsets) / n))))
+    return longitudes, latitudes
+
+
+def score_cells(inputs, score_fn):
+    """P(thunderstorm) per cell of a (rows, cols, features) input block; NaN where inputs are missing"""
+    flat = inputs.reshape(-1, inputs.shape[-1])
+    valid = np.isfinite(flat).all(axis=1)
+    probability = np.full(len(flat), np.nan)
+    if valid.any():
+        probability[valid] = score_fn(flat[valid])
+    return probability.reshape(inputs.shape[:2])
+
+
+def encode_raster(probability, encoding, thresholds):
+    """uint8 raster bytes: probability scaled to 0-254, or risk level (thresholds crossed); 255 is no data"""
+    missing = np.isnan(probability)
+    if encoding == 'risk':
+        raster = np.searchsorted(thresholds, np.nan_to_num(probability), side='right').astype(np.uint8)
+    elif encoding == 'probability':
+        raster = np.rint(np.nan_to_num(probability) * 254).astype(np.uint8)
+    else:
+        raise ValueError(f"Unknown encoding '{encoding}', expected one of {ENCODINGS}")
+    raster[missing] = NO_DATA
+    return raster.tobytes()
+
+
+class LRUStore:
+    """Small thread-safe LRU map with hit/miss counters.
+
+    Bounded by entry count, by the total ``nbytes`` of the values, or both
+    (None disables a bound). The newest entry is always kept.
+    """
+
+    def __init__(self, max_size=256, name='lru', max_bytes=None):
+        self.max_size = max(1, int(max_size)) if max_size is not None else None
+        self.max_bytes = int(max_bytes) if max_bytes is not None else None
+        self.name = name
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= getattr(previous, 'nbytes', 0)
+            self._entries[key] = value
+            self._bytes += getattr(value, 'nbytes', 0)
+            while len(self._entries) > 1 and self._over_limit():
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= getattr(evicted, 'nbytes', 0)
+                self._evictions += 1
+
+    def _over_limit(self):
+        return ((self.max_size is not None and len(self._entries) > self.max_size)
+                or (self.max_bytes is not None and self._bytes > self.max_bytes))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else None,
+                'evictions': self._evictions,
+            }
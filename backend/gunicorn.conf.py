@@ -0,0 +1,98 @@
+"""
+Production serving profile for the Flask API
+
+    cd backend
+    gunicorn                      # picks up this file from the working directory
+
+The master imports app.py once (both models load there), moves everything
+it allocated into the permanent GC generation with gc.freeze() and then
+forks the workers, so the forests stay copy-on-write shared instead of
+being copied into every worker. Each worker is a gthread worker: a few
+threads per process share the worker's micro-batcher and caches.
+
+There is one worker per CPU by default. app.py keeps state in process
+memory, and every worker holds its own copy: uploaded grid fields and their
+tiles, station histories, the location store and its sweep, points added to
+the nearest-observation index, and the prediction caches and micro-batchers.
+The routes in STATEFUL_ROUTES answer from the worker that handles them; the
+prediction routes are stateless. Set WEB_CONCURRENCY=1 when clients rely on
+the stateful routes.
+
+Environment knobs (all optional):
+    GUNICORN_BIND         address to listen on (default 0.0.0.0:5001)
+    WEB_CONCURRENCY       worker processes (default: one per CPU)
+    GUNICORN_THREADS      threads per worker (default 4)
+    GUNICORN_TIMEOUT      seconds before a silent worker is restarted (default 60)
+    GUNICORN_KEEPALIVE    seconds to keep idle client connections open (default 5)
+    GUNICORN_ACCESS_LOG   access log path, '-' for stdout (default: off)
+
+`kill -HUP <master>` reloads both models in the master and replaces the
+workers gracefully; POST /api/models/reload only reloads the worker that
+handles it.
+"""
+
+import gc
+import multiprocessing
+import os
+import sys
+import threading
+
+
+# Routes that read or write per-process state; each request sees only the copy of the worker that handles it
+STATEFUL_ROUTES = (
+    '/api/ml/grid/fields', '/api/ml/grid/tiles/<field_hash>/<z>/<x>/<y>',
+    '/api/locations', '/api/locations/<location_id>/observations', '/api/locations/observations',
+    '/api/ml/predict/<location_id>', '/api/windspeed/predict/<location_id>',
+    '/api/windspeed/stations/<station_id>/observations', '/api/windspeed/stations/observations',
+    '/api/windspeed/forecast', '/api/ml/nearest', '/api/models/reload', '/api/metrics',
+)
+
+wsgi_app = 'app:app'
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5001')
+
+# One process per CPU sharing the preloaded models; threads keep slow clients, streaming
+# uploads and micro-batch waits from holding a worker (NumPy releases the GIL while scoring)
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# Load the models once in the master and fork the workers from it
+preload_app = True
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+graceful_timeout = 30
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+backlog = 2048
+# Worker heartbeat files on tmpfs: a slow disk can otherwise stall workers
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG')
+errorlog = '-'
+proc_name = 'thundercast-api'
+
+
+def _freeze_heap():
+    # Keep the loaded models out of the cyclic GC so workers do not dirty their pages
+    gc.collect()
+    gc.freeze()
+
+
+def when_ready(server):
+    # Threads do not survive fork; app.py starts its background threads lazily in the workers
+    if threading.active_count() > 1:
+        server.log.warning("⚠️ %d threads running in the master before fork", threading.active_count())
+    if server.cfg.workers > 1:
+        server.log.info("ℹ️ %d workers each keep their own in-memory state; these routes answer from the worker "
+                        "that handles them: %s", server.cfg.workers, ', '.join(STATEFUL_ROUTES))
+    _freeze_heap()
+    server.log.info("🚀 Models preloaded, %d objects frozen; forking %d workers x %d threads",
+                    gc.get_freeze_count(), server.cfg.workers, server.cfg.threads)
+
+
+def on_reload(server):
+    # HUP: the preloaded app is not re-imported, so reload the models before new workers fork
+    app = sys.modules['app']
+    gc.unfreeze()
+    app.load_models()
+    _freeze_heap()
+    server.log.info("🔄 Reloaded models in the master")
@@ -0,0 +1,50 @@
+"""
+JSON encoding for API responses.
+
+``FastJSONProvider`` plugs into Flask (``app.json``) so every ``jsonify``
+goes through orjson when it is installed, falling back to the standard
+library otherwise. Output is the same JSON: keys stay sorted, debug mode
+still indents. orjson writes non-ASCII text as UTF-8 instead of \\u escapes
+and NaN/Infinity as null.
+"""
+
+import json
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json only
+    orjson = None
+
+
+def dumps_bytes(obj):
+    """Compact JSON bytes, keys in insertion order (for NDJSON lines)"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, separators=(',', ':')).encode()
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that serializes responses with orjson when available"""
+
+    def __init__(self, app, enabled=True):
+        super().__init__(app)
+        self.enabled = enabled and orjson is not None
+
+    def _orjson_option(self, indent):
+        # Non-string keys (e.g. histogram buckets) become strings, as with json.dumps
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def response(self, *args, **kwargs):
+        if not self.enabled:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(obj, default=self.default, option=self._orjson_option(indent))
+        return self._app.response_class(body, mimetype=self.mimetype)
@@ -0,0 +1,128 @@
+"""
+Dynamic micro-batching for single-row model predictions.
+
+Concurrent requests each submit one feature row; a background thread collects
+rows for up to ``window_ms`` (or until ``max_rows`` are queued), scores the
+stacked matrix with one vectorized call and fans the results back out.
+A row that cannot be scored fails only its own request: non-finite rows are
+rejected at submit, and when a batch call raises, its rows are retried one
+by one so the error reaches only the rows that cause it.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class MicroBatcher:
+    """Coalesce concurrent single-row predictions into one model call"""
+
+    def __init__(self, score_fn, window_ms=2.0, max_rows=256, name='model'):
+        # score_fn takes an (N, n_features) matrix and returns N per-row results
+        self.score_fn = score_fn
+        self.window_ms = float(window_ms)
+        self.max_rows = max(1, int(max_rows))
+        self.name = name
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._rows = 0
+        self._max_batch_size = 0
+        self._histogram = {}
+        self._wait_seconds = 0.0
+
+    def submit(self, row):
+        """Queue one feature row and return a Future for its result"""
+        future = Future()
+        try:
+            row = np.asarray(row, dtype=np.float64).reshape(-1)
+        except (TypeError, ValueError) as e:
+            future.set_exception(ValueError(f"Row is not numeric: {e}"))
+            return future
+        if not np.isfinite(row).all():
+            future.set_exception(ValueError("Row contains NaN or infinity"))
+            return future
+        self._ensure_started()
+        self._queue.put((row, time.perf_counter(), future))
+        return future
+
+    def predict(self, row, timeout=None):
+        """Score one feature row through the shared batch and wait for the result"""
+        return self.submit(row).result(timeout)
+
+    def _ensure_started(self):
+        # Started lazily so the worker thread is created in the process that serves requests
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=f"microbatch-{self.name}", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        window = self.window_ms / 1000.0
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.perf_counter() + window
+            while len(batch) < self.max_rows:
+                remaining = deadline - time.perf_counter()
+                try:
+                    if remaining > 0:
+                        batch.append(self._queue.get(timeout=remaining))
+                    else:
+                        # Window closed: still take whatever is already waiting
+                        batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._dispatch(batch)
+
+    def _dispatch(self, batch):
+        started = time.perf_counter()
+        try:
+            matrix = np.vstack([row for row, _, _ in batch])
+            results = self.score_fn(matrix)
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][2].set_exception(e)
+                return
+            # Isolate the failing rows instead of failing every request in the batch
+            for item in batch:
+                self._dispatch([item])
+            return
+
+        for (_, _, future), result in zip(batch, results):
+            future.set_result(result)
+        self._record(batch, started)
+
+    def _record(self, batch, started):
+        size = len(batch)
+        # Power-of-two buckets: 1, 2-3, 4-7, ...
+        low = 1 << (size.bit_length() - 1)
+        bucket = str(low) if low == 1 else f"{low}-{2 * low - 1}"
+        with self._stats_lock:
+            self._batches += 1
+            self._rows += size
+            self._max_batch_size = max(self._max_batch_size, size)
+            self._histogram[bucket] = self._histogram.get(bucket, 0) + 1
+            self._wait_seconds += sum(started - queued for _, queued, _ in batch)
+
+    def stats(self):
+        """Achieved batch sizes and queueing delay, for tuning window/size knobs"""
+        with self._stats_lock:
+            return {
+                'window_ms': self.window_ms,
+                'max_rows': self.max_rows,
+                'batches': self._batches,
+                'rows': self._rows,
+                'mean_batch_size': round(self._rows / self._batches, 3) if self._batches else 0.0,
+                'max_batch_size': self._max_batch_size,
+                'batch_size_histogram': dict(sorted(self._histogram.items(), key=lambda item: int(item[0].split('-')[0]))),
+                'mean_queue_wait_ms': round(self._wait_seconds / self._rows * 1000, 4) if self._rows else 0.0,
+                'queued': self._queue.qsize()
+            }
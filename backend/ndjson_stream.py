@@ -0,0 +1,98 @@
+"""
+Streaming NDJSON scoring.
+
+The request body is read line by line from the WSGI input stream (chunked
+uploads included), observations are scored in small batches and one result
+line per observation is yielded as soon as its batch is done, so neither
+the upload nor the response is ever held in memory as a whole.
+
+Each input line is a JSON object of features, optionally with an "id" that
+is echoed back, or {"id": ..., "parameters": {...}}. Blank lines are
+skipped. A final {"done": true, ...} line carries the counts.
+"""
+
+import json
+
+from json_codec import dumps_bytes
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+def read_lines(stream, max_line_bytes, block_bytes=65536):
+    """Non-blank lines of a byte stream; raises ValueError on a line longer than max_line_bytes.
+
+    Reads in blocks: the dechunking input of some WSGI servers implements
+    readline() one byte at a time.
+    """
+    pending = b''
+    while True:
+        block = stream.read(block_bytes)
+        if not block:
+            break
+        lines = (pending + block).split(b'\n')
+        pending = lines.pop()
+        if len(pending) > max_line_bytes:
+            raise ValueError(f"Line longer than {max_line_bytes} bytes")
+        for line in lines:
+            if len(line) > max_line_bytes:
+                raise ValueError(f"Line longer than {max_line_bytes} bytes")
+            if line.strip():
+                yield line
+    if pending.strip():
+        yield pending
+
+
+def _observation(line):
+    """(observation, id, error) for one input line"""
+    try:
+        observation = json.loads(line)
+    except ValueError:
+        return None, None, "Line is not valid JSON"
+    if not isinstance(observation, dict):
+        return None, None, "Observation must be a JSON object"
+    if isinstance(observation.get('parameters'), dict):
+        return observation['parameters'], observation.get('id'), None
+    return observation, observation.get('id'), None
+
+
+def score_lines(lines, parse_batch, score_batch, batch_rows):
+    """Yield NDJSON result bytes, one chunk per batch of batch_rows input lines.
+
+    parse_batch(observations) -> (matrix, row_ids, errors, total) as for the
+    JSON batch routes; score_batch(matrix) -> per-row result dicts.
+    """
+    counts = {'count': 0, 'succeeded': 0, 'failed': 0}
+
+    def flush(batch):
+        offset = counts['count']
+        observations = [observation for observation, _, _ in batch]
+        # Unparseable lines are replaced by None so parse_batch keeps the indices aligned
+        matrix, row_ids, errors, _ = parse_batch(observations)
+        errors.update({index: error for index, (_, _, error) in enumerate(batch) if error})
+        records = [None] * len(batch)
+        for index, result in zip(row_ids, score_batch(matrix) if len(row_ids) else []):
+            records[index] = {'index': offset + index, 'success': True, **result}
+        for index, error in errors.items():
+            records[index] = {'index': offset + index, 'success': False, 'error': error}
+        for record, (_, row_id, _) in zip(records, batch):
+            if row_id is not None:
+                record['id'] = row_id
+        counts['count'] += len(batch)
+        counts['succeeded'] += len(row_ids)
+        counts['failed'] += len(errors)
+        return b'\n'.join(dumps_bytes(record) for record in records) + b'\n'
+
+    batch = []
+    try:
+        for line in lines:
+            batch.append(_observation(line))
+            if len(batch) >= batch_rows:
+                yield flush(batch)
+                batch = []
+        if batch:
+            yield flush(batch)
+    except ValueError as e:
+        # The status line is long gone; report the abort in-band and stop
+        yield dumps_bytes({'done': True, 'success': False, 'error': str(e), **counts}) + b'\n'
+        return
+    yield dumps_bytes({'done': True, 'success': True, **counts}) + b'\n'
@@ -0,0 +1,87 @@
+"""
+Per-location store of the latest observations and their precomputed predictions.
+
+Both models run when an observation is ingested; reads are a single dict
+lookup and never touch a forest. Records are replaced, never mutated, so
+readers always see a complete record without taking the lock.
+"""
+
+import threading
+from datetime import datetime
+
+
+class ObservationStore:
+    """Latest observation and prediction per location and model"""
+
+    def __init__(self, models=('thunderstorm', 'windspeed')):
+        self.models = tuple(models)
+        self._lock = threading.Lock()
+        self._records = {}
+        self._ingested = 0
+
+    def get(self, location_id, model):
+        """Stored {'features', 'result', 'observed_at', 'version'} for a location, or None"""
+        record = self._records.get(location_id)
+        return record.get(model) if record else None
+
+    def put_many(self, model, location_ids, rows, results, observed_at=None, version=None):
+        """Store one model's scored observations for several locations at once, tagged with the model version"""
+        observed_at = observed_at or datetime.now().isoformat()
+        with self._lock:
+            for location_id, row, result in zip(location_ids, rows, results):
+                record = dict(self._records.get(location_id, {}))
+                record[model] = {'features': list(row), 'result': result, 'observed_at': observed_at, 'version': version}
+                self._records[location_id] = record
+                self._ingested += 1
+
+    def rescore(self, model, score_fn, version=None):
+        """Recompute stored results from the stored features (e.g. after a model reload).
+
+        score_fn maps a list of feature rows to one result per row. Locations
+        re-ingested while scoring keep their newer observation.
+        """
+        location_ids, rows, _ = self.observations(model)
+        if not rows:
+            return 0
+        results = score_fn(rows)
+        with self._lock:
+            for location_id, row, result in zip(location_ids, rows, results):
+                record = self._records.get(location_id)
+                entry = record.get(model) if record else None
+                if entry is None or entry['features'] is not row:
+                    continue
+                self._records[location_id] = {**record, model: {**entry, 'result': result, 'version': version}}
+        return len(rows)
+
+    def observations(self, model):
+        """(location_ids, feature rows, observed_at) of every location with an observation for model"""
+        entries = self._entries(model)
+        return ([location_id for location_id, _ in entries],
+                [entry['features'] for _, entry in entries],
+                [entry['observed_at'] for _, entry in entries])
+
+    def scored_observations(self, model, version):
+        """observations(model) plus each stored result, or None where it was scored by another model version"""
+        entries = self._entries(model)
+        return ([location_id for location_id, _ in entries],
+                [entry['features'] for _, entry in entries],
+                [entry['observed_at'] for _, entry in entries],
+                [entry['result'] if entry['version'] == version else None for _, entry in entries])
+
+    def _entries(self, model):
+        with self._lock:
+            records = list(self._records.items())
+        return [(location_id, record[model]) for location_id, record in records if model in record]
+
+    def location_ids(self):
+        with self._lock:
+            return list(self._records)
+
+    def stats(self):
+        with self._lock:
+            records = list(self._records.values())
+        return {
+            'locations': len(records),
+            'ingested': self._ingested,
+            **{model: sum(model in record for record in records) for model in self.models},
+        }
@@ -0,0 +1,113 @@
+"""
+Bounded LRU cache with a TTL for single-row model predictions.
+
+Rows are keyed on their feature values rounded to a per-feature number of
+decimal places (``feature_precision`` in the model info JSON; negative values
+round to tens, hundreds, ...), so repeated and near-identical observations
+share one forest evaluation. Clearing the cache starts a new generation:
+results still being computed against the previous model are not stored.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+def load_feature_precision(info_path, feature_names):
+    """Per-feature decimal places from a model info JSON; None means exact match"""
+    try:
+        with open(info_path) as f:
+            precision = json.load(f).get('feature_precision', {})
+    except (OSError, ValueError):
+        precision = {}
+    return [precision.get(feature) for feature in feature_names]
+
+
+class PredictionCache:
+    """Thread-safe LRU + TTL cache keyed on quantized feature rows"""
+
+    def __init__(self, precision=None, max_size=4096, ttl_s=60.0, name='model'):
+        self.max_size = max(1, int(max_size))
+        self.ttl_s = float(ttl_s)
+        self.name = name
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+        self._set_precision(precision)
+
+    def _set_precision(self, precision):
+        if precision is None:
+            self._scale = None
+            return
+        self._exact = np.array([digits is None for digits in precision])
+        self._scale = np.array([10.0 ** (digits or 0) for digits in precision])
+
+    def key(self, row):
+        """Bucket key of one feature row"""
+        row = np.asarray(row, dtype=np.float64).reshape(-1)
+        if self._scale is not None and len(self._scale) == len(row):
+            row = np.where(self._exact, row, np.rint(row * self._scale))
+        # + 0.0 folds -0.0 into 0.0 so both land in the same bucket
+        return (row + 0.0).tobytes()
+
+    def get_or_compute(self, row, compute):
+        """Return the cached result for row's bucket, or compute(row) and cache it"""
+        key = self.key(row)
+        with self._lock:
+            generation = self._generation
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return value
+                del self._entries[key]
+                self._expirations += 1
+            self._misses += 1
+
+        value = compute(row)
+
+        with self._lock:
+            # A reload happened while computing: the result belongs to the old model
+            if generation == self._generation:
+                self._entries[key] = (value, time.monotonic() + self.ttl_s)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self._evictions += 1
+        return value
+
+    def clear(self, precision=None):
+        """Drop every entry (e.g. after a model reload), optionally with new precision"""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self._invalidations += 1
+            if precision is not None:
+                self._set_precision(precision)
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'max_size': self.max_size,
+                'ttl_s': self.ttl_s,
+                'size': len(self._entries),
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+                'invalidations': self._invalidations,
+                'generation': self._generation,
+            }
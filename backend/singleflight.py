@@ -0,0 +1,67 @@
+"""
+Single-flight coalescing of identical in-flight computations.
+
+The first caller for a key runs the computation; callers that arrive with the
+same key while it is running wait for it and receive the same result (or the
+same exception) instead of recomputing it.
+"""
+
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Deduplicate concurrent calls that share a key"""
+
+    def __init__(self, name='model'):
+        self.name = name
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._calls = 0
+        self._executions = 0
+        self._deduplicated = 0
+        self._errors = 0
+
+    def do(self, key, fn, *args):
+        """Return fn(*args), sharing one execution with concurrent callers of key"""
+        with self._lock:
+            self._calls += 1
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+                self._executions += 1
+            else:
+                self._deduplicated += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            self._finish(key, errored=True)
+            future.set_exception(e)
+            raise
+        self._finish(key)
+        future.set_result(result)
+        return result
+
+    def _finish(self, key, errored=False):
+        # Later callers start a fresh computation rather than joining a finished one
+        with self._lock:
+            self._in_flight.pop(key, None)
+            if errored:
+                self._errors += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'calls': self._calls,
+                'executions': self._executions,
+                'deduplicated': self._deduplicated,
+                'dedup_rate': round(self._deduplicated / self._calls, 4) if self._calls else 0.0,
+                'errors': self._errors,
+                'in_flight': len(self._in_flight),
+            }
@@ -0,0 +1,259 @@
+"""
+Nearest-observation lookup over latitude/longitude.
+
+Points live on the unit sphere as 3D vectors, so straight-line (chord)
+distance orders neighbours exactly like great-circle distance and nothing
+special happens at the antimeridian or the poles. The bulk of the points
+sits in a static KD-tree; newly added points go to a small append buffer
+that is searched by brute force. Once the buffer fills, a background thread
+builds a new tree over everything and swaps it in, so ingesting never waits
+for a rebuild. Re-adding an id replaces its previous point.
+
+scipy's cKDTree is used when available; without scipy the main segment is
+searched by brute force as well.
+"""
+
+import math
+import threading
+import time
+
+import numpy as np
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # optional: brute-force search only
+    cKDTree = None
+
+# False when scipy is missing and every lookup scans all points
+KDTREE_AVAILABLE = cKDTree is not None
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def to_unit_vectors(latitudes, longitudes):
+    latitudes = np.radians(np.asarray(latitudes, dtype=np.float64))
+    longitudes = np.radians(np.asarray(longitudes, dtype=np.float64))
+    cos_lat = np.cos(latitudes)
+    return np.column_stack([cos_lat * np.cos(longitudes), cos_lat * np.sin(longitudes), np.sin(latitudes)])
+
+
+def chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(np.asarray(chord) / 2, 1.0))
+
+
+class _Segment:
+    """Block of points: unit vectors, feature rows, ids, observation times, live flags, optional KD-tree.
+
+    Appending grows the arrays (the buffer); a segment built with_tree is never appended to.
+    """
+
+    def __init__(self, xyz, rows, ids, observed_at, with_tree=False):
+        self.xyz = xyz
+        self.rows = rows
+        self.ids = ids
+        self.observed_at = observed_at
+        self.alive = np.ones(len(ids), dtype=bool)
+        self.count = len(ids)
+        self.tree = cKDTree(xyz) if with_tree and cKDTree is not None and len(ids) else None
+
+    @classmethod
+    def empty(cls, n_features, capacity=0):
+        segment = cls(np.empty((capacity, 3)), np.empty((capacity, n_features)), [], np.empty(capacity))
+        segment.alive = np.zeros(capacity, dtype=bool)
+        return segment
+
+    def append(self, ids, xyz, rows, observed_at):
+        """Append points; returns their positions"""
+        needed = self.count + len(ids)
+        if needed > len(self.alive):
+            capacity = max(needed, 2 * len(self.alive), 64)
+            for name in ('xyz', 'rows', 'observed_at', 'alive'):
+                old = getattr(self, name)
+                grown = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+                grown[:self.count] = old[:self.count]
+                setattr(self, name, grown)
+        positions = range(self.count, needed)
+        self.xyz[self.count:needed] = xyz
+        self.rows[self.count:needed] = rows
+        self.observed_at[self.count:needed] = observed_at
+        self.alive[self.count:needed] = True
+        self.ids.extend(ids)
+        self.count = needed
+        return positions
+
+    def live(self, alive):
+        """Copies of the points flagged in alive: (xyz, rows, ids, observed_at)"""
+        alive = alive[:self.count]
+        return (self.xyz[:self.count][alive], self.rows[:self.count][alive],
+                [point_id for point_id, ok in zip(self.ids, alive) if ok], self.observed_at[:self.count][alive])
+
+    def nearest(self, target, k, oldest):
+        """Up to k (chord distance, position) pairs of live points at least as new as oldest"""
+        if not self.count:
+            return [], []
+        if self.tree is not None:
+            # Ask for extra neighbours when replaced or too-old points are among the nearest
+            wanted = k
+            while True:
+                distances, positions = self.tree.query(target, k=min(wanted, self.count))
+                distances, positions = np.atleast_1d(distances), np.atleast_1d(positions)
+                ok = self.alive[positions] & (self.observed_at[positions] >= oldest)
+                if ok.sum() >= k or wanted >= self.count:
+                    return distances[ok][:k].tolist(), positions[ok][:k].tolist()
+                wanted *= 4
+        ok = np.flatnonzero(self.alive[:self.count] & (self.observed_at[:self.count] >= oldest))
+        distances = np.linalg.norm(self.xyz[ok] - target, axis=1)
+        nearest = np.argsort(distances)[:k]
+        return distances[nearest].tolist(), ok[nearest].tolist()
+
+
+class NearestObservationIndex:
+    """Thread-safe k-nearest lookup of feature rows by lat/lon with incremental rebuilds"""
+
+    def __init__(self, n_features, buffer_size=4096, name='nearest'):
+        self.n_features = int(n_features)
+        # Buffered points that trigger a background rebuild
+        self.buffer_size = max(1, int(buffer_size))
+        self.name = name
+
+        self._lock = threading.Lock()
+        self._main = _Segment.empty(self.n_features)
+        # Buffer frozen while a rebuild folds it into a new tree; still searched until the swap
+        self._pending = None
+        self._buffer = _Segment.empty(self.n_features, self.buffer_size)
+        # id -> (segment, position) of its live point
+        self._where = {}
+        # Ids replaced while a rebuild runs; their copies in the new tree start out dead
+        self._replaced_during_rebuild = set()
+        self._rebuilds = 0
+        self._last_rebuild_s = None
+        self._queries = 0
+
+    def add(self, ids, latitudes, longitudes, rows, observed_at=None):
+        """Insert or replace points; rows is (N, n_features), observed_at epoch seconds (default now)"""
+        ids = [str(point_id) for point_id in ids]
+        xyz = to_unit_vectors(latitudes, longitudes).reshape(-1, 3)
+        rows = np.asarray(rows, dtype=np.float64).reshape(len(ids), self.n_features)
+        observed_at = np.broadcast_to(np.asarray(time.time() if observed_at is None else observed_at,
+                                                 dtype=np.float64), (len(ids),))
+        with self._lock:
+            positions = self._buffer.append(ids, xyz, rows, observed_at)
+            for point_id, position in zip(ids, positions):
+                # Also covers an id repeated within this batch: the last one wins
+                previous = self._where.get(point_id)
+                if previous is not None:
+                    segment, previous_position = previous
+                    segment.alive[previous_position] = False
+                    if self._pending is not None:
+                        self._replaced_during_rebuild.add(point_id)
+                self._where[point_id] = (self._buffer, position)
+            start_rebuild = self._pending is None and self._buffer.count >= self.buffer_size
+            if start_rebuild:
+                self._freeze_buffer_locked()
+        if start_rebuild:
+            threading.Thread(target=self._rebuild, name=f"{self.name}-rebuild", daemon=True).start()
+
+    def _freeze_buffer_locked(self):
+        self._pending = self._buffer
+        self._buffer = _Segment.empty(self.n_features, self.buffer_size)
+        self._replaced_during_rebuild = set()
+
+    def _rebuild(self):
+        """Build a tree over main + pending outside the lock, then swap it in"""
+        started = time.perf_counter()
+        with self._lock:
+            # Neither segment is appended to any more; only their live flags can still change
+            segments = [(self._main, self._main.alive.copy()), (self._pending, self._pending.alive.copy())]
+        parts = [segment.live(alive) for segment, alive in segments]
+        tree = _Segment(np.concatenate([part[0] for part in parts]),
+                        np.concatenate([part[1] for part in parts]),
+                        parts[0][2] + parts[1][2],
+                        np.concatenate([part[3] for part in parts]),
+                        with_tree=True)
+        where = {point_id: (tree, position) for position, point_id in enumerate(tree.ids)}
+
+        with self._lock:
+            # Replaced while building: the new point sits in the buffer, the copy in the tree is stale
+            for point_id in self._replaced_during_rebuild:
+                position = where.get(point_id, (None, None))[1]
+                if position is not None:
+                    tree.alive[position] = False
+            buffer = self._buffer
+            for position, point_id in enumerate(buffer.ids):
+                if buffer.alive[position]:
+                    where[point_id] = (buffer, position)
+            self._where = where
+            self._main = tree
+            self._pending = None
+            self._replaced_during_rebuild = set()
+            self._rebuilds += 1
+            self._last_rebuild_s = time.perf_counter() - started
+            # Points that streamed in during the rebuild may already call for the next one
+            start_rebuild = buffer.count >= self.buffer_size
+            if start_rebuild:
+                self._freeze_buffer_locked()
+        if start_rebuild:
+            self._rebuild()
+
+    def rebuild(self):
+        """Fold buffered points into the tree now (e.g. after seeding at startup); waits for a running rebuild"""
+        while True:
+            with self._lock:
+                if self._pending is None:
+                    self._freeze_buffer_locked()
+                    break
+            time.sleep(0.01)
+        self._rebuild()
+
+    def query(self, latitude, longitude, k=5, max_age_s=None):
+        """Up to k nearest live points: list of {'id', 'distance_km', 'features', 'observed_at'}, nearest first"""
+        target = to_unit_vectors([latitude], [longitude])[0]
+        oldest = time.time() - max_age_s if max_age_s is not None else -np.inf
+        candidates = []
+        with self._lock:
+            self._queries += 1
+            for segment in (self._main, self._pending, self._buffer):
+                if segment is None:
+                    continue
+                distances, positions = segment.nearest(target, k, oldest)
+                candidates += [(distance, segment.ids[position], segment.rows[position].copy(),
+                                float(segment.observed_at[position]))
+                               for distance, position in zip(distances, positions)]
+
+        candidates.sort(key=lambda candidate: candidate[0])
+        return [{'id': point_id, 'distance_km': float(chord_to_km(distance)), 'features': row,
+                 'observed_at': observed_at}
+                for distance, point_id, row, observed_at in candidates[:k]]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'points': len(self._where),
+                'tree_points': int(self._main.alive.sum()),
+                'buffered_points': int(self._buffer.alive.sum()) + (int(self._pending.alive.sum()) if self._pending else 0),
+                'buffer_size': self.buffer_size,
+                'rebuilds': self._rebuilds,
+                'rebuilding': self._pending is not None,
+                'last_rebuild_ms': round(self._last_rebuild_s * 1000, 2) if self._last_rebuild_s is not None else None,
+                'queries': self._queries,
+                'kdtree': cKDTree is not None,
+            }
+
+
+def blend_features(neighbors, power=2.0, circular=()):
+    """Inverse-distance-weighted feature row from query() results.
+
+    A neighbour at (numerically) zero distance is returned as is. Columns in
+    ``circular`` are angles in degrees and are averaged as unit vectors.
+    """
+    distances = np.array([neighbor['distance_km'] for neighbor in neighbors])
+    rows = np.array([neighbor['features'] for neighbor in neighbors], dtype=np.float64)
+    if distances.min() < 1e-6:
+        return rows[np.argmin(distances)]
+    weights = distances ** -power
+    weights /= weights.sum()
+    blended = weights @ rows
+    for column in circular:
+        angles = np.radians(rows[:, column])
+        blended[column] = math.degrees(math.atan2(weights @ np.sin(angles), weights @ np.cos(angles))) % 360.0
+    return blended
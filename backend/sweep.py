@@ -0,0 +1,191 @@
+"""
+Background sweep that re-scores every registered location on a schedule.
+
+Every ``interval_s`` seconds (or right away after ``trigger()``) a worker
+thread gathers the current inputs of all locations and publishes one
+snapshot of their results at the current model version (``version_fn()``).
+Only rows without a result at that version are scored: results already
+computed at ingest or by the previous sweep are reused, so a tick with no
+model change and no new observations runs no model at all. Stale rows are
+scored in chunks of ``chunk_rows`` on a thread pool (NumPy releases the GIL
+inside the forest's array operations). Publishing is a single reference
+swap, so readers see either the previous snapshot or the new one, never a mix.
+
+``invalidate()`` (on a model reload) starts a new generation: a sweep that
+began before it stops at its next chunk and never publishes, so results of
+replaced models cannot reappear. The previous snapshot stays served until
+the next sweep publishes; ``stats()`` reports how long it has been behind
+the current model version.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+
+class SweepScheduler:
+    """Periodically score all locations and publish an immutable snapshot"""
+
+    def __init__(self, gather_fn, score_fn, models, interval_s=300.0, chunk_rows=4096, workers=None, name='sweep',
+                 version_fn=None):
+        # gather_fn(model) -> (location_ids, feature rows, observed_at per row, result per row or None);
+        #   a result is given only when it was already scored at the current version
+        # score_fn(model, matrix) -> one result per row
+        # version_fn() -> hashable version of the models score_fn uses
+        self.gather_fn = gather_fn
+        self.score_fn = score_fn
+        self.version_fn = version_fn or (lambda: None)
+        self.models = tuple(models)
+        self.interval_s = float(interval_s)
+        self.chunk_rows = max(1, int(chunk_rows))
+        self.workers = max(1, int(workers or os.cpu_count() or 1))
+        self.name = name
+
+        self._snapshot = self._empty_snapshot()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._sweep_lock = threading.Lock()
+        self._publish_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._generation = 0
+        # Since when the served snapshot has been behind the loaded models (None: it is current)
+        self._stale_since = time.time()
+        self._sweeps = 0
+        self._discarded = 0
+        self._errors = 0
+        self._last_error = None
+        self._last_duration_s = None
+        self._last_rows = 0
+        self._last_scored = 0
+
+    def lookup(self, model, location_id):
+        """{'result', 'observed_at', 'scored_at'} from the current snapshot, or None"""
+        return self._snapshot['models'].get(model, {}).get(location_id)
+
+    def start(self):
+        # Started lazily so the thread lives in the process that serves requests
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=f"{self.name}-scheduler", daemon=True)
+                self._thread.start()
+
+    @staticmethod
+    def _empty_snapshot():
+        return {'generated_at': None, 'started': None, 'version': None, 'models': {}}
+
+    def trigger(self):
+        """Run the next sweep now instead of waiting for the interval"""
+        self._wake.set()
+
+    def invalidate(self):
+        """Cancel a sweep in progress (e.g. after a model reload) and sweep again; the old snapshot stays served"""
+        with self._publish_lock:
+            self._generation += 1
+            if self._stale_since is None:
+                self._stale_since = time.time()
+        self.trigger()
+
+    def _run(self):
+        while True:
+            try:
+                self.run_once()
+            except Exception as e:
+                self._errors += 1
+                self._last_error = str(e)
+                print(f"❌ Location sweep failed: {e}")
+            self._wake.wait(self.interval_s)
+            self._wake.clear()
+
+    def run_once(self):
+        """Gather, score and publish one sweep; returns the number of rows scored (0 if it was cancelled)"""
+        with self._sweep_lock:
+            generation = self._generation
+            version = self.version_fn()
+            started = time.time()
+            started_perf = time.perf_counter()
+            scored_at = datetime.now().isoformat()
+            previous = self._snapshot
+            reusable = previous['models'] if previous['version'] == version else {}
+            models = {}
+            rows_total = 0
+            rows_scored = 0
+
+            def score_chunk(model, chunk):
+                # Chunks still queued when the generation changes are skipped, not scored
+                return self.score_fn(model, chunk) if self._generation == generation else None
+
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=self.name) as pool:
+                for model in self.models:
+                    location_ids, rows, observed_at, results = self.gather_fn(model)
+                    previous_entries = reusable.get(model, {})
+                    entries = {}
+                    stale = []
+                    for position, (location_id, row_observed_at, result) in enumerate(
+                            zip(location_ids, observed_at, results)):
+                        entry = previous_entries.get(location_id)
+                        if result is not None:
+                            # Scored at ingest by the current models
+                            entries[location_id] = {'result': result, 'observed_at': row_observed_at,
+                                                    'scored_at': row_observed_at}
+                        elif entry is not None and entry['observed_at'] == row_observed_at:
+                            entries[location_id] = entry
+                        else:
+                            stale.append(position)
+                    if stale:
+                        matrix = np.asarray([rows[position] for position in stale], dtype=np.float64)
+                        chunks = [matrix[start:start + self.chunk_rows]
+                                  for start in range(0, len(matrix), self.chunk_rows)]
+                        chunk_results = list(pool.map(lambda chunk: score_chunk(model, chunk), chunks))
+                        if self._generation != generation:
+                            break
+                        scored = (result for results in chunk_results for result in results)
+                        for position, result in zip(stale, scored):
+                            entries[location_ids[position]] = {'result': result, 'observed_at': observed_at[position],
+                                                               'scored_at': scored_at}
+                    models[model] = entries
+                    rows_total += len(location_ids)
+                    rows_scored += len(stale)
+
+            with self._publish_lock:
+                # Invalidated while scoring: these results may come from a replaced model
+                if self._generation != generation:
+                    self._discarded += 1
+                    return 0
+                self._snapshot = {'generated_at': scored_at, 'started': started, 'version': version, 'models': models}
+                self._stale_since = None
+            self._sweeps += 1
+            self._last_rows = rows_total
+            self._last_scored = rows_scored
+            self._last_duration_s = time.perf_counter() - started_perf
+            return rows_scored
+
+    def stats(self):
+        snapshot = self._snapshot
+        duration = self._last_duration_s
+        current = snapshot['version'] == self.version_fn() and snapshot['started'] is not None
+        return {
+            'interval_s': self.interval_s,
+            'chunk_rows': self.chunk_rows,
+            'workers': self.workers,
+            'running': self._thread is not None and self._thread.is_alive(),
+            'sweeps': self._sweeps,
+            'discarded': self._discarded,
+            'errors': self._errors,
+            'last_error': self._last_error,
+            'last_duration_ms': round(duration * 1000, 2) if duration is not None else None,
+            'last_rows': self._last_rows,
+            'last_rows_scored': self._last_scored,
+            'rows_per_s': round(self._last_rows / duration, 1) if duration else None,
+            'snapshot_generated_at': snapshot['generated_at'],
+            'snapshot_version': snapshot['version'],
+            'snapshot_current': current,
+            # How long the served snapshot has lagged the loaded models; 0 while it matches them
+            'staleness_s': 0.0 if current else round(time.time() - (self._stale_since or snapshot['started']), 3),
+            'locations': {model: len(entries) for model, entries in snapshot['models'].items()},
+        }